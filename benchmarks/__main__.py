@@ -0,0 +1,47 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks._cases import all_benchmarks
+from benchmarks._runner import baseline_machine, compare, format_seconds, load_baseline, machine, run, save_baseline
+from dewdl import DEWDL_LOG, DewDLConfigs
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Times dewdl's client-side hot paths.")
+    parser.add_argument("-k", "--pattern", help="only run benchmarks whose name matches this regular expression")
+    parser.add_argument("--records", type=int, default=1000, help="records per synthetic payload")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repeats per benchmark")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging, e.g. 0.25")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    # every request logs at INFO, which would dominate the request benchmarks
+    DEWDL_LOG.setLevel(logging.WARNING)
+    # nothing is sent, but queries need an environment; set in memory only so the user's config file is untouched
+    DewDLConfigs._settings_dict[DewDLConfigs.UDL_ENV_KEY] = "test"
+    results = run(all_benchmarks(args.records), repeat=args.repeat, pattern=args.pattern)
+
+    baseline = load_baseline(args.baseline) if args.baseline.exists() else {}
+    if baseline and baseline_machine(args.baseline) != machine():
+        print(f"warning: {args.baseline} was recorded on {baseline_machine(args.baseline)}", file=sys.stderr)
+    comparisons = compare(results, baseline, args.threshold)
+    width = max((len(result.name) for result in results), default=0)
+    for comparison in comparisons:
+        change = "" if comparison.ratio is None else f"{(comparison.ratio - 1) * 100:+7.1f}%"
+        flag = "  REGRESSION" if comparison.regressed else ""
+        print(f"{comparison.name:<{width}}  {format_seconds(comparison.current):>10}  {change}{flag}")
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    return 1 if any(comparison.regressed for comparison in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
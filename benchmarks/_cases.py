@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+
+import httpx
+
+from benchmarks._generators import generate_records
+from benchmarks._runner import Benchmark
+from dewdl._json_codec import JSONCodec, StdlibJSONCodec
+from dewdl.enums import UDLBaseDataType, UDLQueryType
+from dewdl.models import Elset, validate_records
+from dewdl.models._sms_response import SMSResponse
+from dewdl.requests import UDLRequest, UDLRequestPayload, UDLSession
+from dewdl.udl_actions import UDLQuery
+
+
+def _query_building() -> Callable[[], object]:
+    start, end = datetime(2024, 9, 16), datetime(2024, 9, 17)
+    return lambda: UDLQuery(UDLBaseDataType.EO_OBSERVATION).between(start, end).from_source("SSDP").max_results(100)
+
+
+def _query_regeneration(data_type: UDLBaseDataType) -> Callable[[], Callable[[], object]]:
+    def setup():
+        query = UDLQuery(data_type).after(datetime(2024, 9, 16)).from_source("SSDP").with_descriptor("benchmark")
+        return query._regenerate
+
+    return setup
+
+
+def _get_request(records: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        body = JSONCodec.active().encode(generate_records(UDLBaseDataType.ELSET, records))
+        session = UDLSession(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+        payload = UDLRequestPayload(endpoint=UDLQuery(UDLBaseDataType.ELSET), token="Basic benchmark")  # noqa: S106
+
+        def _get():
+            UDLRequest.use_session(session)
+            try:
+                return UDLRequest._make_request(payload)
+            finally:
+                UDLRequest.use_session(None)
+
+        return _get
+
+    return setup
+
+
+def _new_client() -> Callable[[], object]:
+    def _build():
+        session = UDLSession()
+        session.client  # noqa: B018
+        session.close()
+
+    return _build
+
+
+def _post_setup(codec: JSONCodec, records: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        payload = UDLRequestPayload(
+            endpoint=UDLQuery(UDLBaseDataType.ELSET),
+            method="POST",
+            post_body=generate_records(UDLBaseDataType.ELSET, records),
+        )
+
+        def _setup_params():
+            previous = JSONCodec.active()
+            JSONCodec.use(codec)
+            try:
+                UDLRequest._setup_post_params(payload, {}, {})
+            finally:
+                JSONCodec.use(previous)
+
+        return _setup_params
+
+    return setup
+
+
+def _elset_validation(records: int) -> dict[str, Callable[[], Callable[[], object]]]:
+    elsets = generate_records(UDLBaseDataType.ELSET, records)
+    body = JSONCodec.active().encode(elsets)
+    return {
+        "validate.elset.model_validate": lambda: lambda: [Elset.model_validate(record) for record in elsets],
+        "validate.elset.validate_records": lambda: lambda: validate_records(Elset, body),
+    }
+
+
+def _sms_validation(records: int) -> dict[str, Callable[[], Callable[[], object]]]:
+    messages = generate_records(UDLBaseDataType.ELSET, records)
+    return {
+        "validate.sms_response.model_validate": lambda: (
+            lambda: SMSResponse.model_validate({"data": messages, "next_offset": 1})
+        ),
+        "validate.sms_response.model_construct": lambda: (
+            lambda: SMSResponse.model_construct(data=messages, next_offset=1)
+        ),
+    }
+
+
+def _decode(data_type: UDLBaseDataType, records: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        codec = JSONCodec.active()
+        body = codec.encode(generate_records(data_type, records))
+        return lambda: codec.decode(body)
+
+    return setup
+
+
+def _merge(records: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        from dewdl.models import RecordMerger
+
+        # two pulls of the same window from different sources, so every record has a duplicate
+        streams = [generate_records(UDLBaseDataType.ELSET, records, seed=seed) for seed in (1, 2)]
+        return lambda: list(RecordMerger(UDLBaseDataType.ELSET).merge(*streams))
+
+    return setup
+
+
+def _columnar(records: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        from dewdl.models import ColumnarResult
+
+        elsets = generate_records(UDLBaseDataType.ELSET, records)
+        return lambda: ColumnarResult.from_records(elsets, Elset)
+
+    return setup
+
+
+def _elset_derived(records: int) -> Callable[[], Callable[[], object]]:
+    def setup():
+        from dewdl.models import ColumnarResult, derive_elsets
+
+        elsets = ColumnarResult.from_records(generate_records(UDLBaseDataType.ELSET, records), Elset)
+        return lambda: derive_elsets(elsets, datetime(2024, 9, 17))
+
+    return setup
+
+
+def all_benchmarks(records: int = 1000) -> list[Benchmark]:
+    """Builds every benchmark; payload-sized benchmarks use the given number of records."""
+    benchmarks = [
+        Benchmark("query.build", _query_building),
+        *(
+            Benchmark(f"query.regenerate.{query_type.name.lower()}", _query_regeneration(query_type.base_data_type))
+            for query_type in UDLQueryType
+        ),
+        Benchmark("request.get.empty", _get_request(0)),
+        Benchmark(f"request.get.elset_{records}", _get_request(records)),
+        Benchmark("session.new_client", _new_client),
+        Benchmark(f"post.setup_params.stdlib_{records}", _post_setup(StdlibJSONCodec(), records)),
+        Benchmark(f"post.setup_params.{JSONCodec.active().name}_{records}", _post_setup(JSONCodec.active(), records)),
+        *(Benchmark(name, setup) for name, setup in _elset_validation(records).items()),
+        *(Benchmark(name, setup) for name, setup in _sms_validation(records).items()),
+        Benchmark(f"merge.elset_{records}", _merge(records)),
+        *(
+            Benchmark(f"decode.{data_type.name.lower()}_{records}", _decode(data_type, records))
+            for data_type in UDLBaseDataType
+        ),
+    ]
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return benchmarks
+    return [
+        *benchmarks,
+        Benchmark(f"columnar.elset_{records}", _columnar(records)),
+        Benchmark(f"elset.derive_{records}", _elset_derived(records)),
+    ]
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import random
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from dewdl._udl_time import format_udl_time
+from dewdl.enums import UDLBaseDataType
+
+_START = datetime(2024, 9, 16)
+_SOURCES = ("SSDP", "18SDS", "LeoLabs", "ExoAnalytic")
+_SENSORS = tuple(f"SENSOR-{number:03d}" for number in range(40))
+
+
+def _common(rng: random.Random, epoch: datetime) -> dict:
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "classificationMarking": "U",
+        "source": rng.choice(_SOURCES),
+        "origin": "DnD",
+        "dataMode": rng.choice(("TEST", "REAL")),
+        "createdAt": format_udl_time(epoch + timedelta(seconds=rng.uniform(1, 60))),
+        "createdBy": "dewdl.benchmark",
+    }
+
+
+def _elset(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    mean_motion = rng.uniform(0.9, 16.5)
+    eccentricity = rng.uniform(0, 0.3)
+    return {
+        "idElset": str(uuid.UUID(int=rng.getrandbits(128))),
+        "satNo": sat_no,
+        "epoch": format_udl_time(epoch),
+        "meanMotion": mean_motion,
+        "eccentricity": eccentricity,
+        "inclination": rng.uniform(0, 180),
+        "raan": rng.uniform(0, 360),
+        "argOfPerigee": rng.uniform(0, 360),
+        "meanAnomaly": rng.uniform(0, 360),
+        "revNo": rng.randint(1, 90000),
+        "bStar": rng.uniform(-1e-4, 1e-3),
+        "meanMotionDot": rng.uniform(-1e-6, 1e-5),
+        "meanMotionDDot": 0.0,
+        "uct": rng.random() < 0.1,
+        "ephemType": 0,
+        "algorithm": "SGP4",
+        "tags": ["PROVIDER_TAG1"],
+    }
+
+
+def _eo_observation(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "obTime": format_udl_time(epoch),
+        "idSensor": rng.choice(_SENSORS),
+        "satNo": sat_no,
+        "ra": rng.uniform(0, 360),
+        "declination": rng.uniform(-90, 90),
+        "azimuth": rng.uniform(0, 360),
+        "elevation": rng.uniform(0, 90),
+        "mag": rng.uniform(5, 18),
+        "senlat": rng.uniform(-90, 90),
+        "senlon": rng.uniform(-180, 180),
+        "senalt": rng.uniform(0, 3),
+        "uct": rng.random() < 0.1,
+        "losUnc": rng.uniform(0, 1e-4),
+    }
+
+
+def _state_vector(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "epoch": format_udl_time(epoch),
+        "satNo": sat_no,
+        "referenceFrame": "J2000",
+        **{axis: rng.uniform(-42000, 42000) for axis in ("xpos", "ypos", "zpos")},
+        **{axis: rng.uniform(-8, 8) for axis in ("xvel", "yvel", "zvel")},
+        "cov": [rng.uniform(0, 1) for _ in range(21)],
+    }
+
+
+def _notification(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "msgType": "DnD_near_geo",
+        "msgBody": {
+            "name": f"DnD.AeroOCAT.{sat_no:06d}",
+            "tleLine1": f"1 {sat_no % 100000:05d}U          24187.67591642 0.00000000 +15000-1 +00000+0 4 0000",
+            "tleLine2": f"2 {sat_no % 100000:05d}   3.4195  62.2389 5166855 300.7814 309.2249  1.00248566    0",
+            "geoScore": rng.uniform(0, 10),
+        },
+    }
+
+
+def _onorbit(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "satNo": sat_no,
+        "idOnOrbit": str(sat_no),
+        "objectType": rng.choice(("PAYLOAD", "ROCKET BODY", "DEBRIS")),
+        "commonName": f"OBJECT {sat_no}",
+        "intlDes": f"{rng.randint(1960, 2024)}-{rng.randint(1, 999):03d}A",
+        "launchDate": (epoch - timedelta(days=rng.randint(0, 20000))).date().isoformat(),
+        "countryCode": rng.choice(("US", "CIS", "PRC", "FR")),
+    }
+
+
+def _sky_imagery(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "expStartTime": format_udl_time(epoch),
+        "expEndTime": format_udl_time(epoch + timedelta(seconds=rng.uniform(0.1, 5))),
+        "idSensor": rng.choice(_SENSORS),
+        "imageType": "FITS",
+        "filename": f"{uuid.UUID(int=rng.getrandbits(128))}.fits",
+        "filesize": rng.randint(10**5, 10**8),
+        "frameFOVWidth": rng.uniform(0.1, 5),
+        "frameFOVHeight": rng.uniform(0.1, 5),
+        "satIdConf": [rng.uniform(0, 1)],
+        "annotationKey": None,
+    }
+
+
+def _soi_observation(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "startTime": format_udl_time(epoch),
+        "endTime": format_udl_time(epoch + timedelta(minutes=5)),
+        "numObs": 10,
+        "type": "OPTICAL",
+        "idSensor": rng.choice(_SENSORS),
+        "satNo": sat_no,
+        "soiObservationList": [
+            {
+                "obStartTime": format_udl_time(epoch + timedelta(seconds=30 * index)),
+                "ra": rng.uniform(0, 360),
+                "declination": rng.uniform(-90, 90),
+                "intensityObs": rng.uniform(0, 1e4),
+            }
+            for index in range(10)
+        ],
+    }
+
+
+def _diff_of_arrival(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "obTime": format_udl_time(epoch),
+        "idSensor1": rng.choice(_SENSORS),
+        "idSensor2": rng.choice(_SENSORS),
+        "satNo": sat_no,
+        "tdoa": rng.uniform(-1e-3, 1e-3),
+        "fdoa": rng.uniform(-1e3, 1e3),
+        "centerFreq": rng.uniform(1e9, 3e10),
+        "snr": rng.uniform(0, 40),
+    }
+
+
+def _maneuver(rng: random.Random, epoch: datetime, sat_no: int) -> dict:
+    return {
+        "eventStartTime": format_udl_time(epoch),
+        "eventEndTime": format_udl_time(epoch + timedelta(minutes=rng.uniform(1, 30))),
+        "satNo": sat_no,
+        "status": "POSSIBLE",
+        "deltaVel": rng.uniform(0, 0.05),
+        "deltaVelU": rng.uniform(-0.05, 0.05),
+        "deltaVelV": rng.uniform(-0.05, 0.05),
+        "deltaVelW": rng.uniform(-0.05, 0.05),
+        "maneuverUnc": rng.uniform(0, 1e-3),
+    }
+
+
+GENERATORS: dict[UDLBaseDataType, Callable[[random.Random, datetime, int], dict]] = {
+    UDLBaseDataType.DIFF_OF_ARRIVAL: _diff_of_arrival,
+    UDLBaseDataType.ELSET: _elset,
+    UDLBaseDataType.EO_OBSERVATION: _eo_observation,
+    UDLBaseDataType.MANEUVER: _maneuver,
+    UDLBaseDataType.NOTIFICATION: _notification,
+    UDLBaseDataType.ONORBIT: _onorbit,
+    UDLBaseDataType.SKY_IMAGERY: _sky_imagery,
+    UDLBaseDataType.SOI_OBSERVATION: _soi_observation,
+    UDLBaseDataType.STATE_VECTOR: _state_vector,
+}
+
+
+def generate_records(data_type: UDLBaseDataType, count: int, seed: int = 0) -> list[dict]:
+    """Generates reproducible synthetic records shaped like UDL responses for a data type.
+
+    :param data_type: The data type to generate
+    :param count: The number of records
+    :param seed: The random seed; the same seed always yields the same records
+    """
+    rng = random.Random(seed)  # noqa: S311
+    generator = GENERATORS[data_type]
+    records = []
+    for index in range(count):
+        epoch = _START + timedelta(seconds=index * 0.5)
+        records.append({**_common(rng, epoch), **generator(rng, epoch, 10000 + index % 5000)})
+    return records
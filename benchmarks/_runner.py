@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import platform
+import re
+import timeit
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    seconds: float
+    calls: int
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: float | None
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float | None:
+        return self.current / self.baseline if self.baseline else None
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio is not None and self.ratio > 1 + self.threshold
+
+
+def run(benchmarks: Iterable[Benchmark], repeat: int = 5, pattern: str | None = None) -> list[BenchmarkResult]:
+    """Times each benchmark, returning the best per-call time over several repeats.
+
+    The best rather than the mean is kept because noise from the rest of the machine only ever adds time.
+
+    :param benchmarks: The benchmarks to run
+    :param repeat: The number of timed repeats, each long enough to take at least 0.2s
+    :param pattern: An optional regular expression that benchmark names must match
+    """
+    results = []
+    for benchmark in benchmarks:
+        if pattern and not re.search(pattern, benchmark.name):
+            continue
+        timer = timeit.Timer(benchmark.setup())
+        calls, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=calls))
+        results.append(BenchmarkResult(benchmark.name, best / calls, calls))
+    return results
+
+
+def machine() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "processor": platform.processor()}
+
+
+def save_baseline(path: Path, results: Iterable[BenchmarkResult]) -> None:
+    """Writes the results as the baseline, keeping entries for benchmarks that were not run."""
+    baseline = load_baseline(path) if path.exists() else {}
+    baseline.update({result.name: result.seconds for result in results})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"machine": machine(), "seconds": dict(sorted(baseline.items()))}, indent=2) + "\n")
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    return json.loads(path.read_text())["seconds"]
+
+
+def baseline_machine(path: Path) -> dict:
+    return json.loads(path.read_text())["machine"]
+
+
+def compare(
+    results: Iterable[BenchmarkResult], baseline: dict[str, float], threshold: float = 0.25
+) -> list[Comparison]:
+    """Compares results with a baseline; a benchmark regressed when it is more than threshold slower.
+
+    :param results: The results to check
+    :param baseline: Seconds per call by benchmark name
+    :param threshold: The allowed slowdown, e.g. 0.25 for 25%
+    """
+    return [Comparison(result.name, baseline.get(result.name), result.seconds, threshold) for result in results]
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write_text(path: Path | str, text: str) -> None:
+    """Replaces a file's contents by writing a sibling temp file and renaming it over the file.
+
+    Readers, including other processes, see either the old file or the new one and never a partial write.
+
+    :param path: The file to replace; its directory is created if needed
+    :param text: The new contents
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as temp_file:
+        try:
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        except BaseException:
+            temp_file.close()
+            Path(temp_file.name).unlink(missing_ok=True)
+            raise
+    Path(temp_file.name).replace(path)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import math
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+
+class JSONCodec(ABC):
+    """Encodes request bodies to bytes and decodes response bodies in a single pass.
+
+    The active codec is the fastest one installed (orjson, then msgspec, then the standard library) unless another
+    is chosen with ``JSONCodec.use``.  Every codec writes ``true``/``false``/``null`` directly, so the encoded body
+    needs no post-processing, and all of them produce the same output: datetimes are RFC 3339 strings with ``Z`` for
+    UTC, NaN and infinity are written as ``null``, and decoding rejects the non-standard ``NaN``/``Infinity`` tokens.
+    """
+
+    name: str = ""
+
+    _active: JSONCodec | None = None
+
+    @abstractmethod
+    def encode(self, obj: Any) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, data: bytes | str) -> Any:
+        """Decodes a JSON body, raising ValueError when it is not valid JSON."""
+
+    @classmethod
+    def active(cls) -> JSONCodec:
+        if JSONCodec._active is None:
+            JSONCodec._active = _default_codec()
+        return JSONCodec._active
+
+    @classmethod
+    def use(cls, codec: JSONCodec | str | None) -> None:
+        """Sets the codec used by dewdl, by instance or by name ("orjson", "msgspec" or "stdlib").
+
+        :param codec: The codec to use; None restores the default
+        """
+        if isinstance(codec, str):
+            if codec not in _CODECS:
+                raise ValueError(f"Unknown JSON codec {codec}; expected one of {sorted(_CODECS)}")
+            codec = _CODECS[codec]()
+        JSONCodec._active = codec
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = "stdlib"
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False, default=_isoformat)
+        except ValueError:
+            # NaN and infinity are not JSON; write them as null like orjson and msgspec do
+            text = json.dumps(_finite(obj), separators=(",", ":"), ensure_ascii=False, default=_isoformat)
+        return text.encode("utf-8")
+
+    def decode(self, data: bytes | str) -> Any:
+        return json.loads(data, parse_constant=_reject_constant)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def encode(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._orjson.OPT_SERIALIZE_NUMPY | self._orjson.OPT_UTC_Z)
+
+    def decode(self, data: bytes | str) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._decode_error = msgspec.DecodeError
+
+    def encode(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def decode(self, data: bytes | str) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as error:
+            # the other codecs raise ValueError subclasses, so callers can handle bad bodies the same way
+            raise ValueError(str(error)) from error
+
+
+_CODECS: dict[str, type[JSONCodec]] = {
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+    StdlibJSONCodec.name: StdlibJSONCodec,
+}
+
+
+def _isoformat(obj: Any) -> str:
+    if isinstance(obj, datetime):
+        text = obj.isoformat()
+        return text[:-6] + "Z" if obj.utcoffset() == timedelta(0) else text
+    if isinstance(obj, (date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def _default_codec() -> JSONCodec:
+    for codec_type in _CODECS.values():
+        try:
+            return codec_type()
+        except ImportError:
+            continue
+    return StdlibJSONCodec()
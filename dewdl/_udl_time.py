@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+UDL_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+_CANONICAL_LENGTH = len("2000-01-01T00:00:00.000000Z")
+
+
+def parse_udl_time(value: str) -> datetime:
+    """Parses a UDL timestamp such as 2024-07-05T16:13:19.178Z into a naive UTC datetime.
+
+    :param value: The timestamp string; the fractional seconds may have any number of digits or be omitted
+    """
+    parsed = datetime.fromisoformat(_pad_fraction(value.replace("Z", "+00:00")))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def format_udl_time(epoch: datetime) -> str:
+    return epoch.strftime(UDL_DATETIME_FORMAT)
+
+
+def sortable_udl_time(value: str) -> str:
+    """Normalizes a UDL timestamp to UDL's own format, in which timestamps sort correctly as strings.
+
+    :param value: The timestamp string; values already in that format are returned without being parsed
+    """
+    if len(value) == _CANONICAL_LENGTH and value.endswith("Z"):
+        return value
+    return format_udl_time(parse_udl_time(value))
+
+
+def _pad_fraction(value: str) -> str:
+    # python 3.10 only accepts 3 or 6 fractional digits
+    if "." not in value:
+        return value
+    head, tail = value.split(".", 1)
+    digits = len(tail) - len(tail.lstrip("0123456789"))
+    fraction, offset = tail[:digits], tail[digits:]
+    return f"{head}.{fraction[:6].ljust(6, '0')}{offset}"
@@ -1,3 +1,5 @@
+from dewdl.exceptions._udl_circuit_open_error import UDLCircuitOpenError
+from dewdl.exceptions._udl_download_verification_error import UDLDownloadVerificationError
 from dewdl.exceptions._udl_request_error import UDLRequestError
 
-__all__ = ["UDLRequestError"]
+__all__ = ["UDLRequestError", "UDLCircuitOpenError", "UDLDownloadVerificationError"]
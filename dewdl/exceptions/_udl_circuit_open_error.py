@@ -0,0 +1,5 @@
+class UDLCircuitOpenError(Exception):
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {endpoint} after repeated failures; retry in {retry_in:.1f}s")
@@ -0,0 +1,6 @@
+class UDLDownloadVerificationError(Exception):
+    def __init__(self, file_id: str, expected: str, actual: str) -> None:
+        self.file_id = file_id
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"Download of {file_id} failed verification: expected {expected}, got {actual}")
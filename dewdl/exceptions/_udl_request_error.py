@@ -6,7 +6,11 @@ from dewdl.enums import UDLRequestErrorCode
 
 
 class UDLRequestError(Exception):
+    MAX_TEXT_LENGTH = 200
+
     def __init__(self, response: Response) -> None:
+        self.response = response
+        self.status_code = response.status_code
         try:
             status_code = UDLRequestErrorCode(response.status_code)
         except ValueError:
@@ -17,7 +21,12 @@ class UDLRequestError(Exception):
         else:
             try:
                 msg = f'{response.status_code} - {json.loads(response.text)["message"]}'
-            except KeyError:
+            except (KeyError, TypeError):
                 msg = f"{response.status_code} - Unexpected response"
+            except ValueError:
+                # gateways in front of UDL answer 502/503/504 with HTML or plain text rather than JSON
+                text = " ".join(response.text.split())
+                detail = text[: UDLRequestError.MAX_TEXT_LENGTH] if text else "Unexpected response"
+                msg = f"{response.status_code} - {detail}"
 
         super().__init__(f"{msg}")
@@ -0,0 +1,8 @@
+from dewdl.metrics._metrics_registry import Counter, Histogram, HistogramSnapshot, MetricsRegistry
+
+__all__ = [
+    "MetricsRegistry",
+    "Counter",
+    "Histogram",
+    "HistogramSnapshot"
+]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import re
+from urllib.parse import urlsplit
+
+from dewdl.metrics._metrics_registry import MetricsRegistry
+
+_REGISTRY = MetricsRegistry.default()
+_SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9)
+
+REQUESTS = _REGISTRY.counter(
+    "dewdl_requests_total", "UDL requests by outcome", ("endpoint", "data_type", "method", "status")
+)
+REQUEST_SECONDS = _REGISTRY.histogram(
+    "dewdl_request_duration_seconds",
+    "Wall time of UDL requests including the body download",
+    ("endpoint", "data_type", "method", "status"),
+)
+REQUEST_BYTES = _REGISTRY.counter(
+    "dewdl_request_bytes_total", "Request body bytes sent to UDL", ("endpoint", "data_type", "method")
+)
+RESPONSE_BYTES = _REGISTRY.counter(
+    "dewdl_response_bytes_total", "Response body bytes received from UDL", ("endpoint", "data_type", "method")
+)
+RESPONSE_SIZE = _REGISTRY.histogram(
+    "dewdl_response_size_bytes", "Response body size", ("endpoint", "data_type", "method"), buckets=_SIZE_BUCKETS
+)
+PHASE_SECONDS = _REGISTRY.histogram(
+    "dewdl_request_phase_seconds",
+    "Time spent in each phase of a request: connect, tls, ttfb (headers sent to headers received) and download",
+    ("endpoint", "method", "phase"),
+)
+RETRIES = _REGISTRY.counter(
+    "dewdl_retries_total", "Requests replayed after a failure", ("endpoint", "method", "reason")
+)
+RETRY_SLEEP_SECONDS = _REGISTRY.counter(
+    "dewdl_retry_sleep_seconds_total", "Time spent waiting before replaying requests", ("endpoint", "method")
+)
+THROTTLE_SECONDS = _REGISTRY.histogram(
+    "dewdl_throttle_wait_seconds", "Time spent waiting on a rate limiter before a request", ("limiter",)
+)
+PARSE_SECONDS = _REGISTRY.histogram(
+    "dewdl_parse_seconds", "Time spent decoding and validating response records", ("model", "stage")
+)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36})$")
+
+
+def endpoint_label(url: str) -> str:
+    """Gets the URL path with offsets and ids replaced by ':id', so every request to an endpoint shares a label."""
+    segments = urlsplit(url).path.split("/")
+    return "/".join(":id" if _ID_SEGMENT.match(segment) else segment for segment in segments)
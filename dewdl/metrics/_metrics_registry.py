@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from dewdl._atomic_write import atomic_write_text
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict) -> tuple[str, ...]:
+        unknown = set(labels) - set(self.label_names)
+        if unknown:
+            raise ValueError(f"Unknown labels {sorted(unknown)} for metric {self.name}")
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _matches(self, values: tuple[str, ...], labels: dict) -> bool:
+        expected = dict(zip(self.label_names, self._label_values(labels)))
+        return all(values[self.label_names.index(name)] == expected[name] for name in labels)
+
+    def _format_labels(self, values: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [*zip(self.label_names, values), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...]) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def value(self, **labels) -> float:
+        """Gets the total across every series matching the given labels, e.g. status="503"."""
+        with self._lock:
+            return sum(value for key, value in self._values.items() if self._matches(key, labels))
+
+    def to_prometheus(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [*self._header(), *(f"{self.name}{self._format_labels(key)} {value!r}" for key, value in values)]
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    buckets: tuple[float, ...]
+    counts: tuple[int, ...]
+    count: int
+    sum: float
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else math.nan
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by interpolating within the bucket that contains it.
+
+        :param q: The quantile, between 0 and 1
+        """
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else lower
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...], buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # per series: one count per bucket plus the overflow bucket, then the sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels) -> HistogramSnapshot:
+        """Gets the observations of every series matching the given labels merged into one distribution."""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        with self._lock:
+            for key, (series_counts, series_total) in self._series.items():
+                if self._matches(key, labels):
+                    counts = [a + b for a, b in zip(counts, series_counts)]
+                    total += series_total[0]
+        return HistogramSnapshot(self.buckets, tuple(counts), sum(counts), total)
+
+    def to_prometheus(self) -> list[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines = self._header()
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*map(repr, self.buckets), "+Inf"), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._format_labels(key, (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total!r}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds counters and histograms in process, queryable directly or exported in Prometheus text format.
+
+    dewdl records its own request metrics in ``MetricsRegistry.default()``.  Asking for a metric that already exists
+    returns the existing one, so modules can declare the metrics they use at import time.
+    """
+
+    _default: MetricsRegistry | None = None
+    _default_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> MetricsRegistry:
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+        return cls._default
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, documentation, label_names)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def get(self, name: str) -> Counter | Histogram:
+        return self._metrics[name]
+
+    def __iter__(self) -> Iterator[Counter | Histogram]:
+        with self._lock:
+            return iter(list(self._metrics.values()))
+
+    def to_prometheus(self) -> str:
+        return "\n".join(line for metric in self for line in metric.to_prometheus()) + "\n"
+
+    def export(self, handler: Callable[[str], object]) -> None:
+        """Passes the Prometheus text exposition to a handler, e.g. a push-gateway client or logger.
+
+        :param handler: Called with the exposition text
+        """
+        handler(self.to_prometheus())
+
+    def write_prometheus(self, path: Path | str) -> None:
+        """Writes the Prometheus text exposition to a file, e.g. for the node exporter's textfile collector.
+
+        :param path: The file to replace
+        """
+        # the textfile collector may read at any moment, so the file is replaced rather than rewritten
+        atomic_write_text(path, self.to_prometheus())
+
+    def reset(self) -> None:
+        """Clears every recorded value while keeping the metrics registered."""
+        for metric in self:
+            metric.clear()
+
+    def _register(self, metric_type: type, name: str, documentation: str, label_names: tuple[str, ...], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_type(name, documentation, tuple(label_names), **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_type) or metric.label_names != tuple(label_names):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
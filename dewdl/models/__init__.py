@@ -1,5 +1,26 @@
+from dewdl.models._bulk_validation import LazyModel, lazy_records, validate_records
+from dewdl.models._columnar_result import CategoricalColumn, ColumnarResult
 from dewdl.models._elset import Elset
+from dewdl.models._elset_derived import ElsetDerived, derive_elsets, fill_derived
 from dewdl.models._notification import Notification
+from dewdl.models._record_merger import MergePolicy, RecordMerger
 from dewdl.models._topic_description import TopicDescription
+from dewdl.models._tuple_row import tuple_row_type, tuple_rows
 
-__all__ = ["TopicDescription", "Elset", "Notification"]
+__all__ = [
+    "TopicDescription",
+    "Elset",
+    "Notification",
+    "ColumnarResult",
+    "CategoricalColumn",
+    "LazyModel",
+    "validate_records",
+    "lazy_records",
+    "tuple_row_type",
+    "tuple_rows",
+    "ElsetDerived",
+    "derive_elsets",
+    "fill_derived",
+    "MergePolicy",
+    "RecordMerger",
+]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from functools import cache
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+from dewdl.metrics._dewdl_metrics import PARSE_SECONDS
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+@cache
+def _field_adapter(model: type[BaseModel], name: str) -> TypeAdapter:
+    return TypeAdapter(model.model_fields[name].annotation)
+
+
+def validate_records(model: type[ModelT], data: bytes | str | list[dict]) -> list[ModelT]:
+    """Validates a whole JSON array in one pass with a cached ``TypeAdapter(list[model])``.
+
+    :param model: The model each record is validated into, e.g. Elset
+    :param data: Raw JSON bytes/text such as ``response.content``, or already-decoded records
+    """
+    adapter = _list_adapter(model)
+    with PARSE_SECONDS.time(model=model.__name__, stage="validate"):
+        if isinstance(data, (bytes, str)):
+            return adapter.validate_json(data)
+        return adapter.validate_python(data)
+
+
+class LazyModel:
+    """A record wrapper that validates each field against the model the first time it is accessed."""
+
+    __slots__ = ("_model", "_data", "_validated")
+
+    def __init__(self, model: type[BaseModel], data: dict) -> None:
+        self._model = model
+        self._data = data
+        self._validated: dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in self._model.model_fields:
+            raise AttributeError(f"{self._model.__name__} has no field {name!r}")
+        if name not in self._validated:
+            field = self._model.model_fields[name]
+            if name not in self._data and field.is_required():
+                raise ValueError(f"{self._model.__name__} record is missing required field {name!r}")
+            value = self._data[name] if name in self._data else field.get_default()
+            self._validated[name] = _field_adapter(self._model, name).validate_python(value)
+        return self._validated[name]
+
+    def to_model(self) -> BaseModel:
+        return self._model.model_validate(self._data)
+
+
+def lazy_records(model: type[BaseModel], records: list[dict]) -> list[LazyModel]:
+    return [LazyModel(model, record) for record in records]
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import time
+import types
+import typing
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+
+from dewdl._json_codec import JSONCodec
+from dewdl.enums._udl_base_data_type import UDLBaseDataType
+from dewdl.enums._udl_date_fields import UDLDateFields
+from dewdl.metrics._dewdl_metrics import PARSE_SECONDS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+TIME_FIELDS = frozenset({UDLDateFields.get(data_type) for data_type in UDLBaseDataType} | {"createdAt"})
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Columnar results require numpy. Install it with 'pip install dewdl[columnar]'.")
+
+
+@dataclass(frozen=True)
+class CategoricalColumn:
+    """A string column stored as integer codes into an array of unique categories; missing values have code -1."""
+
+    codes: np.ndarray
+    categories: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def values(self) -> np.ndarray:
+        decoded = np.append(self.categories, None)
+        return decoded[self.codes]
+
+
+class ColumnarResult:
+    """Query results decoded straight into typed columns instead of a dict or model per record.
+
+    Numeric fields become float/int arrays, time fields become ``datetime64[us]`` arrays and strings become
+    ``CategoricalColumn`` codes.  Nested values (lists/dicts) are kept as object arrays.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray | CategoricalColumn]) -> None:
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray | CategoricalColumn:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @classmethod
+    def from_response(
+        cls, response, model: type[BaseModel] | None = None, columns: Sequence[str] | None = None
+    ) -> ColumnarResult:
+        """Decodes an httpx response whose body is a JSON array of records.
+
+        :param response: The response from UDLRequest.get
+        :param model: An optional model, e.g. Elset, whose field types are used instead of inferring them
+        :param columns: Only build these columns, e.g. the columns of a select() query
+        """
+        with PARSE_SECONDS.time(model=model.__name__ if model else "", stage="decode"):
+            records = JSONCodec.active().decode(response.content)
+        return cls.from_records(records, model, columns)
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[dict], model: type[BaseModel] | None = None, columns: Sequence[str] | None = None
+    ) -> ColumnarResult:
+        """Builds columns from an iterable of record dicts, e.g. the output of UDLRequest.iter_records.
+
+        :param records: The records to convert
+        :param model: An optional model, e.g. Elset, whose field types are used instead of inferring them
+        :param columns: Only build these columns; by default every model field and every key seen in a record
+        """
+        _require_numpy()
+        started = time.perf_counter()
+        records = records if isinstance(records, list) else list(records)
+        field_types = _model_field_types(model) if model else {}
+        names = list(columns) if columns else list(field_types)
+        seen = set(names)
+        for record in records if not columns else ():
+            for name in record:
+                if name not in seen:
+                    seen.add(name)
+                    names.append(name)
+        columns = {}
+        for name in names:
+            values = [record.get(name) for record in records]
+            columns[name] = _to_column(name, values, field_types.get(name) or _infer_type(values))
+        PARSE_SECONDS.observe(time.perf_counter() - started, model=model.__name__ if model else "", stage="columnar")
+        return cls(columns)
+
+    def to_pandas(self):
+        import pandas as pd
+
+        data = {}
+        for name, column in self.columns.items():
+            if isinstance(column, CategoricalColumn):
+                data[name] = pd.Categorical.from_codes(column.codes, categories=column.categories)
+            else:
+                data[name] = column
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        arrays = {}
+        for name, column in self.columns.items():
+            if isinstance(column, CategoricalColumn):
+                indices = pa.array(column.codes, mask=column.codes < 0)
+                arrays[name] = pa.DictionaryArray.from_arrays(indices, pa.array(column.categories, type=pa.string()))
+            elif column.dtype.kind == "O":
+                arrays[name] = pa.array(list(column))
+            else:
+                arrays[name] = pa.array(column, from_pandas=True)
+        return pa.table(arrays)
+
+
+def _model_field_types(model: type[BaseModel]) -> dict[str, type]:
+    field_types = {}
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if isinstance(annotation, types.UnionType) or typing.get_origin(annotation) is typing.Union:
+            args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+            annotation = args[0] if len(args) == 1 else object
+        field_types[name] = annotation if annotation in (bool, int, float, str) else object
+    return field_types
+
+
+def _infer_type(values: list) -> type:
+    value = next((value for value in values if value is not None), None)
+    # bool is checked first since it is a subclass of int
+    for value_type in (bool, int, float, str):
+        if isinstance(value, value_type):
+            return float if value_type is int and any(isinstance(value, float) for value in values) else value_type
+    return object
+
+
+def _to_column(name: str, values: list, value_type: type) -> np.ndarray | CategoricalColumn:
+    has_missing = any(value is None for value in values)
+    if value_type is str and name in TIME_FIELDS:
+        return np.array(["NaT" if value is None else value.rstrip("Z") for value in values], dtype="datetime64[us]")
+    if value_type is str:
+        categories: dict[str, int] = {}
+        codes = np.fromiter(
+            (-1 if value is None else categories.setdefault(value, len(categories)) for value in values),
+            dtype=np.int32,
+            count=len(values),
+        )
+        return CategoricalColumn(codes, np.array(list(categories), dtype=object))
+    if value_type is float or (value_type is int and has_missing):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if value_type is int:
+        return np.array(values, dtype=np.int64)
+    if value_type is bool and not has_missing:
+        return np.array(values, dtype=bool)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+
+from dewdl.models._columnar_result import ColumnarResult, _require_numpy
+from dewdl.models._elset import Elset
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# WGS-72 constants, matching the SGP4 propagator that UDL element sets are generated for
+EARTH_MU_KM3_S2 = 398600.8
+EARTH_RADIUS_KM = 6378.135
+MINUTES_PER_DAY = 1440.0
+
+_MICROSECONDS_PER_DAY = 86400 * 10**6
+
+
+@dataclass(frozen=True)
+class ElsetDerived:
+    """Quantities derived from a batch of element sets, one array element per elset.
+
+    ``semiMajorAxis`` is in km, ``period`` in minutes, ``apogee`` and ``perigee`` are altitudes above the equatorial
+    radius in km, ``epoch`` is ``datetime64[us]`` and ``age`` is the days from epoch to the reference time.  Elsets
+    without a closed orbit, i.e. with a mean motion that is not positive or an eccentricity outside [0, 1), get NaN.
+    """
+
+    semiMajorAxis: np.ndarray  # noqa: N815
+    period: np.ndarray
+    apogee: np.ndarray
+    perigee: np.ndarray
+    epoch: np.ndarray
+    age: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.period)
+
+    def as_dict(self) -> dict[str, np.ndarray]:
+        """Gets the arrays by field name, e.g. to add them to a ColumnarResult's columns."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+def derive_elsets(elsets: Sequence[Elset | dict] | ColumnarResult, reference: datetime | None = None) -> ElsetDerived:
+    """Computes semi-major axis, period, apogee, perigee, epoch and age for a batch of elsets with array math.
+
+    :param elsets: Elset models, elset dicts or a ColumnarResult of elsets
+    :param reference: The time ages are measured to, as naive UTC; defaults to now
+    """
+    _require_numpy()
+    if isinstance(elsets, ColumnarResult):
+        mean_motion = np.asarray(elsets["meanMotion"], dtype=np.float64)
+        eccentricity = np.asarray(elsets["eccentricity"], dtype=np.float64)
+        epoch = np.asarray(elsets["epoch"]).astype("datetime64[us]")
+    else:
+        mean_motion = np.fromiter((_get(elset, "meanMotion") for elset in elsets), np.float64, len(elsets))
+        eccentricity = np.fromiter((_get(elset, "eccentricity") for elset in elsets), np.float64, len(elsets))
+        epoch = np.array([_get(elset, "epoch").rstrip("Z") for elset in elsets], dtype="datetime64[us]")
+    if reference is None:
+        reference = datetime.now(timezone.utc).replace(tzinfo=None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_motion_rad_s = mean_motion * (2 * np.pi / 86400)
+        semi_major_axis = np.cbrt(EARTH_MU_KM3_S2 / mean_motion_rad_s**2)
+        period = MINUTES_PER_DAY / mean_motion
+        apogee = semi_major_axis * (1 + eccentricity) - EARTH_RADIUS_KM
+        perigee = semi_major_axis * (1 - eccentricity) - EARTH_RADIUS_KM
+        open_orbit = ~((mean_motion > 0) & (eccentricity >= 0) & (eccentricity < 1))
+    for values in (semi_major_axis, period, apogee, perigee):
+        values[open_orbit] = np.nan
+    age = (np.datetime64(reference, "us") - epoch).astype(np.float64) / _MICROSECONDS_PER_DAY
+    age[np.isnat(epoch)] = np.nan
+    return ElsetDerived(
+        semiMajorAxis=semi_major_axis,
+        period=period,
+        apogee=apogee,
+        perigee=perigee,
+        epoch=epoch,
+        age=age,
+    )
+
+
+def fill_derived(elsets: Sequence[Elset | dict], overwrite: bool = False) -> ElsetDerived:
+    """Writes semiMajorAxis, period, apogee and perigee back into elset models or dicts that are missing them.
+
+    Values that are not finite, e.g. for a zero mean motion or an eccentricity of 1 or more, are never written.
+
+    :param elsets: Elset models or elset dicts, updated in place
+    :param overwrite: Replace values UDL already supplied instead of only filling missing ones
+    """
+    derived = derive_elsets(elsets)
+    names = ("semiMajorAxis", "period", "apogee", "perigee")
+    for name in names:
+        values = getattr(derived, name)
+        for elset, value, finite in zip(elsets, values.tolist(), np.isfinite(values).tolist()):
+            if not finite:
+                continue
+            if isinstance(elset, dict):
+                if overwrite or elset.get(name) is None:
+                    elset[name] = value
+            elif overwrite or getattr(elset, name) is None:
+                setattr(elset, name, value)
+    return derived
+
+
+def _get(elset: Elset | dict, name: str):
+    return elset[name] if isinstance(elset, dict) else getattr(elset, name)
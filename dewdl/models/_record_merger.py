@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+
+from dewdl._udl_time import sortable_udl_time
+from dewdl.enums import UDLBaseDataType, UDLDataMode, UDLDateFields
+
+Record = dict | BaseModel
+
+DEFAULT_KEYS: dict[UDLBaseDataType, tuple[str, ...]] = {
+    UDLBaseDataType.ELSET: ("satNo", "epoch"),
+    UDLBaseDataType.EO_OBSERVATION: ("idOnOrbit", "obTime"),
+    UDLBaseDataType.STATE_VECTOR: ("satNo", "epoch"),
+    UDLBaseDataType.ONORBIT: ("idOnOrbit",),
+}
+
+
+@dataclass(frozen=True)
+class MergePolicy:
+    """Decides which of two records with the same key is kept.
+
+    Records are ranked by dataMode (REAL over TEST), then by position in ``preferred_sources`` (earlier wins, unlisted
+    sources lose), then by ``newest_field`` (later wins).  A record only replaces the one already kept when it ranks
+    strictly higher, so ties keep the first record seen.  Subclass and override ``rank`` for other precedence rules.
+    """
+
+    prefer_real: bool = True
+    preferred_sources: tuple[str, ...] = ()
+    newest_field: str | None = "createdAt"
+
+    def rank(self, record: Record) -> tuple:
+        get = _getter(record)
+        real = self.prefer_real and get("dataMode") == UDLDataMode.REAL.value
+        source = get("source")
+        sources = self.preferred_sources
+        source_rank = -sources.index(source) if source in sources else -len(sources)
+        newest = get(self.newest_field) if self.newest_field else None
+        return real, source_rank, sortable_udl_time(newest) if newest else ""
+
+
+class RecordMerger:
+    """De-duplicates records pulled from several queries, such as overlapping windows or several sources.
+
+    Each record's key, by default ``(satNo, epoch)`` for elsets and ``(idOnOrbit, obTime)`` for EO observations, is
+    looked up in a hash index so merging is linear in the number of records.  The time field is normalized in the key,
+    so ``...01:00:00.0Z`` and ``...01:00:00.000000Z`` match.  Records whose key has a missing field fall back to the
+    UDL ``id``, and records without either are passed through.  Ranks are only computed when two records collide, so
+    unique records cost one dict lookup.
+    """
+
+    def __init__(
+        self,
+        data_type: UDLBaseDataType,
+        key: str | Sequence[str] | Callable[[Record], Hashable] | None = None,
+        policy: MergePolicy | None = None,
+    ) -> None:
+        self.data_type = data_type
+        self.time_field = UDLDateFields.get(data_type)
+        self.policy = policy or MergePolicy()
+        if callable(key):
+            self._key = key
+        else:
+            fields = (key,) if isinstance(key, str) else tuple(key or DEFAULT_KEYS.get(data_type, ("id",)))
+            time_index = fields.index(self.time_field) if self.time_field in fields else None
+            self._key = lambda record: _fields_key(record, fields, time_index)
+        self.seen = 0
+        self.duplicates = 0
+
+    def key(self, record: Record) -> Hashable | None:
+        return self._key(record)
+
+    def merge(self, *streams: Iterable[Record]) -> Iterator[Record]:
+        """Yields the winning record for every key once all streams are consumed, in first-seen order.
+
+        Memory grows with the number of unique records; use merge_sorted for streams ordered by time.
+
+        :param streams: Iterables of records, e.g. from UDLRequest.iter_records
+        """
+        index: dict[Hashable, list] = {}
+        for stream in streams:
+            for record in stream:
+                self._add(index, record)
+        for record, _ in index.values():
+            yield record
+
+    def merge_sorted(self, *streams: Iterable[Record]) -> Iterator[Record]:
+        """Merges streams that are each ordered by the data type's time field, yielding winners as time advances.
+
+        Only records sharing the current timestamp are held, so memory stays bounded however long the streams are.
+        The default keys include the time field, so every duplicate of a record arrives at the same timestamp.
+
+        :param streams: Iterables of records, each sorted ascending by the time field
+        """
+        pending: dict[Hashable, list] = {}
+        current = None
+        for time_value, record in heapq.merge(*(self._timed(stream) for stream in streams), key=lambda item: item[0]):
+            if time_value != current:
+                yield from self._flush(pending)
+                current = time_value
+            self._add(pending, record)
+        yield from self._flush(pending)
+
+    def _timed(self, stream: Iterable[Record]) -> Iterator[tuple[str, Record]]:
+        for record in stream:
+            value = _getter(record)(self.time_field)
+            yield (sortable_udl_time(value) if value else ""), record
+
+    def _add(self, index: dict[Hashable, list], record: Record) -> None:
+        self.seen += 1
+        key = self._key(record)
+        if key is None:
+            # a key no other record can have keeps pass-through records in first-seen order
+            index[object()] = [record, None]
+            return
+        entry = index.get(key)
+        if entry is None:
+            # the rank is filled in the first time the record collides
+            index[key] = [record, None]
+            return
+        self.duplicates += 1
+        if entry[1] is None:
+            entry[1] = self.policy.rank(entry[0])
+        rank = self.policy.rank(record)
+        if rank > entry[1]:
+            entry[0], entry[1] = record, rank
+
+    @staticmethod
+    def _flush(pending: dict[Hashable, list]) -> Iterator[Record]:
+        for record, _ in pending.values():
+            yield record
+        pending.clear()
+
+
+def _getter(record: Record) -> Callable[[str], object]:
+    if isinstance(record, dict):
+        return record.get
+    return lambda name: getattr(record, name, None)
+
+
+def _fields_key(record: Record, fields: tuple[str, ...], time_index: int | None) -> Hashable | None:
+    get = _getter(record)
+    values = tuple(map(get, fields))
+    if None not in values:
+        if time_index is None:
+            return values
+        return (*values[:time_index], sortable_udl_time(values[time_index]), *values[time_index + 1 :])
+    record_id = get("id")
+    return ("id", record_id) if record_id is not None else None
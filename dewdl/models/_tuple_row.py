@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from collections import namedtuple
+from collections.abc import Iterable, Sequence
+from functools import cache
+
+
+@cache
+def tuple_row_type(columns: tuple[str, ...]) -> type[tuple]:
+    """Gets the named tuple type used for rows with the given columns, e.g. rows of a select("satNo", "epoch") query."""
+    return namedtuple("TupleRow", columns, defaults=(None,) * len(columns))  # noqa: PYI024
+
+
+def tuple_rows(records: Iterable[dict], columns: Sequence[str]) -> list[tuple]:
+    """Converts records into named tuples holding only the given columns; missing fields become None.
+
+    :param records: Decoded records, e.g. from the tuple endpoint
+    :param columns: The columns to keep, in order
+    """
+    columns = tuple(columns)
+    row_type = tuple_row_type(columns)
+    return [row_type(*(record.get(column) for column in columns)) for record in records]
@@ -1,6 +1,36 @@
+from dewdl._json_codec import JSONCodec
+from dewdl.requests._ssl_context_cache import SSLContextCache
+from dewdl.requests._token_bucket import TokenBucketRateLimiter
+from dewdl.requests._udl_bulk_filedrop import FileDropReceipt, UDLBulkFileDrop
+from dewdl.requests._udl_circuit_breaker import UDLCircuitBreaker
+from dewdl.requests._udl_delta_sync import UDLDeltaSync
+from dewdl.requests._udl_fan_out import SourceResult, UDLFanOut
+from dewdl.requests._udl_file_download import FileDownloadReceipt, UDLFileDownload
 from dewdl.requests._udl_httpx_request import UDLRequest, UDLRequestPayload
+from dewdl.requests._udl_response_cache import UDLResponseCache
+from dewdl.requests._udl_retry_policy import UDLRetryPolicy
+from dewdl.requests._udl_session import UDLAsyncSession, UDLSession
+from dewdl.requests._udl_time_sliced_query import UDLTimeSlicedQuery
+from dewdl.requests._udl_zip_stream import UDLZipStream
 
 __all__ = [
     "UDLRequest",
-    "UDLRequestPayload"
+    "UDLRequestPayload",
+    "UDLSession",
+    "UDLAsyncSession",
+    "SSLContextCache",
+    "UDLTimeSlicedQuery",
+    "UDLResponseCache",
+    "UDLDeltaSync",
+    "TokenBucketRateLimiter",
+    "UDLBulkFileDrop",
+    "FileDropReceipt",
+    "UDLZipStream",
+    "JSONCodec",
+    "UDLRetryPolicy",
+    "UDLCircuitBreaker",
+    "UDLFileDownload",
+    "FileDownloadReceipt",
+    "UDLFanOut",
+    "SourceResult"
 ]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future
+
+
+class BackgroundLoop:
+    """A process-wide event loop running on a daemon thread, used to drive async requests from synchronous code."""
+
+    _loop: asyncio.AbstractEventLoop | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None or cls._loop.is_closed():
+                cls._loop = asyncio.new_event_loop()
+                threading.Thread(target=cls._loop.run_forever, name="dewdl-background-loop", daemon=True).start()
+        return cls._loop
+
+    @classmethod
+    def submit(cls, coroutine: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, cls.get_loop())
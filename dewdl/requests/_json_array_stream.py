@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator[Any]:
+    """Incrementally parses a JSON array from text chunks, yielding each top-level element as soon as it is complete.
+
+    Only the unparsed tail of the stream is buffered, so memory use is bounded by the largest single element.
+
+    :param chunks: Decoded text chunks of a JSON document whose top level is an array
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = finished = False
+    for chunk in chunks:
+        buffer += chunk
+        pos = 0
+        while True:
+            pos = _skip(buffer, pos, _WHITESPACE if not started else _WHITESPACE + ",")
+            if pos == len(buffer) or finished:
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                finished = True
+                pos += 1
+                break
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            # a scalar ending exactly at the chunk boundary may still be incomplete, e.g. a number split in two
+            if end == len(buffer):
+                break
+            yield element
+            pos = end
+        buffer = buffer[pos:]
+    if not finished:
+        raise ValueError("Incomplete JSON array")
+
+
+def _skip(buffer: str, pos: int, characters: str) -> int:
+    while pos < len(buffer) and buffer[pos] in characters:
+        pos += 1
+    return pos
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import time
+
+import httpx
+
+from dewdl.metrics._dewdl_metrics import PHASE_SECONDS, endpoint_label
+
+# httpcore trace events whose duration is a phase; ttfb spans from sending headers to receiving them
+_PHASES = {"connect_tcp": "connect", "start_tls": "tls", "receive_response_body": "download"}
+
+
+class _PhaseTrace:
+    """An httpcore trace callback that records connect, TLS, time-to-first-byte and download phases of a request."""
+
+    def __init__(self, request: httpx.Request) -> None:
+        self.endpoint = endpoint_label(str(request.url))
+        self.method = request.method
+        self._started: dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        # event names look like "http11.receive_response_headers.complete"
+        step, _, state = event_name.rpartition(".")
+        step = step.rpartition(".")[2]
+        now = time.perf_counter()
+        if state == "started":
+            self._started[step] = now
+        elif state == "complete":
+            if step in _PHASES and step in self._started:
+                self._observe(_PHASES[step], now - self._started[step])
+            elif step == "receive_response_headers" and "send_request_headers" in self._started:
+                self._observe("ttfb", now - self._started["send_request_headers"])
+
+    async def atrace(self, event_name: str, info: dict) -> None:
+        self(event_name, info)
+
+    def _observe(self, phase: str, seconds: float) -> None:
+        PHASE_SECONDS.observe(seconds, endpoint=self.endpoint, method=self.method, phase=phase)
+
+
+def trace_request(request: httpx.Request) -> None:
+    request.extensions.setdefault("trace", _PhaseTrace(request))
+
+
+async def trace_request_async(request: httpx.Request) -> None:
+    request.extensions.setdefault("trace", _PhaseTrace(request).atrace)
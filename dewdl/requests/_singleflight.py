@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key so only the first one runs and every caller shares its result.
+
+    Only calls that overlap in time are coalesced; once the shared call finishes, the next call runs again.  Errors are
+    shared the same way as results.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Future] = {}
+        self._async_calls: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[Hashable, asyncio.Task]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+        try:
+            call.set_result(func())
+        except BaseException as error:
+            call.set_exception(error)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return call.result()
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = loop.create_task(func())
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        # a caller that is cancelled must not cancel the request the other callers are waiting on
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + sum(len(calls) for calls in self._async_calls.values())
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import ssl
+import threading
+from pathlib import Path
+
+import httpx
+
+
+class SSLContextCache:
+    """Process-wide cache of client SSL contexts for NPE certificate authentication.
+
+    Contexts are keyed by the certificate and key paths and rebuilt when either file's modification time changes, so a
+    rotated certificate is picked up without restarting.  Every client dewdl creates shares the cached context, which
+    avoids re-reading the PEM files and rebuilding the trust store for each connection pool.
+    """
+
+    _contexts: dict[tuple[str, str], tuple[tuple[int, int], ssl.SSLContext]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, crt: Path | str, key: Path | str) -> ssl.SSLContext:
+        """Gets the SSL context for a certificate/key pair, loading it if it is new or has changed on disk.
+
+        :param crt: Path to the NPE certificate
+        :param key: Path to the NPE certificate key
+        """
+        crt_path, key_path = Path(crt), Path(key)
+        cache_key = (crt_path.as_posix(), key_path.as_posix())
+        mtimes = (crt_path.stat().st_mtime_ns, key_path.stat().st_mtime_ns)
+        with cls._lock:
+            cached = cls._contexts.get(cache_key)
+            if cached is None or cached[0] != mtimes:
+                context = httpx.create_ssl_context()
+                context.load_cert_chain(crt_path, key_path)
+                cached = (mtimes, context)
+                cls._contexts[cache_key] = cached
+        return cached[1]
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._contexts.clear()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from appdirs import user_cache_dir
+
+from dewdl._file_lock import lock_fd, unlock_fd
+from dewdl.metrics._dewdl_metrics import THROTTLE_SECONDS
+
+_STATE = struct.Struct("dd")
+
+
+class TokenBucketRateLimiter:
+    """A token bucket that can be shared by every process on a host through a locked state file.
+
+    Tokens refill at ``rate`` per second up to ``capacity``.  With a path, the bucket state lives in that file and
+    each acquisition takes an exclusive file lock for the few microseconds needed to update it, so worker processes
+    using the same credential draw from one budget.  Without a path the bucket is local to the process.
+    """
+
+    RATE_LIMIT_DIR_NAME = "rate_limits"
+
+    _registry: dict[tuple[str, str], TokenBucketRateLimiter] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, rate: float, capacity: float = 1.0, path: Path | str | None = None, name: str = "local") -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.path = Path(path) if path else None
+        self.name = name
+        self._lock = threading.Lock()
+        self._local_state = (capacity, time.time())
+
+    @classmethod
+    def for_credential(
+        cls, identity: str | None, endpoint_class: str, rate: float, capacity: float = 1.0
+    ) -> TokenBucketRateLimiter:
+        """Gets the host-wide limiter for a credential and class of endpoint, e.g. "secure_messaging".
+
+        :param identity: A string identifying the credential, such as the user name or certificate path
+        :param endpoint_class: The group of endpoints that share the limit
+        :param rate: Requests per second
+        :param capacity: The largest burst allowed
+        """
+        registry_key = (identity or "", endpoint_class)
+        with cls._registry_lock:
+            limiter = cls._registry.get(registry_key)
+            if limiter is None:
+                file_name = hashlib.sha256("|".join(registry_key).encode("utf-8")).hexdigest()
+                path = Path(user_cache_dir("dewdl"), cls.RATE_LIMIT_DIR_NAME, f"{file_name}.bucket")
+                limiter = cls(rate, capacity, path, name=endpoint_class)
+                cls._registry[registry_key] = limiter
+        return limiter
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Takes tokens without blocking, returning 0.0 on success or the seconds to wait before they are available.
+
+        :param tokens: The number of tokens to take
+        """
+        if tokens > self.capacity:
+            # the bucket never holds more than capacity, so these tokens could never be taken
+            raise ValueError(f"Cannot take {tokens} tokens from a bucket with capacity {self.capacity}")
+        with self._lock, self._state() as state:
+            now = time.time()
+            available, updated = state[0]
+            # wall-clock time is used because it is shared between processes; never refill backwards
+            available = min(self.capacity, available + max(now - updated, 0.0) * self.rate)
+            if available >= tokens:
+                state[0] = (available - tokens, now)
+                return 0.0
+            state[0] = (available, now)
+            return (tokens - available) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: float | None = None) -> bool:
+        """Blocks until the tokens are taken, or returns False if that would take longer than timeout."""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        while (wait := self.try_acquire(tokens)) > 0:
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+        THROTTLE_SECONDS.observe(time.monotonic() - started, limiter=self.name)
+        return True
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Waits for the tokens with asyncio.sleep so the event loop is never blocked.
+
+        The state file lock can be held by another process, so it is taken on a worker thread.
+        """
+        started = time.monotonic()
+        while (wait := await asyncio.to_thread(self.try_acquire, tokens)) > 0:
+            await asyncio.sleep(wait)
+        THROTTLE_SECONDS.observe(time.monotonic() - started, limiter=self.name)
+
+    @contextmanager
+    def _state(self) -> Iterator[list[tuple[float, float]]]:
+        if self.path is None:
+            state = [self._local_state]
+            yield state
+            self._local_state = state[0]
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            lock_fd(fd)
+            raw = os.read(fd, _STATE.size)
+            state = [_STATE.unpack(raw) if len(raw) == _STATE.size else (self.capacity, time.time())]
+            yield state
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, _STATE.pack(*state[0]))
+        finally:
+            unlock_fd(fd)
+            os.close(fd)
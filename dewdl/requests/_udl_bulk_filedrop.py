@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import httpx
+
+from dewdl import DEWDL_LOG
+from dewdl._json_codec import JSONCodec
+from dewdl.enums import UDLFileDropType
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+from dewdl.requests._udl_httpx_request import UDLRequest
+from dewdl.udl_actions import UDLFileDrop
+
+
+@dataclass(frozen=True)
+class FileDropReceipt:
+    batch: int
+    records: int
+    size: int
+    attempts: int
+    response: str | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class UDLBulkFileDrop:
+    """Uploads an iterable of records to a filedrop endpoint as size-bounded batches sent concurrently.
+
+    Records are serialized one at a time and packed into JSON array bodies of at most ``max_batch_bytes``, so a
+    generator of any length can be uploaded with only ``max_workers * 2`` batches held in memory.  Each batch is
+    retried on its own when UDL returns 429/5xx or the connection fails.
+    """
+
+    DEFAULT_MAX_BATCH_BYTES = 8 * 1024 * 1024
+    DEFAULT_MAX_WORKERS = 4
+    DEFAULT_RETRIES = 3
+    DEFAULT_BACKOFF = 1.0
+
+    def __init__(
+        self,
+        filedrop_type: UDLFileDropType,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ) -> None:
+        self.endpoint = UDLFileDrop(filedrop_type)
+        self.max_batch_bytes = max_batch_bytes
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+
+    def upload(self, records: Iterable[dict]) -> list[FileDropReceipt]:
+        """Uploads every record, returning one receipt per batch in batch order.
+
+        :param records: The records to upload; may be a generator
+        """
+        in_flight = threading.BoundedSemaphore(self.max_workers * 2)
+        futures: list[Future] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dewdl-filedrop") as executor:
+            for batch_number, (body, count) in enumerate(self.batches(records)):
+                in_flight.acquire()
+                future = executor.submit(self._upload_batch, batch_number, body, count)
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.append(future)
+        receipts = [future.result() for future in futures]
+        failed = sum(not receipt.ok for receipt in receipts)
+        DEWDL_LOG.info(f"Filedrop to {self.endpoint.to_string()} sent {len(receipts)} batches, {failed} failed")
+        return receipts
+
+    def batches(self, records: Iterable[dict]) -> Iterator[tuple[bytes, int]]:
+        """Packs records into JSON array bodies no larger than max_batch_bytes, yielding (body, record count)."""
+        codec = JSONCodec.active()
+        parts: list[bytes] = []
+        size = 2  # the enclosing brackets
+        for record in records:
+            encoded = codec.encode(record)
+            if parts and size + len(encoded) + 1 > self.max_batch_bytes:
+                yield b"[" + b",".join(parts) + b"]", len(parts)
+                parts, size = [], 2
+            if len(encoded) + 2 > self.max_batch_bytes:
+                DEWDL_LOG.warning(f"A single record of {len(encoded)} bytes exceeds the batch limit")
+            parts.append(encoded)
+            size += len(encoded) + (1 if len(parts) > 1 else 0)
+        if parts:
+            yield b"[" + b",".join(parts) + b"]", len(parts)
+
+    def _upload_batch(self, batch_number: int, body: bytes, count: int) -> FileDropReceipt:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = UDLRequest.filedrop(self.endpoint, body)
+                return FileDropReceipt(batch_number, count, len(body), attempt, response=response)
+            except UDLCircuitOpenError as error:
+                # the endpoint is known to be down, so the batch fails fast instead of waiting out its retries
+                return FileDropReceipt(batch_number, count, len(body), attempt, error=error)
+            except (UDLRequestError, httpx.TransportError) as error:
+                retryable = isinstance(error, httpx.TransportError) or error.status_code in (429, 500, 502, 503, 504)
+                if not retryable or attempt > self.retries:
+                    return FileDropReceipt(batch_number, count, len(body), attempt, error=error)
+                delay = self.backoff * 2 ** (attempt - 1) * (0.5 + random.random())  # noqa: S311
+                DEWDL_LOG.warning(f"Filedrop batch {batch_number} failed ({error}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+            except Exception as error:
+                # an unexpected failure fails only this batch, so upload keeps the receipts of the others
+                DEWDL_LOG.warning(f"Filedrop batch {batch_number} failed: {error!r}")
+                return FileDropReceipt(batch_number, count, len(body), attempt, error=error)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import httpx
+
+from dewdl import DEWDL_LOG
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+
+
+@dataclass
+class _Circuit:
+    failures: int = 0
+    opened_at: float | None = None
+    trial_started_at: float | None = None
+
+
+class UDLCircuitBreaker:
+    """Fails requests fast for an endpoint that keeps failing, instead of letting every worker wait on it.
+
+    Endpoints are keyed by host and path, so one failing data type does not block the others.  After
+    ``failure_threshold`` consecutive connection failures or 5xx responses the circuit opens and requests raise
+    ``UDLCircuitOpenError`` without being sent.  After ``reset_timeout`` seconds a single trial request is let through;
+    its success closes the circuit and its failure opens it again.
+    """
+
+    DEFAULT_FAILURE_THRESHOLD = 5
+    DEFAULT_RESET_TIMEOUT = 30.0
+
+    def __init__(
+        self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def before_request(self, url: str) -> None:
+        """Raises UDLCircuitOpenError if the endpoint's circuit is open and no trial request is due."""
+        key = self.endpoint_key(url)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened_at is None:
+                return
+            now = time.monotonic()
+            retry_in = circuit.opened_at + self.reset_timeout - now
+            # a trial that never reported back, e.g. because it was cancelled, is replaced after another timeout
+            trial_pending = circuit.trial_started_at is not None and now - circuit.trial_started_at < self.reset_timeout
+            if retry_in > 0 or trial_pending:
+                raise UDLCircuitOpenError(key, max(retry_in, 0.0))
+            circuit.trial_started_at = now
+
+    def record(self, url: str, error: Exception | None) -> None:
+        """Records the outcome of a request; errors that do not indicate an unhealthy endpoint count as successes.
+
+        :param url: The requested URL
+        :param error: The error raised by the request, or None
+        """
+        key = self.endpoint_key(url)
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.trial_started_at = None
+            if error is None or not _is_endpoint_failure(error):
+                circuit.failures = 0
+                circuit.opened_at = None
+                return
+            circuit.failures += 1
+            if circuit.opened_at is not None or circuit.failures >= self.failure_threshold:
+                if circuit.opened_at is None:
+                    DEWDL_LOG.warning(f"Opening circuit for {key} after {circuit.failures} consecutive failures")
+                circuit.opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._circuits.clear()
+
+
+def _is_endpoint_failure(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    return isinstance(error, UDLRequestError) and error.status_code >= 500
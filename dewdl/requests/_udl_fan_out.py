@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+
+import httpx
+
+from dewdl import DEWDL_LOG
+from dewdl._json_codec import JSONCodec
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+from dewdl.requests._background_loop import BackgroundLoop
+from dewdl.requests._udl_httpx_request import UDLRequest
+from dewdl.udl_actions import UDLQuery
+
+
+@dataclass(frozen=True)
+class SourceResult:
+    source: str | None
+    descriptor: str | None
+    query: UDLQuery
+    records: list[dict] | None = None
+    error: Exception | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class UDLFanOut:
+    """Runs a query built with ``from_sources``/``with_descriptors`` as one request per source and descriptor.
+
+    The requests share one connection pool and run concurrently, and results are yielded as each one completes, so a
+    slow or failing provider never holds back the others.  Failures, including a per-request ``timeout``, are reported
+    on their ``SourceResult`` instead of being raised, and are collected in ``failures`` for a report at the end.
+    """
+
+    def __init__(
+        self,
+        query: UDLQuery,
+        max_concurrency: int = UDLRequest.DEFAULT_MAX_CONCURRENCY,
+        timeout: float | None = None,
+    ) -> None:
+        self.queries = query.fan_out()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.failures: dict[tuple[str | None, str | None], Exception] = {}
+
+    async def results(self) -> AsyncIterator[SourceResult]:
+        """Yields a SourceResult for every source and descriptor as its request completes."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def _get(query: UDLQuery) -> SourceResult:
+            async with semaphore:
+                started = loop.time()
+                try:
+                    response = await asyncio.wait_for(UDLRequest.get(query, async_flag=True), self.timeout)
+                    records = _decode(response)
+                except (
+                    UDLRequestError,
+                    UDLCircuitOpenError,
+                    httpx.TransportError,
+                    asyncio.TimeoutError,
+                    _InvalidBodyError,
+                ) as error:
+                    return SourceResult(
+                        query.source, query.descriptor, query, error=error, seconds=loop.time() - started
+                    )
+                return SourceResult(query.source, query.descriptor, query, records, seconds=loop.time() - started)
+
+        tasks = [asyncio.ensure_future(_get(query)) for query in self.queries]
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                if not result.ok:
+                    self.failures[(result.source, result.descriptor)] = result.error
+                    DEWDL_LOG.warning(
+                        f"Fan-out request for {result.source or result.descriptor} failed: {result.error}"
+                    )
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def __iter__(self) -> Iterator[SourceResult]:
+        """Synchronous form of results that runs the requests on a background event loop."""
+        results = queue.Queue()
+        done = object()
+
+        async def _pump():
+            try:
+                async for result in self.results():
+                    results.put(result)
+            finally:
+                results.put(done)
+
+        future = BackgroundLoop.submit(_pump())
+        try:
+            while (result := results.get()) is not done:
+                yield result
+            future.result()
+        finally:
+            future.cancel()
+
+    def report(self) -> dict[str, str]:
+        """Summarizes the failed requests seen so far by source and descriptor, e.g. for logging."""
+        return {
+            "/".join(part for part in key if part is not None): f"{type(error).__name__}: {error}"
+            for key, error in self.failures.items()
+        }
+
+
+class _InvalidBodyError(ValueError):
+    pass
+
+
+def _decode(response: httpx.Response) -> list[dict]:
+    try:
+        return JSONCodec.active().decode(response.content)
+    except ValueError as error:
+        raise _InvalidBodyError(f"Response body is not valid JSON: {error}") from error
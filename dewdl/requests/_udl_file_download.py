@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import time
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from dewdl import DEWDL_LOG
+from dewdl.enums import UDLQueryType
+from dewdl.exceptions import UDLDownloadVerificationError, UDLRequestError
+from dewdl.requests._udl_httpx_request import UDLRequest
+from dewdl.requests.udl_request_payload import UDLRequestPayload
+from dewdl.udl_actions import UDLGetFile
+
+_CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)")
+
+
+@dataclass(frozen=True)
+class FileDownloadReceipt:
+    file_id: str
+    path: Path
+    size: int
+    attempts: int
+    resumed_from: int = 0
+    checksum: str | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class UDLFileDownload:
+    """Streams getFile responses to disk in chunks, resuming interrupted transfers with HTTP Range requests.
+
+    Each file is written to ``<name>.part`` and only renamed once it is complete and verified, so at most one chunk per
+    worker is held in memory and a partial file left by a dropped connection, or by an earlier run, is continued from
+    where it stopped.  Servers that ignore the Range header are handled by starting the file over.
+    """
+
+    DEFAULT_CHUNK_SIZE = 1024 * 1024
+    DEFAULT_MAX_WORKERS = 4
+    DEFAULT_RETRIES = 3
+    DEFAULT_BACKOFF = 1.0
+    PART_SUFFIX = ".part"
+
+    def __init__(
+        self,
+        data_endpoint: UDLQueryType,
+        directory: Path | str = ".",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        hash_algorithm: str = "sha256",
+    ) -> None:
+        self.data_endpoint = data_endpoint
+        self.directory = Path(directory)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.hash_algorithm = hash_algorithm
+
+    def download(
+        self,
+        file_id: str,
+        path: Path | str | None = None,
+        expected_size: int | None = None,
+        checksum: str | None = None,
+    ) -> FileDownloadReceipt:
+        """Downloads one file, returning a receipt that holds the error instead of raising when it fails.
+
+        :param file_id: The id passed to getFile
+        :param path: Where to write the file; defaults to the file id inside the download directory
+        :param expected_size: The size the file must have; defaults to the size reported by UDL
+        :param checksum: The hex digest, using hash_algorithm, the file must have
+        """
+        path = Path(path) if path else self.directory / file_id
+        part = path.with_name(path.name + self.PART_SUFFIX)
+        resumed_from = _size(part)
+        attempt = 0
+        failures = 0
+        while True:
+            attempt += 1
+            offset = _size(part)
+            try:
+                total = self._transfer(file_id, part, offset)
+            except (UDLRequestError, httpx.TransportError) as error:
+                # a retry that moved the file forward does not count against the retry budget
+                failures = 0 if _size(part) > offset else failures + 1
+                retryable = isinstance(error, httpx.TransportError) or error.status_code in (429, 500, 502, 503, 504)
+                if not retryable or failures > self.retries:
+                    return FileDownloadReceipt(file_id, path, _size(part), attempt, resumed_from, error=error)
+                delay = self.backoff * 2 ** (failures - 1) * (0.5 + random.random())  # noqa: S311
+                DEWDL_LOG.warning(
+                    f"Download of {file_id} failed at {_size(part)} bytes ({error}); retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+            except Exception as error:
+                # anything else, e.g. a full disk, fails only this file so download_many keeps the other receipts
+                DEWDL_LOG.warning(f"Download of {file_id} failed: {error!r}")
+                return FileDownloadReceipt(file_id, path, _size(part), attempt, resumed_from, error=error)
+            else:
+                break
+        try:
+            digest = self._verify(file_id, part, expected_size if expected_size is not None else total, checksum)
+            part.replace(path)
+        except UDLDownloadVerificationError as error:
+            part.unlink(missing_ok=True)
+            return FileDownloadReceipt(file_id, path, 0, attempt, resumed_from, error=error)
+        except OSError as error:
+            return FileDownloadReceipt(file_id, path, _size(part), attempt, resumed_from, error=error)
+        return FileDownloadReceipt(file_id, path, _size(path), attempt, resumed_from, digest)
+
+    def download_many(
+        self, file_ids: Iterable[str], checksums: Mapping[str, str] | None = None
+    ) -> list[FileDownloadReceipt]:
+        """Downloads files into the download directory with at most max_workers at once, returning receipts in order.
+
+        :param file_ids: The ids passed to getFile
+        :param checksums: Optional hex digests by file id
+        """
+        checksums = checksums or {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dewdl-download") as executor:
+            futures = [executor.submit(self.download, file_id, checksum=checksums.get(file_id)) for file_id in file_ids]
+        receipts = [future.result() for future in futures]
+        failed = sum(not receipt.ok for receipt in receipts)
+        DEWDL_LOG.info(f"Downloaded {len(receipts)} files from {self.data_endpoint.value}, {failed} failed")
+        return receipts
+
+    def _transfer(self, file_id: str, part: Path, offset: int) -> int | None:
+        """Appends the rest of the file to part, returning the full size when UDL reports it."""
+        part.parent.mkdir(parents=True, exist_ok=True)
+        endpoint = UDLGetFile(self.data_endpoint, file_id)
+        token, b64_key, crt, key = UDLRequest._get_configs()
+        payload = UDLRequestPayload(endpoint=endpoint, token=token, b64_key=b64_key, crt=crt, key=key)
+        headers = UDLRequest._auth_headers(payload)
+        # ranges and sizes refer to the bytes on the wire, so the body is stored exactly as sent and never decoded
+        headers["Accept-Encoding"] = "identity"
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        session = UDLRequest._get_session(payload)
+        with session.stream("GET", endpoint.to_string(), headers=headers) as response:
+            status = response.status_code
+            start, total = _content_range(response)
+            if status == httpx.codes.REQUESTED_RANGE_NOT_SATISFIABLE and offset and total == offset:
+                return total
+            if status == httpx.codes.OK or (status == httpx.codes.PARTIAL_CONTENT and start == offset):
+                if status == httpx.codes.OK:
+                    if offset:
+                        DEWDL_LOG.info(f"Range not honoured for {file_id}; downloading it from the start")
+                    total = int(response.headers["content-length"]) if "content-length" in response.headers else None
+                with part.open("ab" if status == httpx.codes.PARTIAL_CONTENT else "wb") as file:
+                    # chunks are written as they arrive so a dropped connection loses nothing already received
+                    for chunk in response.iter_raw():
+                        file.write(chunk)
+                return total
+            if not offset or status not in (httpx.codes.PARTIAL_CONTENT, httpx.codes.REQUESTED_RANGE_NOT_SATISFIABLE):
+                response.read()
+                raise UDLRequestError(response)
+        # the partial file no longer lines up with the file on the server
+        DEWDL_LOG.info(f"Partial download of {file_id} does not match the server; downloading it from the start")
+        part.unlink(missing_ok=True)
+        return self._transfer(file_id, part, 0)
+
+    def _verify(self, file_id: str, part: Path, expected_size: int | None, checksum: str | None) -> str | None:
+        size = _size(part)
+        if expected_size is not None and size != expected_size:
+            raise UDLDownloadVerificationError(file_id, f"{expected_size} bytes", f"{size} bytes")
+        if checksum is None:
+            return None
+        digest = hashlib.new(self.hash_algorithm)
+        with part.open("rb") as file:
+            while chunk := file.read(self.chunk_size):
+                digest.update(chunk)
+        if digest.hexdigest() != checksum.lower():
+            raise UDLDownloadVerificationError(file_id, f"{self.hash_algorithm} {checksum}", digest.hexdigest())
+        return digest.hexdigest()
+
+
+def _size(path: Path) -> int:
+    return path.stat().st_size if path.exists() else 0
+
+
+def _content_range(response: httpx.Response) -> tuple[int | None, int | None]:
+    match = _CONTENT_RANGE.fullmatch(response.headers.get("content-range", "").strip())
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return (int(start) if start else None), (int(total) if total != "*" else None)
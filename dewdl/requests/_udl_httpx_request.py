@@ -1,22 +1,64 @@
-import json
-from pathlib import Path
+import asyncio
+import queue
+import time
+import warnings
+from collections.abc import AsyncIterator, Iterable, Iterator
 
 import httpx
+from pydantic import BaseModel
 
 from dewdl import DEWDL_LOG, DewDLConfigs
+from dewdl._json_codec import JSONCodec
 from dewdl.enums import UDLRequestSuccessCode
-from dewdl.exceptions import UDLRequestError
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+from dewdl.metrics._dewdl_metrics import (
+    REQUEST_BYTES,
+    REQUEST_SECONDS,
+    REQUESTS,
+    RESPONSE_BYTES,
+    RESPONSE_SIZE,
+    RETRIES,
+    RETRY_SLEEP_SECONDS,
+    endpoint_label,
+)
+from dewdl.models._columnar_result import ColumnarResult
+from dewdl.models._tuple_row import tuple_rows
+from dewdl.requests._background_loop import BackgroundLoop
+from dewdl.requests._json_array_stream import iter_json_array
+from dewdl.requests._singleflight import SingleFlight
+from dewdl.requests._udl_circuit_breaker import UDLCircuitBreaker
+from dewdl.requests._udl_response_cache import UDLResponseCache
+from dewdl.requests._udl_retry_policy import UDLRetryPolicy
+from dewdl.requests._udl_session import UDLAsyncSession, UDLSession
+from dewdl.requests._udl_zip_stream import UDLZipStream
 from dewdl.requests.udl_request_payload import UDLRequestPayload
-from dewdl.udl_actions import UDLBaseAction, UDLFileDrop, UDLQuery
+from dewdl.udl_actions import UDLBaseAction, UDLFileDrop, UDLQuery, UDLQuerySpec
+
+GatherError = UDLRequestError | UDLCircuitOpenError | httpx.TransportError
 
 
 class UDLRequest:
+    DEFAULT_MAX_CONCURRENCY = 16
+    _session: UDLSession | None = None
+    _async_session: UDLAsyncSession | None = None
+    _cache: UDLResponseCache | None = None
+    _retry_policy: UDLRetryPolicy | None = UDLRetryPolicy()
+    _circuit_breaker: UDLCircuitBreaker | None = UDLCircuitBreaker()
+    _singleflight: SingleFlight | None = SingleFlight()
+
     @staticmethod
     def format_booleans(input_str: str) -> str:
         """Converts the string 'True' to 'true' and 'False' to 'false'.
 
+        Deprecated: request bodies are encoded by JSONCodec, which already writes JSON booleans.
+
         :param input_str: The string to convert
         """
+        warnings.warn(
+            "UDLRequest.format_booleans is deprecated; JSONCodec already writes JSON booleans",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         return input_str.replace("True", "true").replace("False", "false")
 
     @staticmethod
@@ -31,21 +73,34 @@ class UDLRequest:
         return token, b64_key, crt, key
 
     @staticmethod
-    def get(udl_endpoint: UDLQuery, async_flag: bool = False) -> httpx.Response:
+    def get(udl_endpoint: UDLQuery | UDLQuerySpec, async_flag: bool = False) -> httpx.Response:
         token, b64_key, crt, key = UDLRequest._get_configs()
         payload = UDLRequestPayload(
             endpoint=udl_endpoint, token=token, b64_key=b64_key, crt=crt, key=key, async_flag=async_flag
         )
-        return UDLRequest._make_request(payload=payload)
+        if UDLRequest._singleflight is None:
+            return UDLRequest._fetch(payload)
+        # identical queries in flight at the same time share one request
+        flight_key = (UDLRequest._auth_identity(payload), UDLRequest.canonical_url(udl_endpoint))
+        if async_flag:
+            return UDLRequest._singleflight.do_async(flight_key, lambda: UDLRequest._fetch(payload))
+        return UDLRequest._singleflight.do(flight_key, lambda: UDLRequest._fetch(payload))
+
+    @staticmethod
+    def canonical_url(udl_endpoint: UDLBaseAction | UDLQuerySpec) -> str:
+        """Gets the URL of an endpoint with its parameters sorted, so equal queries give identical strings."""
+        if isinstance(udl_endpoint, UDLQuery):
+            udl_endpoint = UDLQuerySpec.from_query(udl_endpoint)
+        return udl_endpoint.to_string()
 
     @staticmethod
-    def post(udl_endpoint: UDLQuery, post_data: dict | bytes, async_flag: bool = False) -> str:
+    def post(udl_endpoint: UDLQuery, post_data: dict | bytes | UDLZipStream, async_flag: bool = False) -> str:
         token, b64_key, crt, key = UDLRequest._get_configs()
         payload = UDLRequestPayload(
             endpoint=udl_endpoint,
             method="POST",
             post_body=post_data if isinstance(post_data, dict) else None,
-            zip_data=post_data if isinstance(post_data, bytes) else None,
+            zip_data=post_data if isinstance(post_data, (bytes, UDLZipStream)) else None,
             token=token,
             b64_key=b64_key,
             crt=crt,
@@ -55,7 +110,7 @@ class UDLRequest:
         return UDLRequest._make_request(payload=payload)
 
     @staticmethod
-    def filedrop(udl_endpoint: UDLFileDrop, post_body: list[dict], async_flag: bool = False) -> None:
+    def filedrop(udl_endpoint: UDLFileDrop, post_body: list[dict] | bytes, async_flag: bool = False) -> None:
         token, b64_key, crt, key = UDLRequest._get_configs()
         payload = UDLRequestPayload(
             endpoint=udl_endpoint,
@@ -64,17 +119,208 @@ class UDLRequest:
             b64_key=b64_key,
             crt=crt,
             key=key,
-            post_body=post_body,
+            post_body=post_body if not isinstance(post_body, bytes) else None,
+            json_data=post_body if isinstance(post_body, bytes) else None,
             async_flag=async_flag,
             is_filedrop=True,
         )
         return UDLRequest._make_request(payload=payload)
 
+    @staticmethod
+    def iter_records(udl_endpoint: UDLQuery, model: type[BaseModel] | None = None) -> Iterator[dict | BaseModel]:
+        """Streams a GET response and yields its records one at a time instead of buffering the whole body.
+
+        :param udl_endpoint: The query to request
+        :param model: An optional model, e.g. Elset, that each record is validated into
+        """
+        token, b64_key, crt, key = UDLRequest._get_configs()
+        payload = UDLRequestPayload(endpoint=udl_endpoint, token=token, b64_key=b64_key, crt=crt, key=key)
+        DEWDL_LOG.info(f"Streaming GET from {udl_endpoint.to_string()}")
+        session = UDLRequest._get_session(payload)
+        with session.stream("GET", udl_endpoint.to_string(), headers=UDLRequest._auth_headers(payload)) as response:
+            if response.status_code != UDLRequestSuccessCode.GET.value:
+                response.read()
+                raise UDLRequestError(response)
+            for record in iter_json_array(response.iter_text()):
+                yield model.model_validate(record) if model else record
+
+    @staticmethod
+    def get_rows(udl_endpoint: UDLQuery | UDLQuerySpec) -> list[tuple]:
+        """Gets the records of a select() query as light named tuples holding only the selected columns.
+
+        :param udl_endpoint: A query with columns selected, e.g. UDLQuery(UDLBaseDataType.ELSET).select("satNo")
+        """
+        columns = UDLRequest._selected_columns(udl_endpoint)
+        return tuple_rows(JSONCodec.active().decode(UDLRequest.get(udl_endpoint).content), columns)
+
+    @staticmethod
+    def get_columns(udl_endpoint: UDLQuery | UDLQuerySpec, model: type[BaseModel] | None = None) -> ColumnarResult:
+        """Gets the records of a select() query as a ColumnarResult holding only the selected columns.
+
+        :param udl_endpoint: A query with columns selected
+        :param model: An optional model, e.g. Elset, whose field types are used for the columns
+        """
+        columns = UDLRequest._selected_columns(udl_endpoint)
+        return ColumnarResult.from_response(UDLRequest.get(udl_endpoint), model, columns)
+
+    @staticmethod
+    def _selected_columns(udl_endpoint: UDLQuery | UDLQuerySpec) -> tuple[str, ...]:
+        if not udl_endpoint.columns:
+            raise ValueError("The query has no columns selected; call select() first")
+        return udl_endpoint.columns
+
+    @staticmethod
+    async def gather(
+        queries: Iterable[UDLQuery], max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> AsyncIterator[tuple[UDLQuery, httpx.Response | GatherError]]:
+        """Runs GET requests for many queries with at most max_concurrency in flight, yielding them as they complete.
+
+        :param queries: The queries to request
+        :param max_concurrency: The maximum number of requests in flight at once
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _get(query: UDLQuery) -> tuple[UDLQuery, httpx.Response | GatherError]:
+            async with semaphore:
+                try:
+                    return query, await UDLRequest.get(query, async_flag=True)
+                except (UDLRequestError, UDLCircuitOpenError, httpx.TransportError) as error:
+                    # one failed query must not cancel the others, so its error is yielded in place of a response
+                    return query, error
+
+        tasks = [asyncio.ensure_future(_get(query)) for query in queries]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def gather_sync(
+        queries: Iterable[UDLQuery], max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> Iterator[tuple[UDLQuery, httpx.Response | GatherError]]:
+        """Synchronous form of gather that runs the requests on a background event loop.
+
+        :param queries: The queries to request
+        :param max_concurrency: The maximum number of requests in flight at once
+        """
+        results = queue.Queue()
+        done = object()
+
+        async def _pump():
+            try:
+                async for result in UDLRequest.gather(queries, max_concurrency):
+                    results.put(result)
+            finally:
+                results.put(done)
+
+        future = BackgroundLoop.submit(_pump())
+        try:
+            while (result := results.get()) is not done:
+                yield result
+            future.result()
+        finally:
+            future.cancel()
+
+    @staticmethod
+    def use_session(session: UDLSession | UDLAsyncSession | None, async_flag: bool = False) -> None:
+        """Routes every request through the given session instead of the shared session for the configured credentials.
+
+        :param session: The session to use, or None to go back to the shared sessions
+        :param async_flag: Whether to clear the async session when session is None
+        """
+        if isinstance(session, UDLAsyncSession) or (session is None and async_flag):
+            UDLRequest._async_session = session
+        else:
+            UDLRequest._session = session
+
+    @staticmethod
+    def use_cache(cache: UDLResponseCache | None) -> None:
+        """Serves synchronous GET requests through the given response cache, or disables caching when None.
+
+        :param cache: The cache to use
+        """
+        UDLRequest._cache = cache
+
+    @staticmethod
+    def use_coalescing(enabled: bool) -> None:
+        """Turns sharing one request between concurrent identical GETs on or off.
+
+        :param enabled: Whether to coalesce identical in-flight GET requests
+        """
+        UDLRequest._singleflight = SingleFlight() if enabled else None
+
+    @staticmethod
+    def use_retry_policy(policy: UDLRetryPolicy | None) -> None:
+        """Replays failed idempotent requests according to the policy, or disables retries when None.
+
+        :param policy: The retry policy to use
+        """
+        UDLRequest._retry_policy = policy
+
+    @staticmethod
+    def use_circuit_breaker(breaker: UDLCircuitBreaker | None) -> None:
+        """Fails requests fast for endpoints the breaker considers down, or disables the breaker when None.
+
+        :param breaker: The circuit breaker to use
+        """
+        UDLRequest._circuit_breaker = breaker
+
+    @staticmethod
+    def _fetch(payload: UDLRequestPayload) -> httpx.Response:
+        if UDLRequest._cache is not None and not payload.async_flag:
+            return UDLRequest._cache.fetch(
+                payload.endpoint.to_string(),
+                UDLRequest._auth_identity(payload),
+                getattr(payload.endpoint, "base_data_type", None),
+                lambda: UDLRequest._make_request(payload=payload),
+            )
+        return UDLRequest._make_request(payload=payload)
+
+    @staticmethod
+    def _auth_identity(payload: UDLRequestPayload) -> str | None:
+        if payload.token or payload.b64_key:
+            return payload.token or payload.b64_key
+        return str(payload.crt) if payload.crt else None
+
+    @staticmethod
+    def _get_session(payload: UDLRequestPayload) -> UDLSession:
+        return UDLRequest._session or UDLSession.shared(payload.crt, payload.key)
+
+    @staticmethod
+    def _get_async_session(payload: UDLRequestPayload) -> UDLAsyncSession:
+        return UDLRequest._async_session or UDLAsyncSession.shared(payload.crt, payload.key)
+
     @staticmethod
     def _make_request(payload: UDLRequestPayload) -> httpx.Response:
-        cert = UDLRequest._check_cert(payload.crt, payload.key)
-        response_func, httpx_client = UDLRequest._method_to_func(cert, payload.method, payload.async_flag)
+        response_func = UDLRequest._method_to_func(payload.method, payload.async_flag)
         request_args = {"udl_endpoint": payload.endpoint}
+        headers = UDLRequest._auth_headers(payload)
+        if payload.method == "POST":
+            UDLRequest._setup_post_params(payload, request_args, headers)
+        request_args["headers"] = headers
+        DEWDL_LOG.info(
+            f"Perfoming {payload.method} to {payload.endpoint.to_string()} "
+            f"using {'token' if payload.token else 'b64_key' if payload.b64_key else 'cert'}"
+        )
+        if payload.async_flag:
+            return UDLRequest._make_async_request(payload, response_func, request_args)
+        request_args["client"] = UDLRequest._get_session(payload).client
+        attempt = 0
+        while True:
+            attempt += 1
+            started = UDLRequest._before_attempt(payload)
+            try:
+                response = response_func(**request_args)
+            except (UDLRequestError, httpx.TransportError) as error:
+                time.sleep(UDLRequest._after_failure(payload, request_args, started, attempt, error))
+            else:
+                UDLRequest._after_success(payload, request_args, started, response)
+                return response
+
+    @staticmethod
+    def _auth_headers(payload: UDLRequestPayload) -> dict:
         headers = {}
         if payload.token:
             auth_header_value = payload.token
@@ -84,56 +330,106 @@ class UDLRequest:
             auth_header_value = None
         if auth_header_value:
             headers["Authorization"] = auth_header_value
-        if payload.method == "POST":
-            UDLRequest._setup_post_params(payload, request_args, headers)
-        request_args["headers"] = headers
-        DEWDL_LOG.info(
-            f"Perfoming {payload.method} to {payload.endpoint.to_string()} "
-            f"using {'token' if payload.token else 'b64_key' if payload.b64_key else 'cert'}"
-        )
-        if payload.async_flag:
-            request_args["client"] = httpx_client
-            return response_func(**request_args)
-        with httpx_client as client:
-            request_args["client"] = client
-            return response_func(**request_args)
+        return headers
+
+    @staticmethod
+    async def _make_async_request(payload: UDLRequestPayload, response_func, request_args: dict):
+        # the async session is resolved here so it is bound to the loop that awaits the request
+        request_args["client"] = UDLRequest._get_async_session(payload).client
+        attempt = 0
+        while True:
+            attempt += 1
+            started = UDLRequest._before_attempt(payload)
+            try:
+                response = await response_func(**request_args)
+            except (UDLRequestError, httpx.TransportError) as error:
+                await asyncio.sleep(UDLRequest._after_failure(payload, request_args, started, attempt, error))
+            else:
+                UDLRequest._after_success(payload, request_args, started, response)
+                return response
 
     @staticmethod
-    def _check_cert(crt: Path | None, key: Path | None):
-        cert = None
-        if crt and key:
-            crt_posix = crt.as_posix() if hasattr(crt, "as_posix") else str(crt)
-            key_posix = key.as_posix() if hasattr(key, "as_posix") else str(key)
-            cert = (crt_posix, key_posix)
-        return cert
+    def _before_attempt(payload: UDLRequestPayload) -> float:
+        if UDLRequest._circuit_breaker is not None:
+            UDLRequest._circuit_breaker.before_request(payload.endpoint.to_string())
+        return time.perf_counter()
 
     @staticmethod
-    def _method_to_func(cert: tuple, method: str, async_flag: bool):
+    def _after_success(payload: UDLRequestPayload, request_args: dict, started: float, result) -> None:
+        if UDLRequest._circuit_breaker is not None:
+            UDLRequest._circuit_breaker.record(payload.endpoint.to_string(), None)
+        UDLRequest._record_attempt(payload, request_args, started, result)
+
+    @staticmethod
+    def _after_failure(
+        payload: UDLRequestPayload, request_args: dict, started: float, attempt: int, error: Exception
+    ) -> float:
+        # re-raises the error unless the request should be replayed, otherwise returns the delay before replaying it
+        url = payload.endpoint.to_string()
+        if UDLRequest._circuit_breaker is not None:
+            UDLRequest._circuit_breaker.record(url, error)
+        labels = UDLRequest._record_attempt(payload, request_args, started, error)
+        policy = UDLRequest._retry_policy
+        if policy is None or not policy.should_retry(payload.method, attempt, error):
+            raise error
+        delay = policy.delay(attempt, error)
+        RETRIES.inc(endpoint=labels["endpoint"], method=payload.method, reason=labels["status"])
+        RETRY_SLEEP_SECONDS.inc(delay, endpoint=labels["endpoint"], method=payload.method)
+        DEWDL_LOG.warning(f"{payload.method} to {url} failed on attempt {attempt} ({error}); retrying in {delay:.2f}s")
+        return delay
+
+    @staticmethod
+    def _record_attempt(payload: UDLRequestPayload, request_args: dict, started: float, result) -> dict:
+        if isinstance(result, httpx.Response):
+            status, response = result.status_code, result
+        elif isinstance(result, UDLRequestError):
+            status, response = result.status_code, result.response
+        elif isinstance(result, Exception):
+            status, response = type(result).__name__, None
+        else:
+            # POST helpers return the parsed body, which they only do for the expected success code
+            success = UDLRequestSuccessCode.FILEDROP if payload.is_filedrop else UDLRequestSuccessCode.POST
+            status, response = success.value, None
+        data_type = getattr(payload.endpoint, "base_data_type", None)
+        labels = {
+            "endpoint": endpoint_label(payload.endpoint.to_string()),
+            "data_type": data_type.value if data_type is not None else "",
+            "method": payload.method,
+        }
+        REQUESTS.inc(**labels, status=status)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, **labels, status=status)
+        post_data = request_args.get("post_data")
+        if isinstance(post_data, (bytes, str)):
+            REQUEST_BYTES.inc(len(post_data), **labels)
+        if isinstance(response, httpx.Response):
+            size = _response_size(response)
+            RESPONSE_BYTES.inc(size, **labels)
+            RESPONSE_SIZE.observe(size, **labels)
+        return {**labels, "status": str(status)}
+
+    @staticmethod
+    def _method_to_func(method: str, async_flag: bool):
         method_to_func_map = {
-            ("POST", True): (
-                _post_to_udl_async,
-                httpx.AsyncClient(cert=cert, verify=True) if cert else httpx.AsyncClient(),
-            ),
-            ("POST", False): (_post_to_udl, httpx.Client(cert=cert, verify=True) if cert else httpx.Client()),
-            ("GET", True): (
-                _get_udl_response_async,
-                httpx.AsyncClient(cert=cert, verify=True) if cert else httpx.AsyncClient(),
-            ),
-            ("GET", False): (_get_udl_response, httpx.Client(cert=cert, verify=True) if cert else httpx.Client()),
+            ("POST", True): _post_to_udl_async,
+            ("POST", False): _post_to_udl,
+            ("GET", True): _get_udl_response_async,
+            ("GET", False): _get_udl_response,
         }
-        # Retrieve the appropriate function/httpx client based on method and async_flag
-        mtf = method_to_func_map.get((method, async_flag))
-        return mtf[0], mtf[1]
+        return method_to_func_map.get((method, async_flag))
 
     @staticmethod
     def _setup_post_params(payload, request_args, headers):
         data = None
         if payload.post_body:
             headers.update({**UDLRequest.accept_json(), **UDLRequest.content_json()})
-            json_str = json.dumps(payload.post_body)
-            data = UDLRequest.format_booleans(json_str)
+            data = JSONCodec.active().encode(payload.post_body)
+        elif payload.json_data:
+            headers.update({**UDLRequest.accept_json(), **UDLRequest.content_json()})
+            data = payload.json_data
         elif payload.zip_data:
             data = payload.zip_data
+            if payload.async_flag and isinstance(data, UDLZipStream):
+                data = data.async_chunks()
             headers.update({**UDLRequest.accept_zip(), **UDLRequest.content_zip()})
         request_args["post_data"] = data
         request_args["is_filedrop"] = payload.is_filedrop
@@ -162,7 +458,7 @@ class UDLRequest:
 async def _get_udl_response_async(
     udl_endpoint: UDLBaseAction, client: httpx.AsyncClient, headers: dict = None
 ) -> httpx.Response:
-    response = await client.get(udl_endpoint.to_string(), headers=headers, timeout=30)
+    response = await client.get(udl_endpoint.to_string(), headers=headers)
     try:
         success_code = UDLRequestSuccessCode(response.status_code)
     except ValueError:
@@ -173,7 +469,7 @@ async def _get_udl_response_async(
 
 
 def _get_udl_response(udl_endpoint: UDLBaseAction, client: httpx.Client, headers: dict = None) -> httpx.Response:
-    response = client.get(udl_endpoint.to_string(), headers=headers, timeout=30)
+    response = client.get(udl_endpoint.to_string(), headers=headers)
     try:
         success_code = UDLRequestSuccessCode(response.status_code)
     except ValueError:
@@ -185,12 +481,12 @@ def _get_udl_response(udl_endpoint: UDLBaseAction, client: httpx.Client, headers
 
 async def _post_to_udl_async(
     udl_endpoint: UDLBaseAction,
-    post_data: str | bytes,
+    post_data: str | bytes | Iterable[bytes],
     client: httpx.AsyncClient,
     headers: dict = None,
     is_filedrop: bool = False,
 ) -> str:
-    response = await client.post(udl_endpoint.to_string(), headers=headers, data=post_data, timeout=30)
+    response = await client.post(udl_endpoint.to_string(), headers=headers, content=post_data)
     if is_filedrop:
         resp_str = _verify_post(response)
     else:
@@ -201,12 +497,12 @@ async def _post_to_udl_async(
 
 def _post_to_udl(
     udl_endpoint: UDLBaseAction,
-    post_data: str | bytes,
+    post_data: str | bytes | Iterable[bytes],
     client: httpx.Client,
     headers: dict = None,
     is_filedrop: bool = False,
 ) -> str:
-    response = client.post(udl_endpoint.to_string(), headers=headers, data=post_data, timeout=30)
+    response = client.post(udl_endpoint.to_string(), headers=headers, content=post_data)
     if is_filedrop:
         resp_str = _verify_filedrop(response)
     else:
@@ -237,6 +533,13 @@ def _verify_filedrop(response: httpx.Response) -> str:
     return response.text
 
 
+def _response_size(response: httpx.Response) -> int:
+    try:
+        return len(response.content)
+    except httpx.ResponseNotRead:
+        return response.num_bytes_downloaded
+
+
 def _get_post_location(response: httpx.Response) -> str:
     # check for location of newly posted data
     url = response.headers.get("location")
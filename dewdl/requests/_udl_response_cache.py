@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+from appdirs import user_cache_dir
+
+from dewdl import DEWDL_LOG
+from dewdl.enums import UDLBaseDataType
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+
+# headers describing the wire encoding no longer apply once the decoded body is stored
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class UDLResponseCache:
+    """A persistent SQLite cache of GET responses keyed by the normalized query URL and auth identity.
+
+    Entries are fresh for a per-data-type TTL and can then be served stale for ``stale_ttl`` more seconds while a
+    background refresh runs, or when UDL is failing.  Bodies are zlib compressed and the least recently used entries
+    are evicted once the cache grows past ``max_bytes``.
+    """
+
+    CACHE_FILE_NAME = "responses.sqlite"
+    DEFAULT_TTL = 300.0
+    DEFAULT_STALE_TTL = 3600.0
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        ttls: dict[UDLBaseDataType, float] | None = None,
+        default_ttl: float = DEFAULT_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        compression_level: int = 6,
+    ) -> None:
+        self.path = Path(path) if path else Path(user_cache_dir("dewdl"), UDLResponseCache.CACHE_FILE_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dewdl-cache-refresh")
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body BLOB, size INTEGER, "
+            "stored_at REAL, accessed_at REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Sorts the query parameters so equivalent queries share a cache entry."""
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+    @staticmethod
+    def cache_key(url: str, identity: str | None) -> str:
+        key_source = "\n".join([UDLResponseCache.normalize_url(url), identity or ""])
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def ttl(self, data_type: UDLBaseDataType | None) -> float:
+        return self.ttls.get(data_type, self.default_ttl)
+
+    def fetch(
+        self,
+        url: str,
+        identity: str | None,
+        data_type: UDLBaseDataType | None,
+        loader: Callable[[], httpx.Response],
+    ) -> httpx.Response:
+        """Gets a response from the cache, calling loader on a miss and refreshing stale entries in the background.
+
+        :param url: The request URL
+        :param identity: A string identifying the credentials, so users never share cached responses
+        :param data_type: The data type of the query, used to pick the TTL
+        :param loader: Performs the request against UDL
+        """
+        key = UDLResponseCache.cache_key(url, identity)
+        ttl = self.ttl(data_type)
+        cached = self._read(key)
+        if cached is not None:
+            response, age = cached
+            if age <= ttl:
+                return response
+            if age <= ttl + self.stale_ttl:
+                self._refresh_in_background(key, url, loader)
+                return response
+        try:
+            response = loader()
+        except (httpx.TransportError, UDLRequestError, UDLCircuitOpenError) as error:
+            if cached is not None and _is_server_failure(error):
+                DEWDL_LOG.warning(f"Serving expired cached response for {url} after error: {error}")
+                return cached[0]
+            raise
+        self.store(key, url, response)
+        return response
+
+    def store(self, key: str, url: str, response: httpx.Response) -> None:
+        headers = json.dumps([(k, v) for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS])
+        body = zlib.compress(response.content, self.compression_level)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, response.status_code, headers, body, len(body), now, now),
+            )
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self._refresh_executor.shutdown(wait=True)
+        self._connection.close()
+
+    def _read(self, key: str) -> tuple[httpx.Response, float] | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        url, status, headers, body, stored_at = row
+        response = httpx.Response(
+            status,
+            headers=json.loads(headers),
+            content=zlib.decompress(body),
+            request=httpx.Request("GET", url),
+        )
+        return response, time.time() - stored_at
+
+    def _evict(self) -> None:
+        (total,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def _refresh_in_background(self, key: str, url: str, loader: Callable[[], httpx.Response]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                self.store(key, url, loader())
+            except Exception as error:
+                DEWDL_LOG.warning(f"Background refresh of {url} failed: {error}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(_refresh)
+
+
+def _is_server_failure(error: Exception) -> bool:
+    if isinstance(error, (httpx.TransportError, UDLCircuitOpenError)):
+        return True
+    return error.status_code >= 500 or error.status_code == 429
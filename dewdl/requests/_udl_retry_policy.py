@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from dewdl.exceptions import UDLRequestError
+
+
+@dataclass(frozen=True)
+class UDLRetryPolicy:
+    """Decides whether a failed request is replayed and how long to wait first.
+
+    Only methods in ``retry_methods`` are replayed, since repeating a POST could create duplicate records.  The wait
+    is the server's ``Retry-After`` when present (capped at ``max_retry_after``), otherwise a random delay up to
+    ``backoff * 2 ** (attempt - 1)`` capped at ``max_backoff``, so workers that failed together do not retry together.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    max_retry_after: float = 60.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    retry_methods: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def should_retry(self, method: str, attempt: int, error: Exception) -> bool:
+        """Whether the request that failed on its attempt-th try should be sent again.
+
+        :param method: The HTTP method of the request
+        :param attempt: The number of attempts made so far, starting at 1
+        :param error: The error raised by the attempt
+        """
+        if attempt >= self.max_attempts or method.upper() not in self.retry_methods:
+            return False
+        if isinstance(error, httpx.TransportError):
+            return True
+        return isinstance(error, UDLRequestError) and error.status_code in self.retry_statuses
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))  # noqa: S311
+
+
+def _retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+
+from dewdl.requests._request_trace import trace_request, trace_request_async
+from dewdl.requests._ssl_context_cache import SSLContextCache
+
+
+def _cert_tuple(crt: Path | str | None, key: Path | str | None) -> tuple[str, str] | None:
+    cert = None
+    if crt and key:
+        crt_posix = crt.as_posix() if hasattr(crt, "as_posix") else str(crt)
+        key_posix = key.as_posix() if hasattr(key, "as_posix") else str(key)
+        cert = (crt_posix, key_posix)
+    return cert
+
+
+class _UDLBaseSession:
+    DEFAULT_TIMEOUT = 30
+    DEFAULT_MAX_CONNECTIONS = 100
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+    DEFAULT_KEEPALIVE_EXPIRY = 30.0
+    CERT_CHECK_INTERVAL = 10.0  # seconds between checks of the certificate files for rotation
+
+    def __init__(
+        self,
+        crt: Path | str | None = None,
+        key: Path | str | None = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        timeout: float = DEFAULT_TIMEOUT,
+        transport: httpx.BaseTransport | httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.cert = _cert_tuple(crt, key)
+        self._ssl_context = None
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self.transport = transport
+        self._client = None
+        self._retired: list[httpx.Client | httpx.AsyncClient] = []
+        self._lock = threading.Lock()
+        self._cert_checked_at = 0.0
+
+    def _client_kwargs(self) -> dict:
+        kwargs = {"limits": self.limits, "http2": self.http2, "timeout": self.timeout}
+        if self._ssl_context is not None:
+            kwargs["verify"] = self._ssl_context
+        if self.transport is not None:
+            kwargs["transport"] = self.transport
+        return kwargs
+
+    def _needs_client(self) -> bool:
+        if self.closed:
+            return True
+        if self.cert is None:
+            return False
+        # the PEM files are only stat'ed every CERT_CHECK_INTERVAL, not on every request
+        now = time.monotonic()
+        if now - self._cert_checked_at < self.CERT_CHECK_INTERVAL:
+            return False
+        self._cert_checked_at = now
+        return self._cert_rotated()
+
+    def _cert_rotated(self) -> bool:
+        # a rotated certificate yields a new cached context, and the client has to be rebuilt to use it
+        return self.cert is not None and SSLContextCache.get(*self.cert) is not self._ssl_context
+
+    def _swap_client(self, make_client: Callable[[], httpx.Client | httpx.AsyncClient]):
+        with self._lock:
+            if self.closed or self._cert_rotated():
+                if self._client is not None and not self._client.is_closed:
+                    # requests may still be running on the old client, so it is closed with the session, not now
+                    self._retired.append(self._client)
+                self._refresh_ssl_context()
+                self._client = make_client()
+            return self._client
+
+    def _take_clients(self) -> list[httpx.Client | httpx.AsyncClient]:
+        with self._lock:
+            clients = [*self._retired, self._client] if self._client is not None else list(self._retired)
+            self._client = None
+            self._retired = []
+        return clients
+
+    def _refresh_ssl_context(self) -> None:
+        if self.cert is not None:
+            self._ssl_context = SSLContextCache.get(*self.cert)
+            self._cert_checked_at = time.monotonic()
+
+    def _request_kwargs(self, kwargs: dict) -> dict:
+        kwargs.setdefault("timeout", self.timeout)
+        return kwargs
+
+    @property
+    def closed(self) -> bool:
+        return self._client is None or self._client.is_closed
+
+
+class UDLSession(_UDLBaseSession):
+    """A long-lived, keep-alive connection pool used for every synchronous UDL request.
+
+    Sessions are thread safe and can be used as a context manager.  ``UDLSession.shared`` returns the process-wide
+    session for a set of credentials, which is what ``UDLRequest`` and ``UDLSecureMessage`` use by default.
+    """
+
+    _shared: dict[tuple | None, UDLSession] = {}
+    _shared_lock = threading.Lock()
+    _shared_options: dict = {}
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._needs_client():
+            return self._swap_client(
+                lambda: httpx.Client(**self._client_kwargs(), event_hooks={"request": [trace_request]})
+            )
+        return self._client
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.client.get(url, **self._request_kwargs(kwargs))
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.client.post(url, **self._request_kwargs(kwargs))
+
+    def stream(self, method: str, url: str, **kwargs):
+        return self.client.stream(method, url, **self._request_kwargs(kwargs))
+
+    def close(self) -> None:
+        for client in self._take_clients():
+            client.close()
+
+    def __enter__(self) -> UDLSession:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @classmethod
+    def configure(cls, **session_options) -> None:
+        """Sets the options used for shared sessions and closes any existing shared sessions.
+
+        :param session_options: Keyword arguments accepted by ``UDLSession``, e.g. ``max_connections`` or ``http2``
+        """
+        cls.close_shared()
+        cls._shared_options = session_options
+
+    @classmethod
+    def shared(cls, crt: Path | str | None = None, key: Path | str | None = None) -> UDLSession:
+        cert = _cert_tuple(crt, key)
+        with cls._shared_lock:
+            session = cls._shared.get(cert)
+            if session is None:
+                session = cls(crt, key, **cls._shared_options)
+                cls._shared[cert] = session
+        return session
+
+    @classmethod
+    def close_shared(cls) -> None:
+        with cls._shared_lock:
+            sessions = list(cls._shared.values())
+            cls._shared.clear()
+        for session in sessions:
+            session.close()
+
+
+class UDLAsyncSession(_UDLBaseSession):
+    """The asyncio counterpart of ``UDLSession``.
+
+    An ``httpx.AsyncClient`` is bound to the event loop it first runs on, so shared async sessions are kept per loop.
+    Their clients can only be closed on that loop, so call ``await UDLAsyncSession.aclose_shared()`` before a loop that
+    used them ends, e.g. at the end of the coroutine passed to ``asyncio.run``.
+    """
+
+    _shared: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+    _shared_lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._needs_client():
+            return self._swap_client(
+                lambda: httpx.AsyncClient(**self._client_kwargs(), event_hooks={"request": [trace_request_async]})
+            )
+        return self._client
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.client.get(url, **self._request_kwargs(kwargs))
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.client.post(url, **self._request_kwargs(kwargs))
+
+    def stream(self, method: str, url: str, **kwargs):
+        return self.client.stream(method, url, **self._request_kwargs(kwargs))
+
+    async def aclose(self) -> None:
+        for client in self._take_clients():
+            await client.aclose()
+
+    async def __aenter__(self) -> UDLAsyncSession:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    @classmethod
+    def shared(cls, crt: Path | str | None = None, key: Path | str | None = None) -> UDLAsyncSession:
+        """Gets the shared async session for the running event loop.
+
+        :param crt: Path to the NPE certificate
+        :param key: Path to the NPE certificate key
+        """
+        loop = asyncio.get_running_loop()
+        cert = _cert_tuple(crt, key)
+        with cls._shared_lock:
+            loop_sessions = cls._shared.setdefault(loop, {})
+            session = loop_sessions.get(cert)
+            if session is None:
+                session = cls(crt, key, **UDLSession._shared_options)
+                loop_sessions[cert] = session
+        return session
+
+    @classmethod
+    async def aclose_shared(cls) -> None:
+        """Closes the shared async sessions of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with cls._shared_lock:
+            sessions = list(cls._shared.pop(loop, {}).values())
+        for session in sessions:
+            await session.aclose()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import copy
+import math
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from dewdl import DEWDL_LOG
+from dewdl._json_codec import JSONCodec
+from dewdl.requests._udl_httpx_request import UDLRequest
+from dewdl.udl_actions import UDLQuery
+
+TimeWindow = tuple[datetime, datetime]
+
+
+class UDLTimeSlicedQuery:
+    """Pulls every record matching a time-bounded ``UDLQuery``, even when it exceeds the query's ``maxResults``.
+
+    The count endpoint is used to split the query's time range into sub-windows on its ``UDLDateFields`` key, which
+    are fetched concurrently.  Any window that still hits the result limit is bisected and re-fetched.  Windows are
+    made disjoint by ending each one a microsecond before the next begins, so records are yielded once, in window order.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+    TARGET_FILL = 0.5  # aim for half-full windows so few need to be bisected
+    RESOLUTION = timedelta(microseconds=1)
+
+    def __init__(self, query: UDLQuery, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        if query.start is None:
+            raise ValueError("Time-sliced queries require a query with an after() or between() time range")
+        self.query = query
+        # windows are inclusive, but after() excludes its start, so the first window begins one tick later
+        self.start = query.start if query.end is not None else query.start + self.RESOLUTION
+        now = datetime.now(timezone.utc)
+        # naive times are UTC, while aware ones keep the caller's zone for the same instant
+        self.end = query.end or (now.astimezone(query.start.tzinfo) if query.start.tzinfo else now.replace(tzinfo=None))
+        self.max_workers = max_workers
+
+    def estimate_count(self) -> int:
+        return int(UDLRequest.get(self._window_query((self.start, self.end)).as_count()).text)
+
+    def windows(self) -> list[TimeWindow]:
+        """Splits the time range into disjoint windows sized from the count endpoint's estimate."""
+        per_window = max(1, int(self.query.result_limit * self.TARGET_FILL))
+        num_windows = max(1, math.ceil(self.estimate_count() / per_window))
+        step = (self.end - self.start) / num_windows
+        bounds = [self.start + step * i for i in range(num_windows)] + [self.end]
+        windows = [(bounds[i], bounds[i + 1] - self.RESOLUTION) for i in range(num_windows)]
+        windows[-1] = (windows[-1][0], self.end)
+        return [window for window in windows if window[0] <= window[1]]
+
+    def __iter__(self) -> Iterator[dict]:
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending: deque[tuple[TimeWindow, Future]] = deque(
+                (window, executor.submit(self._fetch, window)) for window in self.windows()
+            )
+            while pending:
+                window, future = pending.popleft()
+                records = future.result()
+                if len(records) >= self.query.result_limit and self._can_bisect(window):
+                    halves = self._bisect(window)
+                    pending.extendleft(reversed([(half, executor.submit(self._fetch, half)) for half in halves]))
+                    continue
+                if len(records) >= self.query.result_limit:
+                    DEWDL_LOG.warning(f"Window {window[0]}..{window[1]} cannot be split further and may be truncated")
+                yield from records
+        finally:
+            # a caller that stops iterating early should not wait for windows it will never read
+            executor.shutdown(cancel_futures=True)
+
+    def _fetch(self, window: TimeWindow) -> list[dict]:
+        return JSONCodec.active().decode(UDLRequest.get(self._window_query(window)).content)
+
+    def _window_query(self, window: TimeWindow) -> UDLQuery:
+        return copy.copy(self.query).between(*window)
+
+    def _can_bisect(self, window: TimeWindow) -> bool:
+        return window[1] - window[0] >= self.RESOLUTION * 2
+
+    def _bisect(self, window: TimeWindow) -> list[TimeWindow]:
+        start, end = window
+        middle = start + (end - start) / 2
+        return [(start, middle - self.RESOLUTION), (middle, end)]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import queue
+import threading
+import zipfile
+from collections.abc import AsyncIterator, Iterable, Iterator
+from pathlib import Path
+
+from dewdl._json_codec import JSONCodec
+
+ZipEntry = tuple[str, bytes | Iterable[bytes] | Path]
+
+
+class _ChunkSink(io.RawIOBase):
+    # a write-only, non-seekable target; zipfile falls back to data descriptors so nothing is rewritten later
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> list[bytes]:
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+class UDLZipStream:
+    """A zip archive built incrementally while it is being uploaded, for use as a chunked ``UDLRequest.post`` body.
+
+    Entries are (name, content) pairs whose content is bytes, an iterable of byte chunks or a file path.  Only the
+    compressor state and a few output chunks are held in memory.  With ``threaded`` the compression runs on a worker
+    thread, bounded by ``queue_size`` chunks, so it overlaps with sending.
+    """
+
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+    DEFAULT_QUEUE_SIZE = 8
+
+    def __init__(
+        self,
+        entries: Iterable[ZipEntry],
+        compression_level: int = 6,
+        threaded: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self.entries = entries
+        self.compression_level = compression_level
+        self.threaded = threaded
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], name: str = "data.json", **kwargs) -> UDLZipStream:
+        """Builds a stream whose single entry is a JSON array of the records, serialized as it is compressed.
+
+        :param records: The records to archive; may be a generator
+        :param name: The name of the JSON file inside the archive
+        """
+        return cls([(name, _json_array_chunks(records))], **kwargs)
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._threaded_chunks() if self.threaded else self._chunks()
+
+    async def async_chunks(self) -> AsyncIterator[bytes]:
+        iterator = iter(self)
+        done = object()
+        while (chunk := await asyncio.to_thread(next, iterator, done)) is not done:
+            yield chunk
+
+    def _chunks(self) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        with zipfile.ZipFile(
+            sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=self.compression_level
+        ) as archive:
+            for name, content in self.entries:
+                with archive.open(name, "w", force_zip64=True) as entry:
+                    for data in self._content_chunks(content):
+                        entry.write(data)
+                        yield from sink.drain()
+                yield from sink.drain()
+        yield from sink.drain()
+
+    def _content_chunks(self, content: bytes | Iterable[bytes] | Path) -> Iterator[bytes]:
+        if isinstance(content, (bytes, bytearray)):
+            yield bytes(content)
+        elif isinstance(content, Path):
+            with content.open("rb") as file:
+                while data := file.read(self.chunk_size):
+                    yield data
+        else:
+            yield from content
+
+    def _threaded_chunks(self) -> Iterator[bytes]:
+        chunks: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        done = object()
+        stop = threading.Event()
+
+        def _put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                else:
+                    return True
+            return False
+
+        def _produce():
+            try:
+                for chunk in self._chunks():
+                    if not _put(chunk):
+                        return
+                _put(done)
+            except Exception as error:
+                _put(error)
+
+        threading.Thread(target=_produce, name="dewdl-zip-stream", daemon=True).start()
+        try:
+            while (chunk := chunks.get()) is not done:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            stop.set()
+
+
+def _json_array_chunks(records: Iterable[dict]) -> Iterator[bytes]:
+    codec = JSONCodec.active()
+    yield b"["
+    for index, record in enumerate(records):
+        yield (b"," if index else b"") + codec.encode(record)
+    yield b"]"
@@ -1,7 +1,8 @@
+from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 
-from dewdl.udl_actions import UDLBaseAction
+from dewdl.udl_actions import UDLBaseAction, UDLQuery
 
 
 @dataclass
@@ -9,10 +10,16 @@ class UDLRequestPayload:
     endpoint: UDLBaseAction
     method: str = "GET"
     post_body: dict | None = None
-    zip_data: bytes | None = None
+    zip_data: bytes | Iterable[bytes] | None = None
+    json_data: bytes | None = None
     token: str | None = None
     b64_key: str | None = None
     crt: Path | None = None
     key: Path | None = None
     async_flag: bool = False
     is_filedrop: bool = False
+
+    def __post_init__(self) -> None:
+        # every request is built from a payload, so fanned-out queries can never be sent without their filters
+        if isinstance(self.endpoint, UDLQuery):
+            self.endpoint.ensure_not_fan_out()
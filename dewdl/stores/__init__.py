@@ -0,0 +1,13 @@
+from dewdl.stores._checkpoint_store import CheckpointStore, FileCheckpointStore, SQLiteCheckpointStore
+from dewdl.stores._high_water_mark_store import HighWaterMark, HighWaterMarkStore
+from dewdl.stores._record_store import RecordStore, RecordStoreQuery
+
+__all__ = [
+    "HighWaterMark",
+    "HighWaterMarkStore",
+    "CheckpointStore",
+    "FileCheckpointStore",
+    "SQLiteCheckpointStore",
+    "RecordStore",
+    "RecordStoreQuery"
+]
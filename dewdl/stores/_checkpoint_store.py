@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from appdirs import user_data_dir
+
+from dewdl._atomic_write import atomic_write_text
+
+
+class CheckpointStore(ABC):
+    """Persists the next offset to read for each (topic, consumer name) pair."""
+
+    @abstractmethod
+    def load(self, topic: str, consumer: str) -> int | None:
+        """Gets the committed offset, or None when the consumer has never committed."""
+
+    @abstractmethod
+    def save(self, topic: str, consumer: str, offset: int) -> None:
+        """Durably commits the offset."""
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a JSON file that is replaced atomically on every commit."""
+
+    STORE_FILE_NAME = "sm_checkpoints.json"
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path else Path(user_data_dir("dewdl"), FileCheckpointStore.STORE_FILE_NAME)
+        self._lock = threading.Lock()
+
+    def load(self, topic: str, consumer: str) -> int | None:
+        with self._lock:
+            return self._read().get(topic, {}).get(consumer)
+
+    def save(self, topic: str, consumer: str, offset: int) -> None:
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints.setdefault(topic, {})[consumer] = offset
+            atomic_write_text(self.path, json.dumps(checkpoints))
+
+    def _read(self) -> dict:
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text())
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a SQLite database, which is safe to share between consumer processes."""
+
+    STORE_FILE_NAME = "sm_checkpoints.sqlite"
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path else Path(user_data_dir("dewdl"), SQLiteCheckpointStore.STORE_FILE_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "topic TEXT, consumer TEXT, next_offset INTEGER, updated_at REAL, PRIMARY KEY (topic, consumer))"
+        )
+
+    def load(self, topic: str, consumer: str) -> int | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT next_offset FROM checkpoints WHERE topic = ? AND consumer = ?", (topic, consumer)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, topic: str, consumer: str, offset: int) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)", (topic, consumer, offset, time.time())
+            )
+
+    def close(self) -> None:
+        self._connection.close()
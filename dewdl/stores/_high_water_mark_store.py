@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from appdirs import user_data_dir
+
+from dewdl._atomic_write import atomic_write_text
+from dewdl._file_lock import file_lock
+from dewdl._udl_time import format_udl_time, parse_udl_time
+from dewdl.enums import UDLBaseDataType
+
+
+@dataclass(frozen=True)
+class HighWaterMark:
+    """The newest record time synced for a stream, plus the keys of records near it used to drop re-fetched records."""
+
+    time: datetime
+    boundary_keys: frozenset[str] = field(default_factory=frozenset)
+
+
+class HighWaterMarkStore:
+    """Persists high-water marks per (data type, source, descriptor) in a JSON file that is replaced atomically.
+
+    Every stream shares the file, so updates read, merge and replace it while holding a lock on a ``.lock`` sidecar,
+    and pollers in other processes never overwrite each other's marks.
+    """
+
+    STORE_FILE_NAME = "high_water_marks.json"
+    LOCK_SUFFIX = ".lock"
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path) if path else Path(user_data_dir("dewdl"), HighWaterMarkStore.STORE_FILE_NAME)
+        self.lock_path = self.path.with_name(self.path.name + HighWaterMarkStore.LOCK_SUFFIX)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def stream_key(data_type: UDLBaseDataType, source: str | None = None, descriptor: str | None = None) -> str:
+        return "|".join([data_type.value, source or "", descriptor or ""])
+
+    def get(self, stream_key: str) -> HighWaterMark | None:
+        with self._lock:
+            entry = self._read().get(stream_key)
+        if entry is None:
+            return None
+        return HighWaterMark(parse_udl_time(entry["time"]), frozenset(entry["boundary_keys"]))
+
+    def commit(self, stream_key: str, mark: HighWaterMark) -> None:
+        with self._lock, file_lock(self.lock_path):
+            marks = self._read()
+            marks[stream_key] = {"time": format_udl_time(mark.time), "boundary_keys": sorted(mark.boundary_keys)}
+            self._write(marks)
+
+    def delete(self, stream_key: str) -> None:
+        with self._lock, file_lock(self.lock_path):
+            marks = self._read()
+            if marks.pop(stream_key, None) is not None:
+                self._write(marks)
+
+    def _read(self) -> dict:
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text())
+
+    def _write(self, marks: dict) -> None:
+        atomic_write_text(self.path, json.dumps(marks))
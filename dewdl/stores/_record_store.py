@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from appdirs import user_data_dir
+
+from dewdl import DEWDL_LOG
+from dewdl._json_codec import JSONCodec
+from dewdl._udl_time import format_udl_time, parse_udl_time, sortable_udl_time
+from dewdl.enums import UDLBaseDataType, UDLDateFields
+
+TimeWindow = tuple[datetime, datetime]
+
+
+class RecordStore:
+    """A local SQLite replica of UDL records, partitioned by data type and by day of the ``UDLDateFields`` time.
+
+    Alongside the records, the store keeps the time ranges it holds completely for each (data type, source,
+    descriptor), so a ``RecordStoreQuery`` answers from disk and only asks UDL for the parts of its range that are
+    missing.  Records are keyed by their UDL ``id``, so writing the same record twice keeps one copy.
+
+    Records can be ingested into UDL well after their time, so ranges newer than ``settle_time`` ago are fetched but
+    never recorded as covered, and are fetched again by the next query that reaches them.
+    """
+
+    STORE_FILE_NAME = "records.sqlite"
+    DEFAULT_SETTLE_TIME = timedelta(hours=1)
+
+    def __init__(self, path: Path | str | None = None, settle_time: timedelta = DEFAULT_SETTLE_TIME) -> None:
+        self.settle_time = settle_time
+        self.path = Path(path) if path else Path(user_data_dir("dewdl"), RecordStore.STORE_FILE_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "data_type TEXT, day TEXT, time TEXT, source TEXT, descriptor TEXT, record_key TEXT, body BLOB, "
+            "PRIMARY KEY (data_type, record_key))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS records_partition ON records (data_type, day, time)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS coverage (data_type TEXT, source TEXT, descriptor TEXT, start TEXT, end TEXT)"
+        )
+
+    def query(self, data_type: UDLBaseDataType) -> RecordStoreQuery:
+        return RecordStoreQuery(self, data_type)
+
+    def write(
+        self,
+        data_type: UDLBaseDataType,
+        records: Iterable[dict],
+        covering: TimeWindow | None = None,
+        source: str | None = None,
+        descriptor: str | None = None,
+    ) -> int:
+        """Stores records, e.g. the results of a UDL query, returning how many were written.
+
+        :param data_type: The data type of the records
+        :param records: The records to store
+        :param covering: The time range the records are complete for, so later queries within it stay local
+        :param source: The source the records were filtered to, if any
+        :param descriptor: The descriptor the records were filtered to, if any
+        """
+        time_key = UDLDateFields.get(data_type)
+        codec = JSONCodec.active()
+        rows = []
+        for record in records:
+            if not record.get(time_key):
+                DEWDL_LOG.warning(f"Skipping a {data_type.value} record without {time_key}")
+                continue
+            time = sortable_udl_time(record[time_key])
+            body = codec.encode(record)
+            key = record.get("id") or hashlib.sha256(body).hexdigest()
+            rows.append((data_type.value, time[:10], time, record.get("source"), record.get("descriptor"), key, body))
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                if covering is not None:
+                    self._add_coverage(data_type, covering, source or "", descriptor or "")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return len(rows)
+
+    def read(
+        self,
+        data_type: UDLBaseDataType,
+        start: datetime,
+        end: datetime,
+        source: str | None = None,
+        descriptor: str | None = None,
+    ) -> list[dict]:
+        """Reads the stored records with a time between start and end inclusive, in time order."""
+        sql = "SELECT body FROM records WHERE data_type = ? AND day BETWEEN ? AND ? AND time BETWEEN ? AND ?"
+        start_str, end_str = format_udl_time(start), format_udl_time(end)
+        params = [data_type.value, start_str[:10], end_str[:10], start_str, end_str]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        if descriptor:
+            sql += " AND descriptor = ?"
+            params.append(descriptor)
+        with self._lock:
+            bodies = self._connection.execute(sql + " ORDER BY time", params).fetchall()
+        codec = JSONCodec.active()
+        return [codec.decode(body) for (body,) in bodies]
+
+    def coverage(
+        self, data_type: UDLBaseDataType, source: str | None = None, descriptor: str | None = None
+    ) -> list[TimeWindow]:
+        """Gets the time ranges held completely for a query with this source and descriptor, merged and sorted.
+
+        Ranges fetched without a source or descriptor filter also cover queries that have one.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT start, end FROM coverage WHERE data_type = ? AND source IN ('', ?) AND descriptor IN ('', ?)",
+                (data_type.value, source or "", descriptor or ""),
+            ).fetchall()
+        return _merge_windows((parse_udl_time(start), parse_udl_time(end)) for start, end in rows)
+
+    def missing(
+        self,
+        data_type: UDLBaseDataType,
+        start: datetime,
+        end: datetime,
+        source: str | None = None,
+        descriptor: str | None = None,
+    ) -> list[TimeWindow]:
+        """Gets the parts of start..end that are not covered locally and have to be fetched from UDL."""
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(data_type, source, descriptor):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _add_coverage(self, data_type: UDLBaseDataType, window: TimeWindow, source: str, descriptor: str) -> None:
+        where = "WHERE data_type = ? AND source = ? AND descriptor = ?"
+        key = (data_type.value, source, descriptor)
+        rows = self._connection.execute(f"SELECT start, end FROM coverage {where}", key).fetchall()  # noqa: S608
+        windows = _merge_windows([window, *((parse_udl_time(start), parse_udl_time(end)) for start, end in rows)])
+        self._connection.execute(f"DELETE FROM coverage {where}", key)  # noqa: S608
+        self._connection.executemany(
+            "INSERT INTO coverage VALUES (?, ?, ?, ?, ?)",
+            [(*key, format_udl_time(start), format_udl_time(end)) for start, end in windows],
+        )
+
+
+class RecordStoreQuery:
+    """A query against a RecordStore that mirrors UDLQuery's time, source and descriptor filters.
+
+    ``records()`` fetches the missing parts of the time range from UDL with ``UDLTimeSlicedQuery``, stores them, and
+    then answers the whole range from the store.  Unlike UDLQuery, after() and before() combine into a range, and a
+    query without an end runs up to now.
+    """
+
+    def __init__(self, store: RecordStore, data_type: UDLBaseDataType) -> None:
+        self.store = store
+        self.data_type = data_type
+        self.start: datetime | None = None
+        self.end: datetime | None = None
+        self.source: str | None = None
+        self.descriptor: str | None = None
+
+    def after(self, epoch: datetime) -> RecordStoreQuery:
+        self.start = epoch
+        return self
+
+    def before(self, epoch: datetime) -> RecordStoreQuery:
+        self.end = epoch
+        return self
+
+    def between(self, start: datetime, end: datetime) -> RecordStoreQuery:
+        self.start, self.end = start, end
+        return self
+
+    def from_source(self, source: str) -> RecordStoreQuery:
+        self.source = source
+        return self
+
+    def with_descriptor(self, descriptor: str) -> RecordStoreQuery:
+        self.descriptor = descriptor
+        return self
+
+    def missing(self) -> list[TimeWindow]:
+        start, end = self._window()
+        return self.store.missing(self.data_type, start, end, self.source, self.descriptor)
+
+    def records(self, fetch: bool = True) -> list[dict]:
+        """Gets the matching records, fetching only the time ranges the store does not hold yet.
+
+        :param fetch: Fetch missing ranges from UDL; when False only stored records are returned
+        """
+        start, end = self._window()
+        if fetch:
+            for window in self.missing():
+                self._fetch(window)
+        return self.store.read(self.data_type, start, end, self.source, self.descriptor)
+
+    def _window(self) -> TimeWindow:
+        if self.start is None:
+            raise ValueError("Record store queries require a start time; use after() or between()")
+        return self.start, self.end or datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _fetch(self, window: TimeWindow) -> None:
+        from dewdl.requests import UDLTimeSlicedQuery
+        from dewdl.udl_actions import UDLQuery
+
+        query = UDLQuery(self.data_type).between(*window)
+        if self.source:
+            query.from_source(self.source)
+        if self.descriptor:
+            query.with_descriptor(self.descriptor)
+        DEWDL_LOG.info(f"Fetching {self.data_type.value} {window[0]}..{window[1]} missing from the record store")
+        records = list(UDLTimeSlicedQuery(query))
+        # late-ingested records can still arrive for the newest part of the window, so it is left uncovered
+        settled = min(window[1], datetime.now(timezone.utc).replace(tzinfo=None) - self.store.settle_time)
+        covering = (window[0], settled) if settled > window[0] else None
+        self.store.write(self.data_type, records, covering, self.source, self.descriptor)
+
+
+def _merge_windows(windows: Iterable[TimeWindow]) -> list[TimeWindow]:
+    merged: list[TimeWindow] = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
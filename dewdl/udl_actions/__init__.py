@@ -1,11 +1,22 @@
 from dewdl.udl_actions._udl_base_action import UDLBaseAction
 from dewdl.udl_actions._udl_filedrop import UDLFileDrop
+from dewdl.udl_actions._udl_get_file import UDLGetFile
+from dewdl.udl_actions._udl_get_tuple import UDLGetTuple
 from dewdl.udl_actions._udl_query import UDLQuery
+from dewdl.udl_actions._udl_query_spec import UDLQuerySpec
 from dewdl.udl_actions._udl_secure_message import UDLSecureMessage
+from dewdl.udl_actions._udl_secure_message_consumer import UDLSecureMessageConsumer
+from dewdl.udl_actions._udl_secure_message_multiplexer import TopicPage, UDLSecureMessageMultiplexer
 
 __all__ = [
     "UDLBaseAction",
     "UDLQuery",
+    "UDLQuerySpec",
     "UDLFileDrop",
-    "UDLSecureMessage"
+    "UDLGetFile",
+    "UDLGetTuple",
+    "UDLSecureMessage",
+    "UDLSecureMessageConsumer",
+    "UDLSecureMessageMultiplexer",
+    "TopicPage"
 ]
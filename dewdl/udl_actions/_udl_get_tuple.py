@@ -1,7 +1,17 @@
+from collections.abc import Iterable
+
 from dewdl.enums import UDLQueryType
 from dewdl.udl_actions import UDLBaseAction
 
 
 class UDLGetTuple(UDLBaseAction):
-    def __init__(self, data_endpoint: UDLQueryType, id: str) -> None:
-        super().__init__(f"{data_endpoint.value}/tuple")
+    def __init__(self, data_endpoint: UDLQueryType, columns: Iterable[str]) -> None:
+        if isinstance(columns, str):
+            # a string is an iterable of its characters, which would select one column per letter
+            raise TypeError(f"columns must be an iterable of column names, not the string {columns!r}")
+        columns = tuple(columns)
+        if not columns:
+            raise ValueError("At least one column must be selected")
+        super().__init__(f"{data_endpoint.value}/tuple?columns={','.join(columns)}")
+        self.base_data_type = data_endpoint.base_data_type
+        self.columns = columns
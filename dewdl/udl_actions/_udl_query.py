@@ -1,3 +1,5 @@
+import copy
+from collections.abc import Iterable
 from datetime import datetime
 
 from dewdl.enums import UDLQueryType
@@ -18,21 +20,33 @@ class UDLQuery(UDLBaseAction):
         self._source: str = ""
         self._max_results: str = f"maxResults={UDLQuery.DEFAULT_MAX_RESULTS}"
         self._descriptor: str = ""
+        self._count: bool = False
+        self.start: datetime | None = None
+        self.end: datetime | None = None
+        self.result_limit: int = UDLQuery.DEFAULT_MAX_RESULTS
+        self.columns: tuple[str, ...] = ()
+        self.source: str | None = None
+        self.descriptor: str | None = None
+        self.sources: tuple[str, ...] = ()
+        self.descriptors: tuple[str, ...] = ()
 
     def after(self, epoch: datetime) -> "UDLQuery":
         epoch_str = epoch.strftime(self.dt_format)
         self._time = f"{self.time_key}=%3E{epoch_str}"
+        self.start, self.end = epoch, None
         return self._regenerate()
 
     def before(self, epoch: datetime) -> "UDLQuery":
         epoch_str = epoch.strftime(self.dt_format)
         self._time = f"{self.time_key}=%3C{epoch_str}"
+        self.start, self.end = None, epoch
         return self._regenerate()
 
     def between(self, start: datetime, end: datetime) -> "UDLQuery":
         start_str = start.strftime(self.dt_format)
         end_str = end.strftime(self.dt_format)
         self._time = f"{self.time_key}={start_str}..{end_str}"
+        self.start, self.end = start, end
         return self._regenerate()
 
     def with_uuid(self, uuid: str) -> "UDLQuery":
@@ -42,19 +56,83 @@ class UDLQuery(UDLBaseAction):
 
     def from_source(self, source: str) -> "UDLQuery":
         self._source = f"source={source}"
+        self.source, self.sources = source, ()
+        return self._regenerate()
+
+    def from_sources(self, sources: Iterable[str]) -> "UDLQuery":
+        """Fans the query out to one request per source; run it with UDLFanOut rather than UDLRequest.get."""
+        self.sources = tuple(dict.fromkeys(sources))
+        if not self.sources:
+            raise ValueError("At least one source must be given")
+        self._source, self.source = "", None
         return self._regenerate()
 
     def max_results(self, max_results: int) -> "UDLQuery":
         self._max_results = f"maxResults={max_results}"
+        self.result_limit = max_results
         return self._regenerate()
 
     def with_descriptor(self, descriptor: str) -> "UDLQuery":
         self._descriptor = f"descriptor={descriptor}"
+        self.descriptor, self.descriptors = descriptor, ()
+        return self._regenerate()
+
+    def with_descriptors(self, descriptors: Iterable[str]) -> "UDLQuery":
+        """Fans the query out to one request per descriptor, combined with every source given to from_sources."""
+        self.descriptors = tuple(dict.fromkeys(descriptors))
+        if not self.descriptors:
+            raise ValueError("At least one descriptor must be given")
+        self._descriptor, self.descriptor = "", None
+        return self._regenerate()
+
+    @property
+    def is_fan_out(self) -> bool:
+        return bool(self.sources or self.descriptors)
+
+    def ensure_not_fan_out(self) -> None:
+        """Raises ValueError for a query with several sources or descriptors, which cannot be sent as one request."""
+        if self.is_fan_out:
+            raise ValueError("Queries with several sources or descriptors are run with UDLFanOut")
+
+    def fan_out(self) -> list["UDLQuery"]:
+        """Gets a single-source, single-descriptor query for each combination of from_sources and with_descriptors."""
+        if not self.is_fan_out:
+            return [self]
+        queries = []
+        for source in self.sources or (self.source,):
+            for descriptor in self.descriptors or (self.descriptor,):
+                query = copy.copy(self)
+                query.sources, query.descriptors = (), ()
+                if source is not None:
+                    query.from_source(source)
+                if descriptor is not None:
+                    query.with_descriptor(descriptor)
+                queries.append(query._regenerate())
+        return queries
+
+    def select(self, *columns: str) -> "UDLQuery":
+        """Requests only the given fields, e.g. "satNo" and "epoch", through the UDL tuple endpoint."""
+        if not columns:
+            raise ValueError("At least one column must be selected")
+        self.columns = columns
         return self._regenerate()
 
+    def as_count(self) -> "UDLQuery":
+        """Gets a copy of this query that targets the UDL count endpoint."""
+        count_query = copy.copy(self)
+        count_query._count = True
+        return count_query._regenerate()
+
     def _regenerate(self) -> "UDLQuery":
         base_str = self._build_base_url()
-        valid_queries = [val for val in [self._time, self._source, self._descriptor, self._max_results] if val]
+        max_results = "" if self._count else self._max_results
+        columns = ""
+        if self._count:
+            base_str = "/".join([base_str, "count"])
+        elif self.columns:
+            base_str = "/".join([base_str, "tuple"])
+            columns = f"columns={','.join(self.columns)}"
+        valid_queries = [val for val in [columns, self._time, self._source, self._descriptor, max_results] if val]
         query_str = "&".join(valid_queries)
         full_str = "?".join([base_str, query_str])
         self.data = full_str
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import datetime
+from urllib.parse import parse_qsl, quote, urlsplit
+
+from dewdl._udl_time import format_udl_time
+from dewdl.enums import UDLQueryType
+from dewdl.enums._udl_base_data_type import UDLBaseDataType
+from dewdl.enums._udl_date_fields import UDLDateFields
+from dewdl.udl_actions._udl_base_action import UDLBaseAction
+from dewdl.udl_actions._udl_query import UDLQuery
+
+# characters UDL expects unescaped in parameter values, e.g. the colons of timestamps and the ".." of ranges
+_SAFE_VALUE_CHARS = ":.-_~,"
+
+
+@dataclass(frozen=True)
+class UDLQuerySpec:
+    """An immutable, hashable description of a UDL query whose URL is canonical.
+
+    Every builder method returns a new spec, so specs can be shared between threads and used as dict keys.  Parameters
+    are kept sorted, so two specs for the same query compare equal and produce identical URLs no matter the order they
+    were built in.
+    """
+
+    base_data_type: UDLBaseDataType
+    params: tuple[tuple[str, str], ...] = ()
+    path: tuple[str, ...] = ()
+    base_url: str = ""
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "params", tuple(sorted(dict(self.params).items())))
+        if not self.base_url:
+            object.__setattr__(self, "base_url", _base_url(self.base_data_type))
+
+    @classmethod
+    def of(cls, data_type: UDLBaseDataType, max_results: int | None = None) -> UDLQuerySpec:
+        """Creates the spec equivalent to a new UDLQuery, including its default maxResults."""
+        limit = UDLQuery.DEFAULT_MAX_RESULTS if max_results is None else max_results
+        return cls(data_type, (("maxResults", str(limit)),))
+
+    @classmethod
+    def from_query(cls, query: UDLQuery) -> UDLQuerySpec:
+        """Takes an immutable snapshot of a UDLQuery as it is now."""
+        query.ensure_not_fan_out()
+        return cls.from_url(query.base_data_type, query.to_string())
+
+    @classmethod
+    def from_url(cls, data_type: UDLBaseDataType, url: str) -> UDLQuerySpec:
+        """Parses a query URL, such as UDLQuery.to_string(), into a spec.
+
+        :param data_type: The data type the URL queries
+        :param url: The full query URL
+        """
+        base_url = _base_url(data_type)
+        parts = urlsplit(url)
+        endpoint_path = urlsplit(base_url).path
+        extra_path = parts.path[len(endpoint_path) :].strip("/") if parts.path.startswith(endpoint_path) else ""
+        return cls(
+            data_type,
+            tuple(parse_qsl(parts.query, keep_blank_values=True)),
+            tuple(extra_path.split("/")) if extra_path else (),
+            base_url,
+        )
+
+    @property
+    def time_key(self) -> str:
+        return UDLDateFields.get(self.base_data_type)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        columns = dict(self.params).get("columns")
+        return tuple(columns.split(",")) if columns else ()
+
+    def with_param(self, key: str, value: str | None) -> UDLQuerySpec:
+        """Gets a copy with the parameter set, or removed when value is None."""
+        params = dict(self.params)
+        if value is None:
+            params.pop(key, None)
+        else:
+            params[key] = str(value)
+        return replace(self, params=tuple(params.items()))
+
+    def after(self, epoch: datetime) -> UDLQuerySpec:
+        return self.with_param(self.time_key, f">{format_udl_time(epoch)}")
+
+    def before(self, epoch: datetime) -> UDLQuerySpec:
+        return self.with_param(self.time_key, f"<{format_udl_time(epoch)}")
+
+    def between(self, start: datetime, end: datetime) -> UDLQuerySpec:
+        return self.with_param(self.time_key, f"{format_udl_time(start)}..{format_udl_time(end)}")
+
+    def from_source(self, source: str) -> UDLQuerySpec:
+        return self.with_param("source", source)
+
+    def with_descriptor(self, descriptor: str) -> UDLQuerySpec:
+        return self.with_param("descriptor", descriptor)
+
+    def max_results(self, max_results: int) -> UDLQuerySpec:
+        return self.with_param("maxResults", str(max_results))
+
+    def with_uuid(self, uuid: str) -> UDLQuerySpec:
+        return replace(self, path=(uuid,))
+
+    def select(self, *columns: str) -> UDLQuerySpec:
+        if not columns:
+            raise ValueError("At least one column must be selected")
+        return replace(self.with_param("columns", ",".join(columns)), path=("tuple",))
+
+    def as_count(self) -> UDLQuerySpec:
+        return replace(self.with_param("maxResults", None).with_param("columns", None), path=("count",))
+
+    def to_string(self) -> str:
+        url = "/".join([self.base_url, *self.path])
+        if not self.params:
+            return url
+        return f"{url}?" + "&".join(f"{key}={quote(value, safe=_SAFE_VALUE_CHARS)}" for key, value in self.params)
+
+    def __str__(self) -> str:
+        return self.to_string()
+
+
+def _base_url(data_type: UDLBaseDataType) -> str:
+    return UDLBaseAction(UDLQueryType[data_type.name].value).to_string()
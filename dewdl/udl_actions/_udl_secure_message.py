@@ -1,22 +1,25 @@
 from __future__ import annotations
 
-import time
 from datetime import datetime
 
 import httpx
 
 from dewdl import DewDLConfigs
+from dewdl._json_codec import JSONCodec
 from dewdl.enums import UDLSecureMessageType
 from dewdl.enums._udl_base_data_type import UDLBaseDataType
 from dewdl.enums._udl_date_fields import UDLDateFields
 from dewdl.models import TopicDescription
 from dewdl.models._sms_response import SMSResponse
+from dewdl.requests._token_bucket import TokenBucketRateLimiter
+from dewdl.requests._udl_session import UDLSession
 from dewdl.udl_actions._udl_sms_base_action import UDLSMSBaseAction
 
 
 class UDLSecureMessage(UDLSMSBaseAction):
     MESSAGE_RATE_LIMIT = 3  # 3 requests per second
     MINIMUM_MESSAGE_FREQUENCY = 1 / MESSAGE_RATE_LIMIT
+    RATE_LIMIT_ENDPOINT_CLASS = "secure_messaging"
 
     def __init__(self, udl_data_type: UDLBaseDataType, **query_params) -> None:
         super().__init__(udl_data_type.value, **query_params)
@@ -24,58 +27,53 @@ class UDLSecureMessage(UDLSMSBaseAction):
         self.time_key = UDLDateFields.get(self.base_data_type)
         self.dt_format = "%Y-%m-%dT%H:%M:%S.%fZ"
         self._time = ""
-        timeout = 30
-        cert = None
+        crt = key = None
         if DewDLConfigs.has_cert() and DewDLConfigs.has_key():
             crt, key = DewDLConfigs.get_crt_path(), DewDLConfigs.get_key_path()
-            cert = (crt.as_posix(), key.as_posix())
-        auth = None
-        if DewDLConfigs.has_user() and DewDLConfigs.has_password():
-            user, password = DewDLConfigs.get_user(), DewDLConfigs.get_password()
-            auth = (user, password)
-        if cert:
-            self.client = httpx.Client(cert=cert, verify=True, timeout=timeout)
-        elif auth:
-            self.client = httpx.Client(auth=auth, timeout=timeout)
-        else:
-            self.client = httpx.Client(timeout=timeout)
-        self.last_request_time = 0.0
+        self.auth = None
+        if crt is None and DewDLConfigs.has_user() and DewDLConfigs.has_password():
+            self.auth = (DewDLConfigs.get_user(), DewDLConfigs.get_password())
+        self.session = UDLSession.shared(crt, key)
+        identity = str(crt) if crt else DewDLConfigs.get_user() or DewDLConfigs.get_token()
+        self.rate_limiter = TokenBucketRateLimiter.for_credential(
+            identity, UDLSecureMessage.RATE_LIMIT_ENDPOINT_CLASS, UDLSecureMessage.MESSAGE_RATE_LIMIT
+        )
+
+    @property
+    def client(self) -> httpx.Client:
+        return self.session.client
 
     @property
     def topics(self) -> list[dict]:
         url = "/".join([self._base_url, UDLSecureMessageType.TOPICS.value])
-        return self.client.get(url).json()
+        return JSONCodec.active().decode(self._get(url).content)
 
     def get_latest_offset(self) -> int:
         url = "/".join([self._base_url, UDLSecureMessageType.LATEST_OFFSET.value, self._sms_topic])
-        return int(self.client.get(url).text)
+        return int(self._get(url).text)
 
     def describe_topic(self) -> TopicDescription:
         url = "/".join([self._base_url, UDLSecureMessageType.DESCRIBE_TOPIC.value, self._sms_topic])
-        return TopicDescription.model_validate(self.client.get(url).json())
+        return TopicDescription.model_validate(JSONCodec.active().decode(self._get(url).content))
 
     def get_messages(self, offset: int) -> SMSResponse:
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < self.MINIMUM_MESSAGE_FREQUENCY:
-            time.sleep(self.MINIMUM_MESSAGE_FREQUENCY - time_since_last_request)
-
         self.update_offset(offset)
         url = self._regenerate().to_string()
 
-        response = self.client.get(url)
+        response = self._get(url)
         # Raise standard HTTP errors (404, 500, etc.)
         response.raise_for_status()
 
         # Only parse if content exists; otherwise default to empty list
-        json_data = response.json() if response.content else []
+        json_data = JSONCodec.active().decode(response.content) if response.content else []
 
-        sms_dict = {
-            "data": json_data,
-            "next_offset": response.headers.get("KAFKA_NEXT_OFFSET", offset),
-        }
+        if not isinstance(json_data, list):
+            raise TypeError(f"Expected a list of messages, got {type(json_data).__name__}")
 
-        return SMSResponse.model_validate(sms_dict)
+        # the messages were just decoded from JSON, so only the offset needs converting
+        return SMSResponse.model_construct(
+            data=json_data, next_offset=int(response.headers.get("KAFKA_NEXT_OFFSET", offset))
+        )
 
     def after(self, epoch: datetime) -> UDLSecureMessage:
         epoch_str = epoch.strftime(self.dt_format)
@@ -95,12 +93,18 @@ class UDLSecureMessage(UDLSMSBaseAction):
 
     def get_messages_and_sm_header(self, topic: UDLBaseDataType, offset: int) -> tuple:
         url = "/".join([self._base_url, UDLSecureMessageType.MESSAGES.value, topic.value, str(offset)])
-        response_object = self.session.get(url)
+        response_object = self._get(url)
         response_object.raise_for_status()
         sm_header = response_object.headers
-        messages = response_object.json()
+        messages = JSONCodec.active().decode(response_object.content)
         return messages, sm_header
 
+    def _get(self, url: str) -> httpx.Response:
+        # every secure-messaging request, lag checks included, draws from the limiter shared by every instance and
+        # process using the same credential
+        self.rate_limiter.acquire()
+        return self.session.get(url, auth=self.auth)
+
     def _regenerate(self) -> UDLSecureMessage:
         base_str = self._build_base_url()
         valid_queries = [val for val in [self._time] if val]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+
+from dewdl import DEWDL_LOG
+from dewdl.models._sms_response import SMSResponse
+from dewdl.stores import CheckpointStore, FileCheckpointStore
+from dewdl.udl_actions._udl_secure_message import UDLSecureMessage
+
+
+class UDLSecureMessageConsumer:
+    """Consumes a secure-messaging topic from the last committed offset, committing progress to a CheckpointStore.
+
+    Iterating yields one ``SMSResponse`` page at a time.  A page's ``next_offset`` only becomes committable once the
+    caller asks for the following page, so every message is processed at least once across restarts.  Commits are
+    batched: they happen every ``commit_every`` pages or ``commit_interval`` seconds, and when iteration stops.
+    """
+
+    DEFAULT_COMMIT_EVERY = 10
+    DEFAULT_COMMIT_INTERVAL = 5.0
+    DEFAULT_IDLE_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        secure_message: UDLSecureMessage,
+        consumer_name: str,
+        store: CheckpointStore | None = None,
+        initial_offset: int | None = None,
+        commit_every: int = DEFAULT_COMMIT_EVERY,
+        commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+        idle_interval: float = DEFAULT_IDLE_INTERVAL,
+    ) -> None:
+        self.secure_message = secure_message
+        self.consumer_name = consumer_name
+        self.topic = secure_message.base_data_type.value
+        self.store = store or FileCheckpointStore()
+        self.initial_offset = initial_offset
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.idle_interval = idle_interval
+        self._pending_offset: int | None = None
+        self._committed_offset: int | None = None
+        self._uncommitted_pages = 0
+        self._last_commit_time = time.monotonic()
+        self._stopped = False
+
+    def resume_offset(self) -> int:
+        """Gets the committed offset, falling back to initial_offset and then to the topic's latest offset."""
+        offset = self.store.load(self.topic, self.consumer_name)
+        if offset is None:
+            offset = self.initial_offset if self.initial_offset is not None else self.secure_message.get_latest_offset()
+        return offset
+
+    def __iter__(self) -> Iterator[SMSResponse]:
+        self._stopped = False
+        offset = self.resume_offset()
+        self._committed_offset = offset
+        DEWDL_LOG.info(f"Consumer {self.consumer_name} resuming {self.topic} at offset {offset}")
+        try:
+            while not self._stopped:
+                response = self.secure_message.get_messages(offset)
+                if response.data:
+                    yield response
+                elif self.idle_interval:
+                    time.sleep(self.idle_interval)
+                # reaching this point means the caller finished with the page
+                offset = response.next_offset
+                self._advance(offset)
+        finally:
+            self.commit()
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def commit(self) -> None:
+        if self._pending_offset is not None and self._pending_offset != self._committed_offset:
+            self.store.save(self.topic, self.consumer_name, self._pending_offset)
+            self._committed_offset = self._pending_offset
+        self._uncommitted_pages = 0
+        self._last_commit_time = time.monotonic()
+
+    def _advance(self, offset: int) -> None:
+        self._pending_offset = offset
+        self._uncommitted_pages += 1
+        elapsed = time.monotonic() - self._last_commit_time
+        if self._uncommitted_pages >= self.commit_every or elapsed >= self.commit_interval:
+            self.commit()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.models._sms_response import SMSResponse
+from dewdl.udl_actions._udl_secure_message import UDLSecureMessage
+
+
+@dataclass(frozen=True)
+class TopicPage:
+    topic: UDLBaseDataType
+    offset: int
+    response: SMSResponse
+
+
+@dataclass
+class _TopicState:
+    secure_message: UDLSecureMessage
+    offset: int
+    latest_offset: int
+    lag_checked_at: float
+    last_poll: float = 0.0
+    eligible_at: float = 0.0
+    backoff: float = 0.0
+
+    @property
+    def lag(self) -> int:
+        return max(self.latest_offset - self.offset, 0)
+
+
+class UDLSecureMessageMultiplexer:
+    """Consumes several secure-messaging topics through one scheduler that shares the per-credential rate limit.
+
+    Every request, including the latest-offset checks used to measure lag, draws from the rate limiter shared by every
+    ``UDLSecureMessage`` using the same credential, so the scheduler only decides which topic spends the next request.
+    Each poll goes to the eligible topic with the highest ``(1 + log(1 + lag)) * seconds since last poll``, so lagging
+    topics are polled more often without starving the rest.  Topics returning empty pages back off exponentially.
+    """
+
+    DEFAULT_MAX_BACKOFF = 30.0
+    DEFAULT_LAG_REFRESH_INTERVAL = 30.0
+
+    def __init__(
+        self,
+        secure_messages: list[UDLSecureMessage],
+        offsets: dict[UDLBaseDataType, int] | None = None,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        lag_refresh_interval: float = DEFAULT_LAG_REFRESH_INTERVAL,
+    ) -> None:
+        self.min_interval = UDLSecureMessage.MINIMUM_MESSAGE_FREQUENCY
+        self.max_backoff = max_backoff
+        self.lag_refresh_interval = lag_refresh_interval
+        self._stopped = False
+        offsets = offsets or {}
+        self._topics: dict[UDLBaseDataType, _TopicState] = {}
+        for secure_message in secure_messages:
+            latest_offset = secure_message.get_latest_offset()
+            offset = offsets.get(secure_message.base_data_type, latest_offset)
+            self._topics[secure_message.base_data_type] = _TopicState(
+                secure_message, offset, latest_offset, lag_checked_at=time.monotonic()
+            )
+
+    @property
+    def offsets(self) -> dict[UDLBaseDataType, int]:
+        return {topic: state.offset for topic, state in self._topics.items()}
+
+    @property
+    def lags(self) -> dict[UDLBaseDataType, int]:
+        return {topic: state.lag for topic, state in self._topics.items()}
+
+    def __iter__(self) -> Iterator[TopicPage]:
+        self._stopped = False
+        while not self._stopped:
+            state = self._next_topic()
+            now = time.monotonic()
+            if now - state.lag_checked_at >= self.lag_refresh_interval:
+                state.latest_offset = state.secure_message.get_latest_offset()
+                state.lag_checked_at = time.monotonic()
+            offset = state.offset
+            response = state.secure_message.get_messages(offset)
+            state.last_poll = time.monotonic()
+            state.offset = response.next_offset
+            state.latest_offset = max(state.latest_offset, state.offset)
+            if response.data:
+                state.backoff = 0.0
+                state.eligible_at = 0.0
+                yield TopicPage(state.secure_message.base_data_type, offset, response)
+            else:
+                state.backoff = min(max(state.backoff * 2, self.min_interval), self.max_backoff)
+                state.eligible_at = state.last_poll + state.backoff
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def _next_topic(self) -> _TopicState:
+        now = time.monotonic()
+        eligible = [state for state in self._topics.values() if state.eligible_at <= now]
+        if not eligible:
+            earliest = min(self._topics.values(), key=lambda state: state.eligible_at)
+            time.sleep(earliest.eligible_at - now)
+            return earliest
+        return max(eligible, key=lambda state: (1 + math.log1p(state.lag)) * (now - state.last_poll))
@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks._generators import generate_records
+from benchmarks._runner import Benchmark, BenchmarkResult, compare, load_baseline, run, save_baseline
+from dewdl.enums import UDLBaseDataType
+from dewdl.models import Elset, Notification
+
+
+@pytest.mark.parametrize("data_type", list(UDLBaseDataType))
+def test_generated_records_are_reproducible(data_type):
+    records = generate_records(data_type, 20, seed=7)
+
+    assert records == generate_records(data_type, 20, seed=7)
+    assert len({record["id"] for record in records}) == 20
+    assert all({"classificationMarking", "source", "dataMode"} <= record.keys() for record in records)
+
+
+def test_generated_records_validate():
+    for record in generate_records(UDLBaseDataType.ELSET, 50):
+        Elset.model_validate(record)
+    for record in generate_records(UDLBaseDataType.NOTIFICATION, 50):
+        Notification.model_validate(record)
+
+
+def test_run_and_compare_with_baseline(tmp_path):
+    results = run([Benchmark("sum", lambda: lambda: sum(range(10))), Benchmark("skipped", lambda: None)], 1, "^sum$")
+    assert [result.name for result in results] == ["sum"]
+    assert results[0].seconds > 0
+
+    save_baseline(tmp_path / "baseline.json", [BenchmarkResult("sum", 1.0, 10), BenchmarkResult("new", 2.0, 10)])
+    baseline = load_baseline(tmp_path / "baseline.json")
+    comparisons = compare(
+        [BenchmarkResult("sum", 1.2, 10), BenchmarkResult("new", 2.6, 10), BenchmarkResult("unknown", 1.0, 10)],
+        baseline,
+        threshold=0.25,
+    )
+
+    assert [comparison.regressed for comparison in comparisons] == [False, True, False]
+    assert comparisons[2].ratio is None
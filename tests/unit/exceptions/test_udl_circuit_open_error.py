@@ -0,0 +1,10 @@
+from dewdl.exceptions import UDLCircuitOpenError
+
+
+def test_circuit_open_message():
+    error = UDLCircuitOpenError("test.unifieddatalibrary.com/udl/elset", 12.34)
+
+    assert error.retry_in == 12.34
+    assert (
+        str(error) == "Circuit open for test.unifieddatalibrary.com/udl/elset after repeated failures; retry in 12.3s"
+    )
@@ -0,0 +1,8 @@
+from dewdl.exceptions import UDLDownloadVerificationError
+
+
+def test_download_verification_message():
+    error = UDLDownloadVerificationError("abc-123", "10 bytes", "8 bytes")
+
+    assert error.file_id == "abc-123"
+    assert str(error) == "Download of abc-123 failed verification: expected 10 bytes, got 8 bytes"
@@ -38,3 +38,14 @@ def test_unknown_without_msg(mock_unknown_no_msg_response):
         raise UDLRequestError(mock_unknown_no_msg_response)
 
     assert str(error_message.value) == "-1 - Unexpected response"
+
+
+def test_non_json_body_uses_truncated_text():
+    html = "<html><body>\n503 Service Temporarily Unavailable " + "x" * 300 + "</body></html>"
+
+    error = UDLRequestError(mock({"status_code": 503, "text": html}))
+
+    assert str(error).startswith("503 - <html><body> 503 Service Temporarily Unavailable xxx")
+    assert len(str(error)) == len("503 - ") + UDLRequestError.MAX_TEXT_LENGTH
+    assert str(UDLRequestError(mock({"status_code": 502, "text": ""}))) == "502 - Unexpected response"
+    assert str(UDLRequestError(mock({"status_code": 500, "text": "[1, 2]"}))) == "500 - Unexpected response"
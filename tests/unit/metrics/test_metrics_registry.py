@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from dewdl.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_values_are_summed_across_matching_series(registry):
+    requests = registry.counter("requests_total", "Requests", ("endpoint", "status"))
+    requests.inc(endpoint="/udl/elset", status=200)
+    requests.inc(2, endpoint="/udl/elset", status=503)
+    requests.inc(endpoint="/udl/eoobservation", status=200)
+
+    assert requests.value() == 4
+    assert requests.value(endpoint="/udl/elset") == 3
+    assert requests.value(status="200") == 2
+    with pytest.raises(ValueError, match="Unknown labels"):
+        requests.inc(host="udl")
+
+
+def test_histogram_snapshot(registry):
+    latency = registry.histogram("latency_seconds", "Latency", ("phase",), buckets=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, phase="ttfb")
+    latency.observe(50.0, phase="download")
+
+    ttfb = latency.snapshot(phase="ttfb")
+    assert ttfb.counts == (1, 2, 1, 0)
+    assert ttfb.mean == pytest.approx(1.5125)
+    assert 0.1 <= ttfb.quantile(0.5) <= 1.0
+    assert latency.snapshot().count == 5
+    assert math.isnan(latency.snapshot(phase="tls").mean)
+
+
+def test_registration_is_idempotent(registry):
+    assert registry.counter("a_total", "A", ("x",)) is registry.counter("a_total", "A", ("x",))
+    with pytest.raises(ValueError, match="already registered"):
+        registry.histogram("a_total", "A", ("x",))
+
+
+def test_prometheus_export(registry, tmp_path):
+    registry.counter("requests_total", "Requests", ("endpoint",)).inc(endpoint='/udl/"elset"')
+    registry.histogram("latency_seconds", "Latency", buckets=(1.0,)).observe(0.5)
+
+    text = registry.to_prometheus()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{endpoint="/udl/\\"elset\\""} 1.0' in text
+    assert 'latency_seconds_bucket{le="1.0"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "latency_seconds_count 1" in text
+
+    registry.write_prometheus(tmp_path / "dewdl.prom")
+    assert (tmp_path / "dewdl.prom").read_text() == text
+    exported = []
+    registry.export(exported.append)
+    assert exported == [text]
+
+    registry.reset()
+    assert registry.get("requests_total").value() == 0
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from dewdl.models import Elset, lazy_records, validate_records
+
+
+@pytest.fixture
+def elsets():
+    return [
+        {
+            "epoch": "2024-07-05T16:13:19.178688Z",
+            "classificationMarking": "U//DS-SSDP-ELSET",
+            "meanMotion": 1.00248566,
+            "eccentricity": 0.5166855,
+            "inclination": 3.4195,
+            "raan": 62.2389,
+            "argOfPerigee": 300.7814,
+            "meanAnomaly": 309.2249,
+            "satNo": sat_no,
+            "source": "SSDP",
+            "dataMode": "TEST",
+        }
+        for sat_no in range(10)
+    ]
+
+
+def test_validate_records_from_bytes(elsets):
+    models = validate_records(Elset, json.dumps(elsets).encode())
+    assert [model.satNo for model in models] == list(range(10))
+
+
+def test_validate_records_invalid(elsets):
+    elsets[3]["meanMotion"] = "fast"
+    with pytest.raises(ValidationError):
+        validate_records(Elset, elsets)
+
+
+def test_lazy_records(elsets):
+    elsets[0]["satNo"] = "12"
+    elsets[0]["meanMotion"] = "fast"
+    record = lazy_records(Elset, elsets)[0]
+    assert record.satNo == 12
+    assert record.bStar is None
+    with pytest.raises(ValidationError):
+        _ = record.meanMotion
+    with pytest.raises(AttributeError):
+        _ = record.notAField
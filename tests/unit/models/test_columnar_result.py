@@ -0,0 +1,55 @@
+import pytest
+
+from dewdl.models import CategoricalColumn, ColumnarResult, Elset
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def elsets():
+    return [
+        {
+            "classificationMarking": "U",
+            "satNo": sat_no,
+            "epoch": f"2024-07-05T16:13:{sat_no:02d}.178688Z",
+            "meanMotion": 1.00248566,
+            "eccentricity": 0.5166855,
+            "inclination": 3.4195,
+            "raan": 62.2389,
+            "argOfPerigee": 300.7814,
+            "meanAnomaly": 309.2249,
+            "source": "SSDP" if sat_no % 2 else "18SDS",
+            "dataMode": "TEST",
+            "tags": ["dnd_catalog"],
+        }
+        for sat_no in range(4)
+    ]
+
+
+def test_from_records_with_model(elsets):
+    elsets[0]["satNo"] = None
+    result = ColumnarResult.from_records(elsets, Elset)
+    assert len(result) == 4
+    assert result["meanMotion"].dtype == np.float64
+    assert result["epoch"].dtype == np.dtype("datetime64[us]")
+    assert result["epoch"][1] == np.datetime64("2024-07-05T16:13:01.178688")
+    assert np.isnan(result["satNo"][0])
+    assert np.isnan(result["bStar"]).all()
+    source = result["source"]
+    assert isinstance(source, CategoricalColumn)
+    assert list(source.categories) == ["18SDS", "SSDP"]
+    assert list(source.values()) == ["18SDS", "SSDP", "18SDS", "SSDP"]
+
+
+def test_from_records_inferred(elsets):
+    result = ColumnarResult.from_records(iter(elsets))
+    assert result["satNo"].dtype == np.int64
+    assert result["tags"].dtype == object
+    assert "bStar" not in result
+
+
+def test_to_pandas(elsets):
+    pd = pytest.importorskip("pandas")
+    frame = ColumnarResult.from_records(elsets, Elset).to_pandas()
+    assert isinstance(frame["source"].dtype, pd.CategoricalDtype)
+    assert frame["inclination"].tolist() == [3.4195] * 4
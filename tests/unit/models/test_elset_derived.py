@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+from dewdl.models import ColumnarResult, Elset, derive_elsets, fill_derived
+
+np = pytest.importorskip("numpy")
+
+GEO = {
+    "source": "SSDP",
+    "classificationMarking": "U",
+    "dataMode": "TEST",
+    "epoch": "2024-07-05T12:00:00.000000Z",
+    "meanMotion": 1.00273791,
+    "eccentricity": 0.0,
+    "inclination": 0.1,
+    "raan": 62.2389,
+    "argOfPerigee": 300.7814,
+    "meanAnomaly": 309.2249,
+}
+LEO = {**GEO, "epoch": "2024-07-04T12:00:00.000000Z", "meanMotion": 15.5, "eccentricity": 0.001}
+
+
+def test_derive_geo_and_leo_quantities():
+    derived = derive_elsets([GEO, LEO], reference=datetime(2024, 7, 6, 12))
+
+    assert derived.semiMajorAxis[0] == pytest.approx(42164.2, abs=1)
+    assert derived.period[0] == pytest.approx(1436.07, abs=0.01)
+    assert derived.apogee[0] == pytest.approx(35786, abs=1)
+    assert derived.apogee[1] - derived.perigee[1] == pytest.approx(2 * 0.001 * derived.semiMajorAxis[1])
+    assert derived.epoch[1] == np.datetime64("2024-07-04T12:00:00")
+    assert derived.age.tolist() == [1.0, 2.0]
+
+
+def test_models_dicts_and_columns_agree():
+    reference = datetime(2024, 7, 6)
+    from_dicts = derive_elsets([GEO, LEO], reference)
+    from_models = derive_elsets([Elset(**GEO), Elset(**LEO)], reference)
+    from_columns = derive_elsets(ColumnarResult.from_records([GEO, LEO], Elset), reference)
+
+    for name, values in from_dicts.as_dict().items():
+        np.testing.assert_array_equal(values, from_models.as_dict()[name])
+        np.testing.assert_array_equal(values, from_columns.as_dict()[name])
+
+
+def test_fill_derived_only_fills_missing_values():
+    elsets = [Elset(**GEO, period=1000.0), {**LEO}]
+
+    derived = fill_derived(elsets)
+
+    assert elsets[0].period == 1000.0
+    assert elsets[0].semiMajorAxis == pytest.approx(derived.semiMajorAxis[0])
+    assert elsets[1]["perigee"] == pytest.approx(derived.perigee[1])
+    assert isinstance(elsets[1]["perigee"], float)
+
+
+def test_fill_derived_skips_non_finite_values():
+    elsets = [{**LEO, "meanMotion": 0.0}, {**LEO, "eccentricity": 1.2}, {**LEO}]
+
+    derived = fill_derived(elsets, overwrite=True)
+
+    assert np.isnan(derived.period[:2]).all()
+    assert all(name not in elsets[0] for name in ("semiMajorAxis", "period", "apogee", "perigee"))
+    assert "perigee" not in elsets[1]
+    assert elsets[2]["perigee"] == pytest.approx(derived.perigee[2])
+
+
+def test_fill_derived_overwrite():
+    elset = Elset(**GEO, period=1000.0)
+
+    fill_derived([elset], overwrite=True)
+
+    assert elset.period == pytest.approx(1436.07, abs=0.01)
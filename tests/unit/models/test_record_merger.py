@@ -0,0 +1,97 @@
+from dewdl.enums import UDLBaseDataType
+from dewdl.models import Elset, MergePolicy, RecordMerger
+
+
+def _elset(sat_no, epoch, source="SSDP", data_mode="REAL", created_at="2024-09-16T00:00:00.000000Z", **fields):
+    return {
+        "satNo": sat_no,
+        "epoch": epoch,
+        "source": source,
+        "dataMode": data_mode,
+        "createdAt": created_at,
+        **fields,
+    }
+
+
+EPOCH_1 = "2024-09-16T01:00:00.000000Z"
+EPOCH_2 = "2024-09-16T02:00:00.000000Z"
+
+
+def test_merge_drops_duplicates_across_streams():
+    first = [_elset(1, EPOCH_1), _elset(2, EPOCH_1)]
+    second = [_elset(1, EPOCH_1), _elset(1, EPOCH_2)]
+    merger = RecordMerger(UDLBaseDataType.ELSET)
+
+    merged = list(merger.merge(first, second))
+
+    assert [(record["satNo"], record["epoch"]) for record in merged] == [(1, EPOCH_1), (2, EPOCH_1), (1, EPOCH_2)]
+    assert merger.seen == 4
+    assert merger.duplicates == 1
+
+
+def test_real_beats_test_then_preferred_source_then_newest():
+    records = [
+        _elset(1, EPOCH_1, source="SSDP", data_mode="TEST", created_at="2024-09-17T00:00:00.000000Z"),
+        _elset(1, EPOCH_1, source="SSDP", created_at="2024-09-16T03:00:00.000000Z"),
+        _elset(1, EPOCH_1, source="18SDS", created_at="2024-09-16T01:00:00.000000Z"),
+        _elset(1, EPOCH_1, source="18SDS", created_at="2024-09-16T02:00:00.0Z"),
+    ]
+
+    by_newest = list(RecordMerger(UDLBaseDataType.ELSET).merge(records))
+    by_source = list(
+        RecordMerger(UDLBaseDataType.ELSET, policy=MergePolicy(preferred_sources=("18SDS",))).merge(records)
+    )
+
+    assert by_newest == [records[1]]
+    assert by_source == [records[3]]
+
+
+def test_custom_key_and_id_fallback():
+    records = [
+        _elset(1, EPOCH_1, idElset="a"),
+        _elset(2, EPOCH_2, idElset="a"),
+        _elset(3, EPOCH_1),
+        _elset(3, EPOCH_1, id="x"),
+    ]
+
+    merged = list(RecordMerger(UDLBaseDataType.ELSET, key="idElset").merge(records))
+
+    # records without an idElset fall back to their id, or pass through when they have none
+    assert merged == [records[0], records[2], records[3]]
+
+
+def test_key_normalizes_the_time_field():
+    records = [_elset(1, EPOCH_1), _elset(1, "2024-09-16T01:00:00.0Z"), _elset(1, "2024-09-16T01:00:00Z")]
+
+    merged = list(RecordMerger(UDLBaseDataType.ELSET).merge(records))
+
+    assert merged == [records[0]]
+
+
+def test_merge_sorted_yields_as_time_advances():
+    first = [_elset(1, EPOCH_1), _elset(1, EPOCH_2)]
+    second = [_elset(1, EPOCH_1, source="18SDS"), _elset(2, EPOCH_2)]
+    merger = RecordMerger(UDLBaseDataType.ELSET, policy=MergePolicy(preferred_sources=("18SDS",)))
+
+    merged = merger.merge_sorted(iter(first), iter(second))
+
+    assert next(merged) is second[0]
+    assert list(merged) == [first[1], second[1]]
+
+
+def test_merge_accepts_models():
+    elset = Elset(
+        source="SSDP",
+        classificationMarking="U",
+        dataMode="REAL",
+        epoch=EPOCH_1,
+        meanMotion=15.5,
+        eccentricity=0.001,
+        inclination=51.6,
+        raan=0.0,
+        argOfPerigee=0.0,
+        meanAnomaly=0.0,
+        satNo=25544,
+    )
+
+    assert list(RecordMerger(UDLBaseDataType.ELSET).merge([elset, elset.model_copy()])) == [elset]
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from dewdl.requests._json_array_stream import iter_json_array
+
+
+@pytest.fixture
+def records():
+    return [{"satNo": i, "epoch": f"2024-09-16T00:00:{i:02d}.000000Z", "tags": ["a,b", "]"]} for i in range(20)] + [
+        12345,
+        "text",
+    ]
+
+
+def test_single_chunk(records):
+    assert list(iter_json_array([json.dumps(records)])) == records
+
+
+def test_every_split_point(records):
+    text = json.dumps(records, indent=1)
+    for split in range(len(text)):
+        assert list(iter_json_array([text[:split], text[split:]])) == records
+
+
+def test_character_chunks(records):
+    assert list(iter_json_array(json.dumps(records))) == records
+
+
+def test_empty_array():
+    assert list(iter_json_array([" [ ", "] "])) == []
+
+
+def test_not_an_array():
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        list(iter_json_array(['{"a": 1}']))
+
+
+def test_truncated_array():
+    with pytest.raises(ValueError, match="Incomplete JSON array"):
+        list(iter_json_array(['[{"a": 1}, {"a"']))
@@ -0,0 +1,72 @@
+import math
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from dewdl.enums import UDLFileDropType
+from dewdl.requests import JSONCodec, UDLRequest, UDLRequestPayload
+from dewdl.udl_actions import UDLFileDrop
+
+
+@pytest.fixture(params=["stdlib", "orjson", "msgspec"])
+def codec(request):
+    pytest.importorskip(request.param if request.param != "stdlib" else "json")
+    JSONCodec.use(request.param)
+    yield JSONCodec.active()
+    JSONCodec.use(None)
+
+
+def test_codec_round_trip(codec):
+    record = {"satNo": 25544, "uct": True, "algorithm": None, "description": "True anomaly False alarm"}
+
+    encoded = codec.encode(record)
+
+    assert isinstance(encoded, bytes)
+    assert b"true" in encoded
+    assert b"null" in encoded
+    assert codec.decode(encoded) == record
+    assert codec.decode(encoded.decode("utf-8")) == record
+
+
+def test_post_body_keeps_string_values(codec):
+    payload = UDLRequestPayload(
+        UDLFileDrop(UDLFileDropType.ELSET), "POST", post_body={"uct": False, "source": "TrueSat"}
+    )
+    request_args, headers = {}, {}
+
+    UDLRequest._setup_post_params(payload, request_args, headers)
+
+    assert codec.decode(request_args["post_data"]) == {"uct": False, "source": "TrueSat"}
+    assert headers["content-type"] == "application/json"
+
+
+def test_codecs_agree_on_datetimes_and_non_finite_floats(codec):
+    record = {
+        "epoch": datetime(2024, 9, 16, 1, 2, 3, 5, tzinfo=timezone.utc),
+        "createdAt": datetime(2024, 9, 16),
+        "local": datetime(2024, 9, 16, tzinfo=timezone(timedelta(hours=5))),
+        "day": date(2024, 9, 16),
+        "values": [math.nan, math.inf, 1.5],
+        "site": "Kwajalein Atoll – Roi-Namur",
+    }
+
+    assert codec.encode(record) == (
+        b'{"epoch":"2024-09-16T01:02:03.000005Z","createdAt":"2024-09-16T00:00:00",'
+        b'"local":"2024-09-16T00:00:00+05:00","day":"2024-09-16","values":[null,null,1.5],'
+        + '"site":"Kwajalein Atoll – Roi-Namur"}'.encode()
+    )
+
+
+def test_codecs_reject_nan_tokens(codec):
+    with pytest.raises(ValueError):
+        codec.decode(b'{"meanMotion":NaN}')
+
+
+def test_format_booleans_is_deprecated():
+    with pytest.deprecated_call():
+        assert UDLRequest.format_booleans('{"uct": True}') == '{"uct": true}'
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        JSONCodec.use("yaml")
@@ -0,0 +1,58 @@
+import httpx
+import pytest
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.metrics import MetricsRegistry
+from dewdl.requests import UDLRequest, UDLRetryPolicy, UDLSession
+from dewdl.requests._request_trace import _PhaseTrace
+from dewdl.udl_actions import UDLQuery
+
+
+@pytest.fixture
+def metrics():
+    registry = MetricsRegistry.default()
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.fixture
+def _flaky_udl():
+    responses = iter([httpx.Response(503, json={"message": "down"}), httpx.Response(200, json=[{"satNo": 1}])])
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(lambda request: next(responses))))
+    UDLRequest.use_retry_policy(UDLRetryPolicy(backoff=0.001))
+    yield
+    UDLRequest.use_session(None)
+    UDLRequest.use_retry_policy(UDLRetryPolicy())
+
+
+@pytest.mark.usefixtures("_flaky_udl")
+def test_requests_are_recorded(metrics):
+    UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET))
+
+    requests = metrics.get("dewdl_requests_total")
+    assert requests.value(endpoint="/udl/elset", data_type="elset", method="GET") == 2
+    assert requests.value(status="503") == 1
+    assert metrics.get("dewdl_retries_total").value(reason="503") == 1
+    assert metrics.get("dewdl_response_bytes_total").value(data_type="elset") > 0
+    assert metrics.get("dewdl_request_duration_seconds").snapshot(status="200").count == 1
+    assert 'dewdl_requests_total{endpoint="/udl/elset",data_type="elset",method="GET",status="200"} 1.0' in (
+        metrics.to_prometheus()
+    )
+
+
+def test_phase_trace(metrics):
+    trace = _PhaseTrace(httpx.Request("GET", "https://test.unifieddatalibrary.com/sm/getMessages/elset/1234"))
+    for event in (
+        "connection.connect_tcp",
+        "connection.start_tls",
+        "http11.send_request_headers",
+        "http11.receive_response_headers",
+        "http11.receive_response_body",
+    ):
+        trace(f"{event}.started", {})
+        trace(f"{event}.complete", {})
+
+    phases = metrics.get("dewdl_request_phase_seconds")
+    for phase in ("connect", "tls", "ttfb", "download"):
+        assert phases.snapshot(endpoint="/sm/getMessages/elset/:id", phase=phase).count == 1
@@ -0,0 +1,64 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from dewdl.requests import TokenBucketRateLimiter
+
+
+def _drain(path, count):
+    limiter = TokenBucketRateLimiter(rate=50, capacity=1, path=path)
+    for _ in range(count):
+        limiter.acquire()
+
+
+def test_try_acquire_reports_wait():
+    limiter = TokenBucketRateLimiter(rate=10, capacity=2)
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() == pytest.approx(0.1, abs=0.01)
+
+
+def test_acquire_timeout():
+    limiter = TokenBucketRateLimiter(rate=0.5, capacity=1)
+    assert limiter.acquire()
+    assert not limiter.acquire(timeout=0.1)
+
+
+def test_more_tokens_than_capacity_are_rejected():
+    limiter = TokenBucketRateLimiter(rate=10, capacity=2)
+    with pytest.raises(ValueError, match="capacity"):
+        limiter.acquire(3)
+    with pytest.raises(ValueError, match="capacity"):
+        asyncio.run(limiter.acquire_async(3))
+
+
+def test_acquire_async(tmp_path):
+    limiter = TokenBucketRateLimiter(rate=100, capacity=1, path=tmp_path / "bucket")
+
+    async def _acquire_many():
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(6)))
+
+    start = time.monotonic()
+    asyncio.run(_acquire_many())
+    assert time.monotonic() - start >= 0.045
+
+
+def test_shared_between_processes(tmp_path):
+    path = tmp_path / "bucket"
+    start = time.monotonic()
+    workers = [multiprocessing.Process(target=_drain, args=(path, 10)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # 20 tokens at 50 per second with a burst of 1 cannot be drawn in under ~0.38 s
+    assert time.monotonic() - start >= 0.35
+    assert all(worker.exitcode == 0 for worker in workers)
+
+
+def test_for_credential_is_shared():
+    limiter = TokenBucketRateLimiter.for_credential("user", "secure_messaging", rate=3)
+    assert TokenBucketRateLimiter.for_credential("user", "secure_messaging", rate=3) is limiter
+    assert TokenBucketRateLimiter.for_credential("other", "secure_messaging", rate=3) is not limiter
@@ -0,0 +1,101 @@
+import json
+from itertools import islice
+
+import httpx
+import pytest
+from mockito import mock, when
+
+from dewdl.enums import UDLFileDropType
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+from dewdl.requests import UDLBulkFileDrop, UDLCircuitBreaker, UDLRequest, UDLSession
+
+
+def _records(count):
+    for sat_no in range(count):
+        yield {"satNo": sat_no, "source": "SSDP", "uct": sat_no % 2 == 0}
+
+
+@pytest.fixture
+def uploads():
+    return []
+
+
+@pytest.fixture
+def failures():
+    return {}
+
+
+@pytest.fixture
+def fake_filedrop(uploads, failures):
+    def _filedrop(endpoint, body):
+        records = json.loads(body)
+        first = records[0]["satNo"]
+        if failures.get(first):
+            status_code = failures[first].pop(0)
+            if isinstance(status_code, Exception):
+                raise status_code
+            raise UDLRequestError(mock({"status_code": status_code, "text": '{"message": "failed"}'}))
+        uploads.append(records)
+        return "Accepted"
+
+    when(UDLRequest).filedrop(...).thenAnswer(_filedrop)
+
+
+def test_batches_are_bounded_by_bytes():
+    uploader = UDLBulkFileDrop(UDLFileDropType.ELSET, max_batch_bytes=200)
+    batches = list(uploader.batches(_records(20)))
+    assert all(len(body) <= 200 for body, _ in batches)
+    assert sum(count for _, count in batches) == 20
+    assert [r["satNo"] for body, _ in batches for r in json.loads(body)] == list(range(20))
+    assert b"true" in batches[0][0]
+
+
+@pytest.mark.usefixtures("_unstub", "fake_filedrop")
+def test_upload_retries_failed_batches(uploads, failures):
+    uploader = UDLBulkFileDrop(UDLFileDropType.ELSET, max_batch_bytes=200, backoff=0.001)
+    second_batch = json.loads(next(islice(uploader.batches(_records(20)), 1, None))[0])
+    failures[0] = [503]
+    failures[second_batch[0]["satNo"]] = [400]
+    receipts = uploader.upload(_records(20))
+    assert [receipt.batch for receipt in receipts] == list(range(len(receipts)))
+    assert receipts[0].ok
+    assert receipts[0].attempts == 2
+    failed = [receipt for receipt in receipts if not receipt.ok]
+    assert len(failed) == 1
+    assert failed[0].error.status_code == 400
+    assert sum(len(records) for records in uploads) == 20 - failed[0].records
+
+
+@pytest.mark.usefixtures("_unstub", "fake_filedrop")
+def test_unexpected_errors_fail_only_their_batch(uploads, failures):
+    uploader = UDLBulkFileDrop(UDLFileDropType.ELSET, max_batch_bytes=200, backoff=0.001)
+    failures[0] = [TypeError("Object of type set is not JSON serializable")]
+
+    receipts = uploader.upload(_records(20))
+
+    assert isinstance(receipts[0].error, TypeError)
+    assert receipts[0].attempts == 1
+    assert all(receipt.ok for receipt in receipts[1:])
+    assert sum(len(records) for records in uploads) == 20 - receipts[0].records
+
+
+def test_open_circuit_fails_remaining_batches_with_receipts():
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(503, json={"message": "down"})
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+    UDLRequest.use_circuit_breaker(UDLCircuitBreaker(failure_threshold=1, reset_timeout=60))
+    try:
+        uploader = UDLBulkFileDrop(UDLFileDropType.ELSET, max_batch_bytes=200, max_workers=1, retries=0)
+        receipts = uploader.upload(_records(20))
+    finally:
+        UDLRequest.use_session(None)
+        UDLRequest.use_circuit_breaker(UDLCircuitBreaker())
+
+    assert len(receipts) > 2
+    assert len(sent) == 1
+    assert receipts[0].error.status_code == 503
+    assert all(isinstance(receipt.error, UDLCircuitOpenError) for receipt in receipts[1:])
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from mockito import mock, when
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.requests import UDLDeltaSync, UDLRequest
+from dewdl.stores import HighWaterMarkStore
+
+
+@pytest.fixture
+def udl_records():
+    return []
+
+
+@pytest.fixture
+def requested(udl_records):
+    queries = []
+
+    def _get(query):
+        queries.append(query)
+        records = [r for r in udl_records if r["obTime"] > query.start.strftime(query.dt_format)]
+        return mock({"content": json.dumps(records).encode("utf-8")})
+
+    when(UDLRequest).get(...).thenAnswer(_get)
+    return queries
+
+
+def _ob(ob_id, seconds):
+    ob_time = datetime(2024, 9, 16) + timedelta(seconds=seconds)
+    return {"id": ob_id, "obTime": ob_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
+
+
+@pytest.fixture
+def delta_sync(tmp_path):
+    return UDLDeltaSync(
+        UDLBaseDataType.EO_OBSERVATION,
+        source="SENSOR",
+        store=HighWaterMarkStore(tmp_path / "marks.json"),
+        overlap=timedelta(seconds=30),
+        initial_start=datetime(2024, 9, 16),
+        key_field="id",
+    )
+
+
+def test_requires_initial_start(tmp_path):
+    with pytest.raises(ValueError, match="no initial_start"):
+        UDLDeltaSync(UDLBaseDataType.ELSET, store=HighWaterMarkStore(tmp_path / "marks.json")).query()
+
+
+@pytest.mark.usefixtures("_unstub")
+def test_delta_runs(delta_sync, udl_records, requested):
+    udl_records.extend([_ob("a", 10), _ob("b", 20)])
+    assert [r["id"] for r in delta_sync.run()] == ["a", "b"]
+    assert delta_sync.mark.time == datetime(2024, 9, 16, 0, 0, 20)
+
+    udl_records.extend([_ob("c", 15), _ob("d", 40)])
+    assert [r["id"] for r in delta_sync.run()] == ["c", "d"]
+    assert requested[-1].to_string().endswith("obTime=%3E2024-09-15T23:59:50.000000Z&source=SENSOR&maxResults=10000")
+
+    assert delta_sync.run() == []
+    assert delta_sync.mark.time == datetime(2024, 9, 16, 0, 0, 40)
+
+
+@pytest.mark.usefixtures("_unstub")
+def test_pull_without_commit(delta_sync, udl_records, requested):
+    udl_records.append(_ob("a", 10))
+    records, mark = delta_sync.pull()
+    assert len(records) == 1
+    assert delta_sync.mark is None
+    delta_sync.commit(mark)
+    assert delta_sync.mark == mark
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.requests import UDLAsyncSession, UDLFanOut, UDLRequest
+from dewdl.udl_actions import UDLQuery, UDLQuerySpec
+
+DELAYS = {"SLOW": 0.3, "FAST": 0.0, "MEDIUM": 0.05}
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture(autouse=True)
+def _providers(sent):
+    async def handler(request):
+        source = request.url.params.get("source")
+        descriptor = request.url.params.get("descriptor")
+        sent.append((source, descriptor))
+        if source == "BROKEN":
+            return httpx.Response(500, json={"message": "Provider unavailable"})
+        if source == "GATEWAY":
+            return httpx.Response(500, text="<html><body>Internal Server Error</body></html>")
+        if source == "GARBLED":
+            return httpx.Response(200, content=b"<html>gateway error</html>")
+        await asyncio.sleep(DELAYS.get(source, 0))
+        return httpx.Response(200, json=[{"source": source, "descriptor": descriptor}])
+
+    UDLRequest.use_session(UDLAsyncSession(transport=httpx.MockTransport(handler)), async_flag=True)
+    yield
+    UDLRequest.use_session(None, async_flag=True)
+
+
+def test_fan_out_builds_one_query_per_source_and_descriptor():
+    query = UDLQuery(UDLBaseDataType.ELSET).after(datetime(2024, 9, 16)).from_sources(["A", "B", "A"])
+    query.with_descriptors(["x", "y"])
+
+    queries = query.fan_out()
+
+    assert [(q.source, q.descriptor) for q in queries] == [("A", "x"), ("A", "y"), ("B", "x"), ("B", "y")]
+    assert (
+        queries[0].to_string().endswith("epoch=%3E2024-09-16T00:00:00.000000Z&source=A&descriptor=x&maxResults=10000")
+    )
+
+
+def test_from_source_replaces_from_sources():
+    query = UDLQuery(UDLBaseDataType.ELSET).from_sources(["A", "B"]).from_source("C")
+
+    assert not query.is_fan_out
+    assert query.fan_out() == [query]
+
+
+def test_get_rejects_fan_out_queries():
+    with pytest.raises(ValueError, match="UDLFanOut"):
+        UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET).from_sources(["A", "B"]))
+
+
+def test_every_entry_point_rejects_fan_out_queries(sent):
+    query = UDLQuery(UDLBaseDataType.ELSET).with_descriptors(["x", "y"])
+
+    with pytest.raises(ValueError, match="UDLFanOut"):
+        list(UDLRequest.iter_records(query))
+    with pytest.raises(ValueError, match="UDLFanOut"):
+        UDLQuerySpec.from_query(query)
+    assert sent == []
+
+
+def test_invalid_body_fails_only_its_source():
+    fan_out = UDLFanOut(UDLQuery(UDLBaseDataType.ELSET).from_sources(["GARBLED", "FAST"]))
+
+    results = {result.source: result for result in fan_out}
+
+    assert results["FAST"].records == [{"source": "FAST", "descriptor": None}]
+    assert isinstance(results["GARBLED"].error, ValueError)
+    assert list(fan_out.report()) == ["GARBLED"]
+
+
+def test_error_with_html_body_fails_only_its_source():
+    fan_out = UDLFanOut(UDLQuery(UDLBaseDataType.ELSET).from_sources(["GATEWAY", "FAST"]))
+
+    results = {result.source: result for result in fan_out}
+
+    assert results["FAST"].ok
+    assert results["GATEWAY"].error.status_code == 500
+    assert fan_out.report() == {"GATEWAY": "UDLRequestError: 500 - <html><body>Internal Server Error</body></html>"}
+
+
+def test_results_stream_as_each_source_completes(sent):
+    query = UDLQuery(UDLBaseDataType.ELSET).from_sources(["SLOW", "BROKEN", "FAST", "MEDIUM"])
+    fan_out = UDLFanOut(query)
+
+    results = list(fan_out)
+
+    assert [result.source for result in results] == ["BROKEN", "FAST", "MEDIUM", "SLOW"]
+    assert results[1].records == [{"source": "FAST", "descriptor": None}]
+    assert results[0].error.status_code == 500
+    assert fan_out.report() == {"BROKEN": "UDLRequestError: 500 - Provider unavailable"}
+    assert len(sent) == 4
+
+
+def test_timeout_fails_only_the_slow_source():
+    query = UDLQuery(UDLBaseDataType.ELSET).from_sources(["SLOW", "FAST"])
+
+    async def _run():
+        return [result async for result in UDLFanOut(query, timeout=0.1).results()]
+
+    results = asyncio.run(_run())
+
+    assert results[0].source == "FAST"
+    assert results[0].ok
+    assert isinstance(results[1].error, asyncio.TimeoutError)
@@ -0,0 +1,182 @@
+import hashlib
+
+import httpx
+import pytest
+
+from dewdl.enums import UDLQueryType
+from dewdl.exceptions import UDLDownloadVerificationError
+from dewdl.requests import UDLFileDownload, UDLRequest, UDLSession
+
+FILES = {"img-1": bytes(range(256)) * 40, "img-2": b"x" * 5000, "img-3": b"fits" * 100}
+
+
+class _DroppingStream(httpx.SyncByteStream):
+    def __init__(self, body: bytes, drop_after: int) -> None:
+        self.body = body
+        self.drop_after = drop_after
+
+    def __iter__(self):
+        yield self.body[: self.drop_after]
+        raise httpx.ReadError("connection dropped")
+
+
+def _streamed(status, body, headers=None):
+    # a network response is read as it arrives, unlike one built with content=, which httpx reads up front
+    headers = {"content-length": str(len(body)), **(headers or {})}
+    return httpx.Response(status, headers=headers, stream=httpx.ByteStream(body))
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+def _serve(sent, drop_first=False, honour_range=True):
+    def handler(request):
+        file_id = request.url.path.rsplit("/", 1)[-1]
+        body = FILES[file_id]
+        range_header = request.headers.get("range")
+        sent.append((file_id, range_header))
+        if range_header and honour_range:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(body):
+                return httpx.Response(416, headers={"content-range": f"bytes */{len(body)}"})
+            headers = {"content-range": f"bytes {start}-{len(body) - 1}/{len(body)}"}
+            return _streamed(206, body[start:], headers)
+        if drop_first and len(sent) == 1:
+            return httpx.Response(
+                200, headers={"content-length": str(len(body))}, stream=_DroppingStream(body, len(body) // 3)
+            )
+        return _streamed(200, body)
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+
+
+@pytest.fixture(autouse=True)
+def _reset_session():
+    yield
+    UDLRequest.use_session(None)
+
+
+def test_download_streams_file_to_disk(tmp_path, sent):
+    _serve(sent)
+    checksum = hashlib.sha256(FILES["img-1"]).hexdigest()
+
+    receipt = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download("img-1", checksum=checksum)
+
+    assert receipt.ok
+    assert receipt.checksum == checksum
+    assert (tmp_path / "img-1").read_bytes() == FILES["img-1"]
+    assert not (tmp_path / "img-1.part").exists()
+    assert sent == [("img-1", None)]
+
+
+def test_dropped_connection_resumes_with_range(tmp_path, sent):
+    _serve(sent, drop_first=True)
+
+    receipt = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path, backoff=0).download("img-1")
+
+    assert receipt.ok
+    assert receipt.attempts == 2
+    assert sent == [("img-1", None), ("img-1", f"bytes={len(FILES['img-1']) // 3}-")]
+    assert (tmp_path / "img-1").read_bytes() == FILES["img-1"]
+
+
+def test_existing_partial_file_is_continued(tmp_path, sent):
+    _serve(sent)
+    (tmp_path / "img-2.part").write_bytes(FILES["img-2"][:1000])
+
+    receipt = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download("img-2")
+
+    assert receipt.resumed_from == 1000
+    assert sent == [("img-2", "bytes=1000-")]
+    assert (tmp_path / "img-2").read_bytes() == FILES["img-2"]
+
+
+def test_complete_partial_file_is_not_downloaded_again(tmp_path, sent):
+    _serve(sent)
+    (tmp_path / "img-2.part").write_bytes(FILES["img-2"])
+
+    receipt = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download("img-2", expected_size=5000)
+
+    assert receipt.ok
+    assert (tmp_path / "img-2").read_bytes() == FILES["img-2"]
+
+
+def test_ignored_range_restarts_file(tmp_path, sent):
+    _serve(sent, honour_range=False)
+    (tmp_path / "img-2.part").write_bytes(b"stale")
+
+    receipt = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download("img-2")
+
+    assert receipt.ok
+    assert (tmp_path / "img-2").read_bytes() == FILES["img-2"]
+
+
+def test_checksum_mismatch_discards_file(tmp_path, sent):
+    _serve(sent)
+
+    receipt = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download("img-3", checksum="0" * 64)
+
+    assert isinstance(receipt.error, UDLDownloadVerificationError)
+    assert not (tmp_path / "img-3").exists()
+    assert not (tmp_path / "img-3.part").exists()
+
+
+def test_download_many_returns_receipts_in_order(tmp_path, sent):
+    _serve(sent)
+
+    receipts = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path, max_workers=2).download_many(list(FILES))
+
+    assert [receipt.file_id for receipt in receipts] == list(FILES)
+    assert all(receipt.ok for receipt in receipts)
+    assert all((tmp_path / file_id).read_bytes() == body for file_id, body in FILES.items())
+
+
+def test_body_is_stored_without_decoding(tmp_path):
+    body = b"not really gzip"
+
+    def handler(request):
+        assert request.headers["accept-encoding"] == "identity"
+        return _streamed(200, body, {"content-encoding": "gzip"})
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+
+    receipts = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download_many(["img-1"])
+
+    assert receipts[0].ok
+    assert (tmp_path / "img-1").read_bytes() == body
+
+
+def test_failed_files_do_not_lose_other_receipts(tmp_path, sent):
+    def handler(request):
+        file_id = request.url.path.rsplit("/", 1)[-1]
+        sent.append(file_id)
+        if file_id == "missing":
+            return httpx.Response(404, text="Not Found")
+        return _streamed(200, FILES["img-3"])
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+    (tmp_path / "unwritable.part").mkdir()
+
+    receipts = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download_many(
+        ["ok1", "missing", "unwritable", "ok2"]
+    )
+
+    assert [receipt.ok for receipt in receipts] == [True, False, False, True]
+    assert receipts[1].error.status_code == 404
+    assert isinstance(receipts[2].error, OSError)
+    assert (tmp_path / "ok2").read_bytes() == FILES["img-3"]
+
+
+def test_client_error_is_not_retried(tmp_path, sent):
+    def handler(request):
+        sent.append(request.url)
+        return httpx.Response(404, json={"message": "Not found"})
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+
+    receipt = UDLFileDownload(UDLQueryType.SKY_IMAGERY, tmp_path).download("missing")
+
+    assert receipt.error.status_code == 404
+    assert len(sent) == 1
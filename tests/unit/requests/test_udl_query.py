@@ -62,3 +62,12 @@ def test_with_descriptor():
     eo_str = UDLQuery(UDLBaseDataType.EO_OBSERVATION).with_descriptor("test_descriptor").to_string()
     unstub()
     assert eo_str == "test_base?descriptor=test_descriptor&maxResults=10000"
+
+
+def test_udl_query_as_count():
+    query = UDLQuery(UDLBaseDataType.EO_OBSERVATION).between(datetime(2024, 9, 16), datetime(2024, 9, 17))
+    assert query.as_count().to_string() == (
+        "https://test.unifieddatalibrary.com/udl/eoobservation/count"
+        "?obTime=2024-09-16T00:00:00.000000Z..2024-09-17T00:00:00.000000Z"
+    )
+    assert query.to_string().endswith("&maxResults=10000")
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.udl_actions import UDLQuery, UDLQuerySpec
+
+
+def test_spec_is_canonical_and_hashable():
+    start = datetime(2024, 9, 16)
+    first = UDLQuerySpec.of(UDLBaseDataType.EO_OBSERVATION).from_source("SSDP").after(start)
+    second = UDLQuerySpec.of(UDLBaseDataType.EO_OBSERVATION).after(start).from_source("SSDP")
+
+    assert first == second
+    assert {first: "cached"}[second] == "cached"
+    assert first.to_string() == (
+        "https://test.unifieddatalibrary.com/udl/eoobservation"
+        "?maxResults=10000&obTime=%3E2024-09-16T00:00:00.000000Z&source=SSDP"
+    )
+
+
+def test_spec_builders_return_new_specs():
+    spec = UDLQuerySpec.of(UDLBaseDataType.ELSET)
+    narrowed = spec.from_source("SSDP").max_results(5)
+
+    assert spec.params == (("maxResults", "10000"),)
+    assert dict(narrowed.params) == {"maxResults": "5", "source": "SSDP"}
+    assert narrowed.as_count().to_string() == "https://test.unifieddatalibrary.com/udl/elset/count?source=SSDP"
+    assert narrowed.with_uuid("abc").path == ("abc",)
+    assert dict(narrowed.with_uuid("abc").params) == dict(narrowed.params)
+
+
+def test_spec_from_query_matches_builder():
+    start, end = datetime(2024, 9, 16), datetime(2024, 9, 17)
+    query = UDLQuery(UDLBaseDataType.EO_OBSERVATION).between(start, end).with_descriptor("fast").max_results(50)
+
+    spec = UDLQuerySpec.from_query(query)
+
+    assert spec == UDLQuerySpec.of(UDLBaseDataType.EO_OBSERVATION, 50).with_descriptor("fast").between(start, end)
+    assert UDLQuerySpec.from_query(query.as_count()) == spec.as_count()
@@ -11,7 +11,7 @@ from mockito import mock, verifyNoUnwantedInteractions, when
 from dewdl import DewDLConfigs
 from dewdl.enums import UDLEnvironment, UDLFileDropType
 from dewdl.enums._udl_base_data_type import UDLBaseDataType
-from dewdl.requests import UDLRequest
+from dewdl.requests import SSLContextCache, UDLRequest, UDLSession
 from dewdl.requests.udl_request_payload import UDLRequestPayload
 from dewdl.udl_actions import UDLFileDrop, UDLQuery
 
@@ -63,6 +63,14 @@ def valid_udl_elset_zip():
         return bytes_io.getvalue()
 
 
+@pytest.fixture(autouse=True)
+def _fresh_sessions():
+    # shared sessions hold on to the mocked clients, so each test starts from an empty pool
+    UDLSession._shared.clear()
+    yield
+    UDLSession._shared.clear()
+
+
 @pytest.fixture
 def test_certs():
     f_path = Path(__file__)
@@ -78,12 +86,13 @@ def test_get_from_udl_with_cert(test_certs):
     mock_response = mock()
     # Set the status_code attribute on the mock response object
     mock_response.status_code = 200
-    # Mock httpx.Client and ensure the certificate paths are used
+    # Mock httpx.Client and ensure the cached certificate context is used
     client_mock = mock(httpx.Client)
-    when(client_mock).__enter__().thenReturn(client_mock)
-    when(client_mock).__exit__(...).thenReturn(None)
-    when(httpx).Client(cert=(str(payload.crt), str(payload.key)), verify=True).thenReturn(client_mock)
-    when(client_mock).get(udl_endpoint.to_string(), headers=any, timeout=30).thenReturn(mock_response)
+    client_mock.is_closed = False
+    when(httpx).Client(
+        limits=any, http2=False, timeout=30, verify=SSLContextCache.get(payload.crt, payload.key), event_hooks=any
+    ).thenReturn(client_mock)
+    when(client_mock).get(udl_endpoint.to_string(), headers=any).thenReturn(mock_response)
     response = UDLRequest._make_request(payload=payload)
     assert response.status_code == 200
     verifyNoUnwantedInteractions()
@@ -102,10 +111,9 @@ def test_get_from_udl_with_b64():
     mock_response.status_code = 200
     # Mock httpx.Client
     client_mock = mock(httpx.Client)
-    when(client_mock).__enter__().thenReturn(client_mock)
-    when(client_mock).__exit__(...).thenReturn(None)
-    when(httpx).Client().thenReturn(client_mock)
-    when(client_mock).get(udl_endpoint.to_string(), headers=any, timeout=30).thenReturn(mock_response)
+    client_mock.is_closed = False
+    when(httpx).Client(limits=any, http2=False, timeout=30, event_hooks=any).thenReturn(client_mock)
+    when(client_mock).get(udl_endpoint.to_string(), headers=any).thenReturn(mock_response)
     response = UDLRequest._make_request(payload=payload)
     assert response.status_code == 200
     verifyNoUnwantedInteractions()
@@ -122,12 +130,13 @@ def test_post_to_udl_with_cert(valid_udl_elset, test_certs):
     uuid = "c60092be-9220-4f22-b0e4-5e5731341e7a"
     mock_response.status_code = 201
     mock_response.headers = {"location": f"{UDLEnvironment.TEST}/{uuid}"}
-    # Mock httpx.Client and ensure the certificate paths are used
+    # Mock httpx.Client and ensure the cached certificate context is used
     client_mock = mock(httpx.Client)
-    when(client_mock).__enter__().thenReturn(client_mock)
-    when(client_mock).__exit__(...).thenReturn(None)
-    when(httpx).Client(cert=(str(payload.crt), str(payload.key)), verify=True).thenReturn(client_mock)
-    when(client_mock).post(udl_endpoint.to_string(), headers=any, data=any, timeout=30).thenReturn(mock_response)
+    client_mock.is_closed = False
+    when(httpx).Client(
+        limits=any, http2=False, timeout=30, verify=SSLContextCache.get(payload.crt, payload.key), event_hooks=any
+    ).thenReturn(client_mock)
+    when(client_mock).post(udl_endpoint.to_string(), headers=any, content=any).thenReturn(mock_response)
     uuid = UDLRequest._make_request(payload=payload)
     uuid_regex = r"^[0-9a-f]{8}-([0-9a-f]{4}-){3}[0-9a-f]{12}$"
     assert re.match(uuid_regex, uuid)
@@ -148,14 +157,13 @@ def test_post_to_udl_with_b64(valid_udl_elset):
     uuid = "c60092be-9220-4f22-b0e4-5e5731341e7a"
     mock_response.status_code = 201
     mock_response.headers = {"location": f"{UDLEnvironment.TEST}/{uuid}"}
-    # Mock httpx.Client and make it compatible with the context manager protocol
+    # Mock httpx.Client
     client_mock = mock(httpx.Client)
-    when(client_mock).__enter__().thenReturn(client_mock)
-    when(client_mock).__exit__(...).thenReturn(None)
-    when(httpx).Client().thenReturn(client_mock)
+    client_mock.is_closed = False
+    when(httpx).Client(limits=any, http2=False, timeout=30, event_hooks=any).thenReturn(client_mock)
 
     # Configure the post method on client_mock to return mock_response
-    when(client_mock).post(udl_endpoint, headers=any, data=any, timeout=30).thenReturn(mock_response)
+    when(client_mock).post(udl_endpoint, headers=any, content=any).thenReturn(mock_response)
 
     uuid = UDLRequest._make_request(payload=payload)
     uuid_regex = r"^[0-9a-f]{8}-([0-9a-f]{4}-){3}[0-9a-f]{12}$"
@@ -179,12 +187,13 @@ def test_filedrop_with_cert(valid_udl_elset, test_certs):
     mock_response = mock()
     mock_response.status_code = 202
     mock_response.text = "Accepted"
-    # Mock httpx.Client and ensure the certificate paths are used
+    # Mock httpx.Client and ensure the cached certificate context is used
     client_mock = mock(httpx.Client)
-    when(client_mock).__enter__().thenReturn(client_mock)
-    when(client_mock).__exit__(...).thenReturn(None)
-    when(httpx).Client(cert=(str(payload.crt), str(payload.key)), verify=True).thenReturn(client_mock)
-    when(client_mock).post(udl_endpoint.to_string(), headers=any, data=any, timeout=30).thenReturn(mock_response)
+    client_mock.is_closed = False
+    when(httpx).Client(
+        limits=any, http2=False, timeout=30, verify=SSLContextCache.get(payload.crt, payload.key), event_hooks=any
+    ).thenReturn(client_mock)
+    when(client_mock).post(udl_endpoint.to_string(), headers=any, content=any).thenReturn(mock_response)
     response_txt = UDLRequest._make_request(payload=payload)
     assert response_txt == "Accepted"
     verifyNoUnwantedInteractions()
@@ -205,12 +214,13 @@ def test_post_zip_to_udl_with_cert(valid_udl_elset_zip, test_certs):
     mock_response = mock()
     mock_response.status_code = 202
     mock_response.text = "Accepted"
-    # Mock httpx.Client and ensure the certificate paths are used
+    # Mock httpx.Client and ensure the cached certificate context is used
     client_mock = mock(httpx.Client)
-    when(client_mock).__enter__().thenReturn(client_mock)
-    when(client_mock).__exit__(...).thenReturn(None)
-    when(httpx).Client(cert=(str(payload.crt), str(payload.key)), verify=True).thenReturn(client_mock)
-    when(client_mock).post(udl_endpoint.to_string(), headers=any, data=any, timeout=30).thenReturn(mock_response)
+    client_mock.is_closed = False
+    when(httpx).Client(
+        limits=any, http2=False, timeout=30, verify=SSLContextCache.get(payload.crt, payload.key), event_hooks=any
+    ).thenReturn(client_mock)
+    when(client_mock).post(udl_endpoint.to_string(), headers=any, content=any).thenReturn(mock_response)
     response_txt = UDLRequest._make_request(payload=payload)
     assert response_txt == "Accepted"
     verifyNoUnwantedInteractions()
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.requests import UDLAsyncSession, UDLRequest, UDLSession
+from dewdl.udl_actions import UDLQuery, UDLQuerySpec
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def _slow_udl(sent):
+    def handler(request):
+        sent.append(str(request.url))
+        # long enough for every caller released by the barrier to join the request
+        time.sleep(0.2)
+        return httpx.Response(200, json=[{"satNo": 1}])
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+    yield
+    UDLRequest.use_session(None)
+
+
+@pytest.mark.usefixtures("_slow_udl")
+def test_concurrent_identical_gets_share_one_request(sent):
+    queries = [UDLQuery(UDLBaseDataType.ELSET).from_source("SSDP") for _ in range(4)]
+    queries.append(UDLQuerySpec.of(UDLBaseDataType.ELSET).from_source("SSDP"))
+    barrier = threading.Barrier(len(queries))
+
+    def _get(query):
+        barrier.wait()
+        return UDLRequest.get(query)
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        responses = list(executor.map(_get, queries))
+
+    assert len(sent) == 1
+    assert all(response is responses[0] for response in responses)
+
+
+@pytest.mark.usefixtures("_slow_udl")
+def test_sequential_gets_are_not_coalesced(sent):
+    UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET))
+    UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET))
+
+    assert len(sent) == 2
+
+
+def test_async_gets_share_one_request(sent):
+    async def handler(request):
+        sent.append(str(request.url))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[])
+
+    async def _run():
+        UDLRequest.use_session(UDLAsyncSession(transport=httpx.MockTransport(handler)))
+        try:
+            query = UDLQuerySpec.of(UDLBaseDataType.ELSET)
+            return await asyncio.gather(*(UDLRequest.get(query, async_flag=True) for _ in range(3)))
+        finally:
+            UDLRequest.use_session(None, async_flag=True)
+
+    responses = asyncio.run(_run())
+
+    assert len(sent) == 1
+    assert len({id(response) for response in responses}) == 1
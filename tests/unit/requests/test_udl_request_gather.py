@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import pytest
+from mockito import mock, when
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+from dewdl.requests import UDLRequest
+from dewdl.udl_actions import UDLQuery
+
+
+@pytest.fixture
+def queries():
+    return [UDLQuery(UDLBaseDataType.ELSET).from_source(f"source_{i}") for i in range(10)]
+
+
+@pytest.fixture
+def in_flight():
+    return {"current": 0, "peak": 0}
+
+
+@pytest.fixture
+def fake_async_get(in_flight):
+    async def _get(query):
+        in_flight["current"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        if query.to_string().endswith("source_3&maxResults=10000"):
+            raise UDLRequestError(mock({"status_code": 401, "text": "Unauthorized"}))
+        if query.to_string().endswith("source_5&maxResults=10000"):
+            raise UDLCircuitOpenError("test.unifieddatalibrary.com/udl/elset", 30.0)
+        if query.to_string().endswith("source_7&maxResults=10000"):
+            raise httpx.ConnectTimeout("timed out")
+        return mock({"status_code": 200})
+
+    when(UDLRequest).get(..., async_flag=True).thenAnswer(lambda query, async_flag: _get(query))
+
+
+@pytest.mark.usefixtures("_unstub", "fake_async_get")
+def test_gather_limits_concurrency(queries, in_flight):
+    async def _collect():
+        return [result async for result in UDLRequest.gather(queries, max_concurrency=3)]
+
+    results = asyncio.run(_collect())
+    assert len(results) == len(queries)
+    assert in_flight["peak"] == 3
+
+
+@pytest.mark.usefixtures("_unstub", "fake_async_get")
+def test_gather_sync_returns_errors(queries):
+    results = dict(UDLRequest.gather_sync(queries, max_concurrency=4))
+    assert set(results) == set(queries)
+    assert isinstance(results[queries[3]], UDLRequestError)
+    assert isinstance(results[queries[5]], UDLCircuitOpenError)
+    assert isinstance(results[queries[7]], httpx.ConnectTimeout)
+    failed = (queries[3], queries[5], queries[7])
+    assert all(results[query].status_code == 200 for query in queries if query not in failed)
@@ -0,0 +1,52 @@
+import json
+
+import httpx
+import pytest
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.exceptions import UDLRequestError
+from dewdl.models import Elset
+from dewdl.requests import UDLRequest, UDLSession
+from dewdl.udl_actions import UDLQuery
+
+
+@pytest.fixture
+def elsets():
+    return [
+        {
+            "classificationMarking": "U",
+            "satNo": sat_no,
+            "epoch": "2018-01-01T16:00:00.123456Z",
+            "meanMotion": 1.1,
+            "eccentricity": 0.333,
+            "inclination": 45.1,
+            "raan": 1.1,
+            "argOfPerigee": 1.1,
+            "meanAnomaly": 179.1,
+            "source": "SSDP",
+            "dataMode": "TEST",
+        }
+        for sat_no in range(5)
+    ]
+
+
+def _use_transport(handler):
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+
+
+@pytest.fixture(autouse=True)
+def _reset_session():
+    yield
+    UDLRequest.use_session(None)
+
+
+def test_iter_records(elsets):
+    _use_transport(lambda request: httpx.Response(200, content=json.dumps(elsets).encode()))
+    records = list(UDLRequest.iter_records(UDLQuery(UDLBaseDataType.ELSET), model=Elset))
+    assert [record.satNo for record in records] == list(range(5))
+
+
+def test_iter_records_error():
+    _use_transport(lambda request: httpx.Response(401, content=b"Unauthorized"))
+    with pytest.raises(UDLRequestError, match="401 Unauthorized"):
+        list(UDLRequest.iter_records(UDLQuery(UDLBaseDataType.ELSET)))
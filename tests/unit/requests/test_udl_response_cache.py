@@ -0,0 +1,84 @@
+import time
+
+import httpx
+import pytest
+from mockito import mock
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.exceptions import UDLRequestError
+from dewdl.requests import UDLResponseCache
+
+URL = "https://test.unifieddatalibrary.com/udl/elset?source=SSDP&epoch=%3E2024-09-16T00:00:00.000000Z"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = UDLResponseCache(tmp_path / "cache.sqlite", ttls={UDLBaseDataType.ELSET: 60}, stale_ttl=60)
+    yield cache
+    cache.close()
+
+
+class Loader:
+    def __init__(self, body=b"[]", error=None):
+        self.calls = 0
+        self.body = body
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return httpx.Response(200, content=self.body, headers={"content-type": "application/json"})
+
+
+def _age(cache, seconds):
+    cache._connection.execute("UPDATE responses SET stored_at = stored_at - ?", (seconds,))
+
+
+def test_normalize_url_sorts_parameters():
+    reordered = "https://test.unifieddatalibrary.com/udl/elset?epoch=%3E2024-09-16T00:00:00.000000Z&source=SSDP"
+    assert UDLResponseCache.cache_key(URL, "user") == UDLResponseCache.cache_key(reordered, "user")
+    assert UDLResponseCache.cache_key(URL, "user") != UDLResponseCache.cache_key(URL, "other")
+
+
+def test_fresh_hit(cache):
+    loader = Loader(b'[{"satNo": 1}]')
+    cache.fetch(URL, "user", UDLBaseDataType.ELSET, loader)
+    response = cache.fetch(URL, "user", UDLBaseDataType.ELSET, loader)
+    assert loader.calls == 1
+    assert response.json() == [{"satNo": 1}]
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_stale_while_revalidate(cache):
+    cache.fetch(URL, "user", UDLBaseDataType.ELSET, Loader(b"[1]"))
+    _age(cache, 90)
+    refresh = Loader(b"[2]")
+    assert cache.fetch(URL, "user", UDLBaseDataType.ELSET, refresh).json() == [1]
+    cache._refresh_executor.shutdown(wait=True)
+    assert refresh.calls == 1
+    assert cache.fetch(URL, "user", UDLBaseDataType.ELSET, Loader()).json() == [2]
+
+
+def test_expired_served_on_server_failure(cache):
+    cache.fetch(URL, "user", UDLBaseDataType.ELSET, Loader(b"[1]"))
+    _age(cache, 300)
+    failing = Loader(error=UDLRequestError(mock({"status_code": 503, "text": '{"message": "down"}'})))
+    assert cache.fetch(URL, "user", UDLBaseDataType.ELSET, failing).json() == [1]
+    unauthorized = Loader(error=UDLRequestError(mock({"status_code": 401, "text": ""})))
+    with pytest.raises(UDLRequestError):
+        cache.fetch(URL, "user", UDLBaseDataType.ELSET, unauthorized)
+
+
+def test_lru_eviction(tmp_path):
+    cache = UDLResponseCache(tmp_path / "cache.sqlite", max_bytes=2500, compression_level=0)
+    for i in range(3):
+        cache.fetch(f"{URL}&i={i}", None, None, Loader(b"x" * 1000))
+        time.sleep(0.01)
+        cache.fetch(f"{URL}&i=0", None, None, Loader())
+    (count,) = cache._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+    loader = Loader()
+    cache.fetch(f"{URL}&i=0", None, None, loader)
+    cache.close()
+    assert count == 2
+    assert loader.calls == 0
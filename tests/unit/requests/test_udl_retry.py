@@ -0,0 +1,114 @@
+import httpx
+import pytest
+
+from dewdl.enums import UDLBaseDataType, UDLFileDropType
+from dewdl.exceptions import UDLCircuitOpenError, UDLRequestError
+from dewdl.requests import UDLCircuitBreaker, UDLRequest, UDLRetryPolicy, UDLSession
+from dewdl.udl_actions import UDLFileDrop, UDLQuery
+
+
+def _use_responses(*responses):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        response = responses[min(len(requests), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+    return requests
+
+
+@pytest.fixture(autouse=True)
+def _fast_retries():
+    UDLRequest.use_retry_policy(UDLRetryPolicy(backoff=0.001))
+    UDLRequest.use_circuit_breaker(UDLCircuitBreaker(failure_threshold=3, reset_timeout=60))
+    yield
+    UDLRequest.use_session(None)
+    UDLRequest.use_retry_policy(UDLRetryPolicy())
+    UDLRequest.use_circuit_breaker(UDLCircuitBreaker())
+
+
+def test_get_retries_transient_failures():
+    requests = _use_responses(
+        httpx.Response(503, json={"message": "down"}),
+        httpx.ConnectError("reset"),
+        httpx.Response(200, json=[]),
+    )
+
+    response = UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET))
+
+    assert response.status_code == 200
+    assert len(requests) == 3
+
+
+def test_gateway_errors_with_html_bodies_are_retried():
+    requests = _use_responses(
+        httpx.Response(503, text="<html><body>503 Service Unavailable</body></html>"),
+        httpx.Response(200, json=[]),
+    )
+
+    response = UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET))
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+
+
+def test_get_gives_up_after_max_attempts():
+    requests = _use_responses(httpx.Response(502, json={"message": "bad gateway"}))
+
+    with pytest.raises(UDLRequestError, match="502"):
+        UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET))
+    assert len(requests) == 3
+
+
+def test_client_errors_and_posts_are_not_retried():
+    requests = _use_responses(httpx.Response(400, json={"message": "bad query"}))
+    with pytest.raises(UDLRequestError):
+        UDLRequest.get(UDLQuery(UDLBaseDataType.ELSET))
+    assert len(requests) == 1
+
+    requests = _use_responses(httpx.Response(503, json={"message": "down"}))
+    with pytest.raises(UDLRequestError):
+        UDLRequest.filedrop(UDLFileDrop(UDLFileDropType.ELSET), [{"satNo": 1}])
+    assert len(requests) == 1
+
+
+def test_retry_after_is_honored():
+    policy = UDLRetryPolicy(max_retry_after=5)
+    limited = UDLRequestError(httpx.Response(429, headers={"Retry-After": "2"}, json={"message": "slow down"}))
+    greedy = UDLRequestError(httpx.Response(429, headers={"Retry-After": "120"}, json={"message": "slow down"}))
+
+    assert policy.should_retry("GET", 1, limited)
+    assert policy.delay(1, limited) == 2
+    assert policy.delay(1, greedy) == 5
+    assert 0 <= policy.delay(3, httpx.ConnectError("reset")) <= 2
+
+
+def test_circuit_opens_and_fails_fast():
+    UDLRequest.use_retry_policy(None)
+    requests = _use_responses(httpx.Response(503, json={"message": "down"}))
+    query = UDLQuery(UDLBaseDataType.ELSET)
+
+    for _ in range(3):
+        with pytest.raises(UDLRequestError):
+            UDLRequest.get(query)
+    with pytest.raises(UDLCircuitOpenError):
+        UDLRequest.get(query)
+
+    assert len(requests) == 3
+    # other endpoints are unaffected
+    _use_responses(httpx.Response(200, json=[]))
+    assert UDLRequest.get(UDLQuery(UDLBaseDataType.EO_OBSERVATION)).status_code == 200
+
+
+def test_circuit_half_opens_after_reset_timeout():
+    breaker = UDLCircuitBreaker(failure_threshold=1, reset_timeout=0)
+    url = "https://test.unifieddatalibrary.com/udl/elset?epoch=%3E2024"
+    breaker.record(url, httpx.ConnectError("reset"))
+
+    breaker.before_request(url)
+    breaker.record(url, None)
+    breaker.before_request(url)
@@ -1,6 +1,8 @@
 from datetime import datetime
 
+import httpx
 import pytest
+from mockito import mock, verify, when
 
 from dewdl import DewDLConfigs
 from dewdl.enums import UDLBaseDataType, UDLEnvironment
@@ -52,7 +54,7 @@ def test_get_messages_with_params_no_date_query():
     last_offset = sms.get_latest_offset()
     response = sms.get_messages(last_offset)
     assert sms.to_string() == (
-        f"{UDLEnvironment.TEST.value}/sm/getMessages/" f"{UDLBaseDataType.ELSET.value}/{last_offset}" "?dataMode=real"
+        f"{UDLEnvironment.TEST.value}/sm/getMessages/{UDLBaseDataType.ELSET.value}/{last_offset}?dataMode=real"
     )
     assert response.data == []
 
@@ -84,3 +86,23 @@ def test_get_messages_streaming():
         message_resp = sms.get_messages(last_offset)
         assert message_resp.data is not None
         last_offset = message_resp.next_offset
+
+
+def test_every_request_draws_from_the_rate_limiter():
+    sms = UDLSecureMessage(udl_data_type=UDLBaseDataType.ELSET)
+    sms.rate_limiter = mock()
+    when(sms.rate_limiter).acquire().thenReturn(True)
+    sms.session = mock()
+    when(sms.session).get(...).thenReturn(
+        httpx.Response(200, text="42"),
+        httpx.Response(
+            200, json={"topic": "elset", "minPos": 0, "maxPos": 42, "description": "", "udlOpenAPISchema": ""}
+        ),
+        httpx.Response(200, json=[], request=httpx.Request("GET", "https://udl.test")),
+    )
+
+    sms.get_latest_offset()
+    sms.describe_topic()
+    sms.get_messages(42)
+
+    verify(sms.rate_limiter, times=3).acquire()
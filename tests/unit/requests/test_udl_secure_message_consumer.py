@@ -0,0 +1,59 @@
+import pytest
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.models._sms_response import SMSResponse
+from dewdl.stores import FileCheckpointStore
+from dewdl.udl_actions import UDLSecureMessageConsumer
+
+
+class FakeSecureMessage:
+    base_data_type = UDLBaseDataType.ELSET
+
+    def __init__(self, latest_offset=100):
+        self.latest_offset = latest_offset
+        self.requested = []
+
+    def get_latest_offset(self):
+        return self.latest_offset
+
+    def get_messages(self, offset):
+        self.requested.append(offset)
+        return SMSResponse(data=[{"offset": offset}], next_offset=offset + 1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FileCheckpointStore(tmp_path / "checkpoints.json")
+
+
+def _consume(consumer, pages):
+    consumed = []
+    for response in consumer:
+        consumed.append(response.data[0]["offset"])
+        if len(consumed) == pages:
+            break
+    return consumed
+
+
+def test_resumes_after_last_processed_page(store):
+    consumer = UDLSecureMessageConsumer(FakeSecureMessage(), "etl", store, commit_every=100)
+    assert _consume(consumer, 3) == [100, 101, 102]
+    # the third page was yielded but iteration stopped before it was finished, so it is replayed
+    assert store.load("elset", "etl") == 102
+    resumed = UDLSecureMessageConsumer(FakeSecureMessage(), "etl", store)
+    assert _consume(resumed, 1) == [102]
+
+
+def test_batched_commits(store):
+    consumer = UDLSecureMessageConsumer(FakeSecureMessage(), "etl", store, commit_every=2, commit_interval=60)
+    iterator = iter(consumer)
+    next(iterator)
+    next(iterator)
+    assert store.load("elset", "etl") is None
+    next(iterator)
+    assert store.load("elset", "etl") == 102
+
+
+def test_initial_offset(store):
+    consumer = UDLSecureMessageConsumer(FakeSecureMessage(), "etl", store, initial_offset=5)
+    assert consumer.resume_offset() == 5
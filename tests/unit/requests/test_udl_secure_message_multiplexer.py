@@ -0,0 +1,55 @@
+import time
+from collections import Counter
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.models._sms_response import SMSResponse
+from dewdl.udl_actions import UDLSecureMessageMultiplexer
+
+
+class FakeSecureMessage:
+    def __init__(self, base_data_type, latest_offset):
+        self.base_data_type = base_data_type
+        self.latest_offset = latest_offset
+        self.requests = 0
+
+    def get_latest_offset(self):
+        self.requests += 1
+        return self.latest_offset
+
+    def get_messages(self, offset):
+        self.requests += 1
+        time.sleep(0.001)
+        if offset >= self.latest_offset:
+            return SMSResponse(data=[], next_offset=offset)
+        return SMSResponse(data=[{"offset": offset}], next_offset=offset + 1)
+
+
+def _take(multiplexer, count):
+    pages = []
+    for page in multiplexer:
+        pages.append(page)
+        if len(pages) == count:
+            multiplexer.stop()
+    return pages
+
+
+def test_lagging_topic_gets_more_polls():
+    elset = FakeSecureMessage(UDLBaseDataType.ELSET, latest_offset=1000)
+    notification = FakeSecureMessage(UDLBaseDataType.NOTIFICATION, latest_offset=10)
+    multiplexer = UDLSecureMessageMultiplexer(
+        [elset, notification], offsets={UDLBaseDataType.ELSET: 0, UDLBaseDataType.NOTIFICATION: 5}
+    )
+    pages = _take(multiplexer, 40)
+    topics = Counter(page.topic for page in pages)
+    assert topics[UDLBaseDataType.NOTIFICATION] == 5
+    assert topics[UDLBaseDataType.ELSET] == 35
+    assert all(page.response.data[0]["offset"] == page.offset for page in pages)
+    assert multiplexer.offsets[UDLBaseDataType.NOTIFICATION] == 10
+
+
+def test_empty_topics_back_off():
+    elset = FakeSecureMessage(UDLBaseDataType.ELSET, latest_offset=1000)
+    idle = FakeSecureMessage(UDLBaseDataType.STATE_VECTOR, latest_offset=0)
+    multiplexer = UDLSecureMessageMultiplexer([elset, idle], offsets={UDLBaseDataType.ELSET: 0}, max_backoff=10)
+    _take(multiplexer, 50)
+    assert idle.requests < 10
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import shutil
+from pathlib import Path
+
+import httpx
+import pytest
+
+from dewdl.requests import SSLContextCache, UDLAsyncSession, UDLSession
+
+
+@pytest.fixture(autouse=True)
+def _fresh_sessions():
+    UDLSession.close_shared()
+    yield
+    UDLSession.configure()
+
+
+def test_shared_session_is_reused():
+    session = UDLSession.shared()
+    assert UDLSession.shared() is session
+    assert session.client is session.client
+
+
+def test_shared_session_per_cert():
+    assert UDLSession.shared("a.crt", "a.key") is not UDLSession.shared()
+    assert UDLSession.shared("a.crt", "a.key").cert == ("a.crt", "a.key")
+
+
+def test_configure_limits():
+    UDLSession.configure(max_connections=7, max_keepalive_connections=3)
+    session = UDLSession.shared()
+    assert session.limits == httpx.Limits(max_connections=7, max_keepalive_connections=3, keepalive_expiry=30.0)
+
+
+def test_context_manager_closes_client():
+    with UDLSession() as session:
+        client = session.client
+    assert client.is_closed
+    assert session.closed
+
+
+def test_async_session_per_loop():
+    async def _get_session():
+        async with UDLAsyncSession.shared() as session:
+            return session, session.client
+
+    first_session, first_client = asyncio.run(_get_session())
+    second_session, _ = asyncio.run(_get_session())
+    assert first_session is not second_session
+    assert first_client.is_closed
+
+
+def test_aclose_shared_closes_the_loops_sessions():
+    async def _use_shared():
+        session = UDLAsyncSession.shared()
+        client = session.client
+        await UDLAsyncSession.aclose_shared()
+        return session, client, UDLAsyncSession.shared()
+
+    session, client, replacement = asyncio.run(_use_shared())
+    assert client.is_closed
+    assert session.closed
+    assert replacement is not session
+
+
+@pytest.fixture
+def rotated_certs(tmp_path):
+    certs_dir = Path(__file__).parents[1] / "test_data/certs"
+    crt, key = tmp_path / "test_cert.pem", tmp_path / "test_key.pem"
+    shutil.copy(certs_dir / "test_cert.pem", crt)
+    shutil.copy(certs_dir / "test_key.pem", key)
+    return crt, key
+
+
+def test_ssl_context_is_cached(rotated_certs):
+    context = SSLContextCache.get(*rotated_certs)
+    assert SSLContextCache.get(*rotated_certs) is context
+
+
+def _rotate(crt):
+    stat = crt.stat()
+    os.utime(crt, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_rotated_cert_rebuilds_client(rotated_certs, monkeypatch):
+    monkeypatch.setattr(UDLSession, "CERT_CHECK_INTERVAL", 0.0)
+    crt, key = rotated_certs
+    session = UDLSession.shared(crt, key)
+    client = session.client
+    assert session.client is client
+    _rotate(crt)
+    assert session.client is not client
+    # requests in flight on the old client keep running until the session is closed
+    assert not client.is_closed
+    assert session._ssl_context is SSLContextCache.get(crt, key)
+    session.close()
+    assert client.is_closed
+
+
+def test_cert_files_are_checked_at_most_once_per_interval(rotated_certs):
+    crt, key = rotated_certs
+    session = UDLSession.shared(crt, key)
+    client = session.client
+    _rotate(crt)
+    assert session.client is client
+    session._cert_checked_at -= UDLSession.CERT_CHECK_INTERVAL
+    assert session.client is not client
+
+
+def test_rotated_cert_keeps_old_async_client_until_closed(rotated_certs, monkeypatch):
+    monkeypatch.setattr(UDLAsyncSession, "CERT_CHECK_INTERVAL", 0.0)
+    crt, key = rotated_certs
+
+    async def _rotate_client():
+        session = UDLAsyncSession(crt, key)
+        client = session.client
+        _rotate(crt)
+        assert session.client is not client
+        assert not client.is_closed
+        await session.aclose()
+        return client
+
+    assert asyncio.run(_rotate_client()).is_closed
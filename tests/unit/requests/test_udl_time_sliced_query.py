@@ -0,0 +1,85 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from mockito import mock, when
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.requests import UDLRequest, UDLTimeSlicedQuery
+from dewdl.udl_actions import UDLQuery
+
+
+@pytest.fixture
+def observations():
+    start = datetime(2024, 9, 16)
+    return [{"id": str(i), "obTime": start + timedelta(seconds=i)} for i in range(95)]
+
+
+@pytest.fixture
+def fetched():
+    return []
+
+
+@pytest.fixture
+def fake_udl(observations, fetched):
+    def _get(query):
+        in_window = [ob for ob in observations if query.start <= ob["obTime"] <= query.end]
+        if query.to_string().split("?")[0].endswith("/count"):
+            return mock({"text": str(len(in_window))})
+        fetched.append((query.start, query.end))
+        return mock({"content": json.dumps(in_window[: query.result_limit], default=str).encode("utf-8")})
+
+    when(UDLRequest).get(...).thenAnswer(_get)
+
+
+def test_requires_start():
+    with pytest.raises(ValueError, match="time range"):
+        UDLTimeSlicedQuery(UDLQuery(UDLBaseDataType.EO_OBSERVATION).before(datetime(2024, 9, 16)))
+
+
+@pytest.mark.usefixtures("_unstub", "fake_udl")
+def test_windows_are_disjoint():
+    query = UDLQuery(UDLBaseDataType.EO_OBSERVATION).between(datetime(2024, 9, 16), datetime(2024, 9, 16, 0, 2))
+    windows = UDLTimeSlicedQuery(query.max_results(20)).windows()
+    assert len(windows) == 10
+    assert windows[0][0] == query.start
+    assert windows[-1][1] == query.end
+    assert all(prev[1] < cur[0] for prev, cur in zip(windows, windows[1:]))
+
+
+@pytest.mark.usefixtures("_unstub", "fake_udl")
+def test_bisects_full_windows(observations):
+    query = UDLQuery(UDLBaseDataType.EO_OBSERVATION).between(datetime(2024, 9, 16), datetime(2024, 9, 16, 0, 2))
+    sliced = UDLTimeSlicedQuery(query.max_results(20))
+    sliced.TARGET_FILL = 4
+    records = list(sliced)
+    assert [ob["id"] for ob in records] == [ob["id"] for ob in observations]
+
+
+@pytest.mark.usefixtures("_unstub", "fake_udl")
+def test_after_excludes_its_start(observations):
+    query = UDLQuery(UDLBaseDataType.EO_OBSERVATION).after(datetime(2024, 9, 16))
+    records = list(UDLTimeSlicedQuery(query.max_results(200)))
+    assert [ob["id"] for ob in records] == [ob["id"] for ob in observations[1:]]
+
+
+@pytest.mark.usefixtures("_unstub", "fake_udl")
+def test_stopping_early_cancels_queued_windows(fetched):
+    query = UDLQuery(UDLBaseDataType.EO_OBSERVATION).between(datetime(2024, 9, 16), datetime(2024, 9, 16, 0, 2))
+    sliced = UDLTimeSlicedQuery(query.max_results(4), max_workers=1)
+    windows = len(sliced.windows())
+
+    records = iter(sliced)
+    next(records)
+    records.close()
+
+    assert len(fetched) < windows
+
+
+def test_open_end_keeps_the_callers_time_zone():
+    start = datetime(2024, 9, 16, tzinfo=timezone(timedelta(hours=5)))
+
+    sliced = UDLTimeSlicedQuery(UDLQuery(UDLBaseDataType.EO_OBSERVATION).after(start))
+
+    assert sliced.end.utcoffset() == timedelta(hours=5)
+    assert abs(sliced.end - datetime.now(timezone.utc)) < timedelta(seconds=5)
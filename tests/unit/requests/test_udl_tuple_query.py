@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import httpx
+import pytest
+
+from dewdl.enums import UDLBaseDataType, UDLQueryType
+from dewdl.models import Elset, tuple_row_type
+from dewdl.requests import UDLRequest, UDLSession
+from dewdl.udl_actions import UDLGetTuple, UDLQuery, UDLQuerySpec
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def _tuple_udl(sent):
+    def handler(request):
+        sent.append(request.url)
+        return httpx.Response(
+            200, json=[{"satNo": 25544, "meanMotion": 15.5}, {"satNo": 12, "epoch": "2024-09-16T00:00:00.000000Z"}]
+        )
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+    yield
+    UDLRequest.use_session(None)
+
+
+def test_select_targets_tuple_endpoint_with_filters():
+    query = UDLQuery(UDLBaseDataType.ELSET).select("satNo", "epoch").after(datetime(2024, 9, 16)).from_source("SSDP")
+
+    assert query.to_string().endswith(
+        "/udl/elset/tuple?columns=satNo,epoch&epoch=%3E2024-09-16T00:00:00.000000Z&source=SSDP&maxResults=10000"
+    )
+
+
+def test_count_ignores_selected_columns():
+    query = UDLQuery(UDLBaseDataType.ELSET).select("satNo").as_count()
+
+    assert "/udl/elset/count?" in query.to_string()
+    assert "columns" not in query.to_string()
+
+
+def test_select_requires_columns():
+    with pytest.raises(ValueError, match="At least one column"):
+        UDLQuery(UDLBaseDataType.ELSET).select()
+
+
+def test_spec_select_matches_query():
+    query = UDLQuery(UDLBaseDataType.ELSET).from_source("SSDP").select("satNo", "epoch")
+    spec = UDLQuerySpec.of(UDLBaseDataType.ELSET).select("satNo", "epoch").from_source("SSDP")
+
+    assert UDLQuerySpec.from_query(query) == spec
+    assert spec.columns == ("satNo", "epoch")
+    assert "columns" not in spec.as_count().to_string()
+
+
+def test_get_tuple_uses_columns():
+    action = UDLGetTuple(UDLQueryType.ELSET, ["satNo", "meanMotion"])
+
+    assert action.to_string().endswith("/udl/elset/tuple?columns=satNo,meanMotion")
+    assert action.columns == ("satNo", "meanMotion")
+    with pytest.raises(TypeError, match="iterable of column names"):
+        UDLGetTuple(UDLQueryType.ELSET, "satNo")
+
+
+@pytest.mark.usefixtures("_tuple_udl")
+def test_get_rows_returns_named_tuples(sent):
+    rows = UDLRequest.get_rows(UDLQuery(UDLBaseDataType.ELSET).select("satNo", "epoch", "meanMotion"))
+
+    assert sent[0].path.endswith("/elset/tuple")
+    assert sent[0].params["columns"] == "satNo,epoch,meanMotion"
+    assert rows[0] == (25544, None, 15.5)
+    assert rows[1].epoch == "2024-09-16T00:00:00.000000Z"
+    assert type(rows[0]) is tuple_row_type(("satNo", "epoch", "meanMotion"))
+
+
+@pytest.mark.usefixtures("_tuple_udl")
+def test_get_columns_keeps_only_selected_columns():
+    pytest.importorskip("numpy")
+
+    result = UDLRequest.get_columns(UDLQuery(UDLBaseDataType.ELSET).select("satNo", "meanMotion"), Elset)
+
+    assert list(result.columns) == ["satNo", "meanMotion"]
+    assert result["satNo"].tolist() == [25544, 12]
+
+
+def test_get_rows_requires_selected_columns():
+    with pytest.raises(ValueError, match="select"):
+        UDLRequest.get_rows(UDLQuery(UDLBaseDataType.ELSET))
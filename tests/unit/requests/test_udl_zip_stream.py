@@ -0,0 +1,56 @@
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+from dewdl.requests import UDLZipStream
+
+
+def _unzip(chunks):
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+@pytest.mark.parametrize("threaded", [True, False])
+def test_zip_stream_round_trips_entries(tmp_path, threaded):
+    path = tmp_path / "elsets.txt"
+    path.write_bytes(b"1 25544U\n2 25544\n" * 10000)
+    stream = UDLZipStream(
+        [("a.json", b'{"a": 1}'), ("b.txt", iter([b"part one ", b"part two"])), ("c.txt", path)],
+        threaded=threaded,
+        chunk_size=1024,
+    )
+
+    files = _unzip(stream)
+
+    assert files == {"a.json": b'{"a": 1}', "b.txt": b"part one part two", "c.txt": path.read_bytes()}
+
+
+def test_zip_stream_from_records_writes_json_array():
+    records = ({"satNo": sat_no, "uct": False} for sat_no in range(1000))
+
+    files = _unzip(UDLZipStream.from_records(records, name="elsets.json"))
+
+    assert json.loads(files["elsets.json"]) == [{"satNo": sat_no, "uct": False} for sat_no in range(1000)]
+
+
+def test_zip_stream_async_chunks():
+    stream = UDLZipStream.from_records([{"satNo": 1}])
+
+    async def _collect():
+        return [chunk async for chunk in stream.async_chunks()]
+
+    files = _unzip(asyncio.run(_collect()))
+
+    assert json.loads(files["data.json"]) == [{"satNo": 1}]
+
+
+def test_zip_stream_propagates_producer_errors():
+    def _failing():
+        yield b"ok"
+        raise OSError("disk gone")
+
+    with pytest.raises(OSError, match="disk gone"):
+        b"".join(UDLZipStream([("a.txt", _failing())]))
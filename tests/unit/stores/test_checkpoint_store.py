@@ -0,0 +1,20 @@
+import pytest
+
+from dewdl.stores import FileCheckpointStore, SQLiteCheckpointStore
+
+
+@pytest.fixture(params=[FileCheckpointStore, SQLiteCheckpointStore])
+def store_type(request):
+    return request.param
+
+
+def test_save_and_load(tmp_path, store_type):
+    store = store_type(tmp_path / "checkpoints")
+    assert store.load("elset", "consumer") is None
+    store.save("elset", "consumer", 10)
+    store.save("elset", "consumer", 12)
+    store.save("elset", "other", 3)
+    reopened = store_type(tmp_path / "checkpoints")
+    assert reopened.load("elset", "consumer") == 12
+    assert reopened.load("elset", "other") == 3
+    assert reopened.load("statevector", "consumer") is None
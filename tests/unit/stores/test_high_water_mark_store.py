@@ -0,0 +1,44 @@
+import multiprocessing
+from datetime import datetime, timedelta
+
+from dewdl.enums import UDLBaseDataType
+from dewdl.stores import HighWaterMark, HighWaterMarkStore
+
+
+def test_commit_and_get(tmp_path):
+    store = HighWaterMarkStore(tmp_path / "marks.json")
+    key = HighWaterMarkStore.stream_key(UDLBaseDataType.ELSET, "SSDP")
+    assert store.get(key) is None
+    mark = HighWaterMark(datetime(2024, 9, 16, 1, 2, 3, 456789), frozenset({"a", "b"}))
+    store.commit(key, mark)
+    assert HighWaterMarkStore(tmp_path / "marks.json").get(key) == mark
+    assert sorted(tmp_path.iterdir()) == [tmp_path / "marks.json", tmp_path / "marks.json.lock"]
+
+
+def _commit_many(path, source, count):
+    store = HighWaterMarkStore(path)
+    key = HighWaterMarkStore.stream_key(UDLBaseDataType.ELSET, source)
+    for minute in range(count):
+        store.commit(key, HighWaterMark(datetime(2024, 9, 16) + timedelta(minutes=minute)))
+
+
+def test_processes_do_not_overwrite_each_others_marks(tmp_path):
+    path = tmp_path / "marks.json"
+    workers = [multiprocessing.Process(target=_commit_many, args=(path, source, 50)) for source in ("A", "B")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    store = HighWaterMarkStore(path)
+    for source in ("A", "B"):
+        mark = store.get(HighWaterMarkStore.stream_key(UDLBaseDataType.ELSET, source))
+        assert mark.time == datetime(2024, 9, 16, 0, 49)
+
+
+def test_delete(tmp_path):
+    store = HighWaterMarkStore(tmp_path / "marks.json")
+    key = HighWaterMarkStore.stream_key(UDLBaseDataType.ELSET)
+    store.commit(key, HighWaterMark(datetime(2024, 9, 16)))
+    store.delete(key)
+    assert store.get(key) is None
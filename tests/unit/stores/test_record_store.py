@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from dewdl._udl_time import format_udl_time, parse_udl_time
+from dewdl.enums import UDLBaseDataType
+from dewdl.requests import UDLRequest, UDLSession
+from dewdl.stores import RecordStore
+
+START = datetime(2024, 9, 16)
+UDL_RECORDS = [
+    {
+        "id": f"elset-{hour}",
+        "satNo": 25544,
+        "epoch": format_udl_time(START + timedelta(hours=hour)),
+        "source": "SSDP" if hour % 2 else "18SDS",
+    }
+    for hour in range(72)
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RecordStore(tmp_path / "records.sqlite")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def fetched():
+    windows = []
+
+    def handler(request):
+        start, end = (parse_udl_time(value) for value in request.url.params["epoch"].split(".."))
+        source = request.url.params.get("source")
+        matches = [
+            record
+            for record in UDL_RECORDS
+            if start <= parse_udl_time(record["epoch"]) <= end and source in (None, record["source"])
+        ]
+        if request.url.path.endswith("/count"):
+            return httpx.Response(200, text=str(len(matches)))
+        windows.append((start, end))
+        return httpx.Response(200, json=matches)
+
+    UDLRequest.use_session(UDLSession(transport=httpx.MockTransport(handler)))
+    yield windows
+    UDLRequest.use_session(None)
+
+
+def test_query_fetches_then_answers_locally(store, fetched):
+    day_one = store.query(UDLBaseDataType.ELSET).between(START, START + timedelta(hours=23))
+
+    assert len(day_one.records()) == 24
+    assert fetched == [(START, START + timedelta(hours=23))]
+
+    assert len(day_one.records()) == 24
+    assert len(fetched) == 1
+
+
+def test_only_missing_ranges_are_fetched(store, fetched):
+    store.query(UDLBaseDataType.ELSET).between(START + timedelta(hours=24), START + timedelta(hours=47)).records()
+
+    records = store.query(UDLBaseDataType.ELSET).between(START, START + timedelta(hours=71)).records()
+
+    assert [record["id"] for record in records] == [record["id"] for record in UDL_RECORDS]
+    assert fetched[1:] == [
+        (START, START + timedelta(hours=24)),
+        (START + timedelta(hours=47), START + timedelta(hours=71)),
+    ]
+    assert store.coverage(UDLBaseDataType.ELSET) == [(START, START + timedelta(hours=71))]
+
+
+def test_unfiltered_coverage_serves_source_queries(store, fetched):
+    store.query(UDLBaseDataType.ELSET).between(START, START + timedelta(hours=23)).records()
+
+    query = store.query(UDLBaseDataType.ELSET).after(START).before(START + timedelta(hours=23)).from_source("SSDP")
+
+    assert query.missing() == []
+    assert {record["source"] for record in query.records()} == {"SSDP"}
+
+
+def test_source_coverage_does_not_serve_other_queries(store, fetched):
+    store.query(UDLBaseDataType.ELSET).between(START, START + timedelta(hours=23)).from_source("SSDP").records()
+
+    assert store.missing(UDLBaseDataType.ELSET, START, START + timedelta(hours=23), "SSDP") == []
+    assert store.missing(UDLBaseDataType.ELSET, START, START + timedelta(hours=23)) == [
+        (START, START + timedelta(hours=23))
+    ]
+
+
+def test_unsettled_ranges_are_fetched_again(store, fetched, monkeypatch):
+    now = datetime(2024, 9, 18, 12)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.replace(tzinfo=tz)
+
+    monkeypatch.setattr("dewdl.stores._record_store.datetime", FrozenDatetime)
+    query = store.query(UDLBaseDataType.ELSET).after(START)
+
+    assert len(query.records()) == 61
+    settled = now - RecordStore.DEFAULT_SETTLE_TIME
+    assert store.coverage(UDLBaseDataType.ELSET) == [(START, settled)]
+
+    assert len(query.records()) == 61
+    assert fetched[-1] == (settled, now)
+
+
+def test_write_keeps_one_copy_and_survives_reopening(tmp_path):
+    path = tmp_path / "records.sqlite"
+    store = RecordStore(path)
+    assert store.write(UDLBaseDataType.ELSET, UDL_RECORDS[:10]) == 10
+    store.write(UDLBaseDataType.ELSET, [{**UDL_RECORDS[0], "satNo": 1}], covering=(START, START + timedelta(hours=9)))
+    store.close()
+
+    reopened = RecordStore(path)
+    records = reopened.query(UDLBaseDataType.ELSET).between(START, START + timedelta(hours=9)).records(fetch=False)
+    reopened.close()
+
+    assert len(records) == 10
+    assert records[0]["satNo"] == 1
+
+
+def test_query_requires_start(store):
+    with pytest.raises(ValueError, match="start time"):
+        store.query(UDLBaseDataType.ELSET).before(START).records()